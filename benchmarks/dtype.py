@@ -0,0 +1,71 @@
+"""
+Compares the peak memory use and latency of running the model with float64 and float32 samples.
+
+Run with `python -m benchmarks.dtype`.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.intervention_definitions.all_interventions import get_intervention
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SampleDtype, SimulationParams
+
+from benchmarks.utils import print_comparison, time_call
+
+SIMULATIONS = 200_000
+
+
+def _parameters(dtype: SampleDtype) -> Parameters:
+    return Parameters(simulation_params=SimulationParams(simulations=SIMULATIONS, dtype=dtype))
+
+
+def _run(f: Callable[[], Any], dtype: SampleDtype) -> None:
+    # A fresh generator per call, so that no cached estimates are reused between calls
+    with using_parameters(_parameters(dtype)), using_rng():
+        f()
+
+
+def _peak_memory_mb(f: Callable[[], Any], dtype: SampleDtype) -> float:
+    tracemalloc.start()
+    _run(f, dtype)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def benchmark_dtypes() -> None:
+    project = get_all_projects(equal_money_for_causes=False)[0]
+    cases: dict[str, Callable[[], Any]] = {
+        "GiveWell Bar estimate": get_intervention("GiveWell Bar").estimate_dalys_per_1000,
+        "Generic Chicken Campaign estimate": get_intervention("Generic Chicken Campaign").estimate_dalys_per_1000,
+        "Small-scale AI Misalignment Project estimate": get_intervention(
+            "Small-scale AI Misalignment Project"
+        ).estimate_dalys_per_1000,
+        f"{project.short_name} assessment": project.assess_project,
+    }
+
+    print(f"Latency, {SIMULATIONS:,} simulations")
+    print_comparison(
+        [
+            (name, time_call(lambda f=f: _run(f, "float64")), time_call(lambda f=f: _run(f, "float32")))
+            for name, f in cases.items()
+        ],
+        before="float64",
+        after="float32",
+    )
+    print()
+    print(f"Peak memory, {SIMULATIONS:,} simulations")
+    name_width = max(len(name) for name in cases)
+    print(f"{'case':<{name_width}}  {'float64':>12}  {'float32':>12}")
+    for name, f in cases.items():
+        print(
+            f"{name:<{name_width}}  {_peak_memory_mb(f, 'float64'):>10.1f}MB  {_peak_memory_mb(f, 'float32'):>10.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_dtypes()
@@ -0,0 +1,160 @@
+"""
+Compares the fused life years kernel of `ccm.world.population` with the unfused computation it replaced, which
+computed the terrestrial and extraterrestrial life years separately, in full-size temporary arrays, and the
+galactic and super cluster volumes in separate passes.
+
+The kernel runs on every delay to extinction of an x-risk estimate, so it is timed on its own, for large numbers
+of non-zero delays, and within estimates of x-risk interventions.
+
+Run with `python -m benchmarks.life_years`.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+from unittest import mock
+
+import numpy as np
+from numpy.typing import NDArray
+
+import ccm.world.population as population
+import ccm.world.space as space
+from ccm.config import get_current_year
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.world.population import WORLD_POPULATION_2100, WORLD_POPULATION_NOW
+from ccm.world.risk_types import RiskTypeAI, RiskTypeGLT
+from ccm.world.space import GALACTIC_RADIUS, SUPERCLUSTER_RADIUS
+from ccm.world.simulation import WorldSimulation
+
+from benchmarks.utils import parameters_with_simulations, print_comparison, time_call
+
+KERNEL_SAMPLES = (100_000, 1_000_000)
+ESTIMATE_SIMULATIONS = 1_000_000
+CUR_YEAR = get_current_year()
+
+
+def _unfused_life_years_until(
+    years: NDArray[np.float64],
+    populations_per_star: NDArray[np.floating],
+    expansion_speeds: NDArray[np.floating],
+    galactic_densities: NDArray[np.floating],
+    supercluster_densities: NDArray[np.floating],
+) -> NDArray[np.float64]:
+    """The life years as they were computed before the kernel was fused."""
+    end_years = years + CUR_YEAR
+    fraction_until_2100 = np.where(end_years > 2100, 1, years / (2100 - CUR_YEAR))
+    years_until_2100 = fraction_until_2100 * (2100 - CUR_YEAR)
+    value_to_2100 = (
+        WORLD_POPULATION_NOW + ((WORLD_POPULATION_2100 - WORLD_POPULATION_NOW) * fraction_until_2100 / 2)
+    ) * years_until_2100
+    fraction_until_3000 = np.where(end_years > 3000, 1, np.maximum((end_years - 2100) / (3000 - 2100), 0))
+    years_until_3000 = np.where(fraction_until_3000 > 0, fraction_until_3000 * (3000 - 2100), 0)
+    value_to_3000 = (
+        WORLD_POPULATION_2100 + ((populations_per_star - WORLD_POPULATION_2100) * fraction_until_3000) / 2
+    ) * years_until_3000
+    value_thereafter = np.where(end_years > 3000, (end_years - 3000) * populations_per_star, 0)
+    terrestrial = value_to_2100 + value_to_3000 + value_thereafter
+
+    speeds = expansion_speeds.astype(np.float64)
+    populations = populations_per_star.astype(np.float64)
+    galactic = _inhabited_volumes(years, speeds, GALACTIC_RADIUS) * populations * galactic_densities
+    supercluster = _inhabited_volumes(years, speeds, SUPERCLUSTER_RADIUS) * populations * supercluster_densities
+    # (The cube of the super cluster radius overflows int64, so the volumes are object arrays until stored)
+    return (terrestrial + galactic + supercluster).astype(np.float64)
+
+
+def _inhabited_volumes(end_years: NDArray[np.float64], speeds: NDArray[np.float64], radius: int) -> NDArray:
+    """The inhabited volumes of a single sphere, as they were computed before the radii were computed in one pass."""
+    time_expansion_finished = np.where(
+        speeds > 0, np.divide(radius, speeds, where=speeds > 0), space.TIME_WHEN_STARS_BURN_OUT
+    )
+    time_during_expansion = np.where(end_years > time_expansion_finished, time_expansion_finished, end_years)
+    time_after_expansion = end_years - time_during_expansion
+    time_after_expansion[time_after_expansion < 0] = 0
+    expansion_period_volume = (time_during_expansion**4 * space.PI * speeds**3) / 3
+    post_expansion_period_volume = time_after_expansion * 4 / 3 * space.PI * (radius**3)
+    return expansion_period_volume + post_expansion_period_volume
+
+
+def _kernel_arguments(num_samples: int) -> tuple[NDArray, ...]:
+    with using_parameters(Parameters()), using_rng(0):
+        world = WorldSimulation(Parameters().longterm_params, num_samples, (0, ()))
+    # Delays to extinction, from a few years to the end of the stars
+    years = np.exp(np.random.default_rng(0).uniform(0, np.log(1e12), num_samples))
+    return (
+        years,
+        world.populations_per_star,
+        world.expansion_speeds,
+        world.galactic_densities,
+        world.supercluster_densities,
+    )
+
+
+def _peak_memory_mb(f: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def _estimate(intervention: XRiskIntervention, life_years_until: Callable[..., NDArray[np.float64]]) -> None:
+    # A fresh generator per call, so that no worlds are reused between calls
+    with (
+        using_parameters(parameters_with_simulations(ESTIMATE_SIMULATIONS)),
+        using_rng(),
+        mock.patch.object(population, "_life_years_until", life_years_until),
+    ):
+        intervention.estimate_healthy_years_saved()
+
+
+def benchmark_life_years() -> None:
+    kernel_rows = []
+    memory_rows = []
+    for num_samples in KERNEL_SAMPLES:
+        arguments = _kernel_arguments(num_samples)
+        np.testing.assert_allclose(
+            population._life_years_until(*arguments), _unfused_life_years_until(*arguments), rtol=1e-9
+        )
+        name = f"{num_samples:,} non-zero delays"
+        kernel_rows.append(
+            (
+                name,
+                time_call(partial(_unfused_life_years_until, *arguments)),
+                time_call(partial(population._life_years_until, *arguments)),
+            )
+        )
+        memory_rows.append(
+            (
+                name,
+                _peak_memory_mb(partial(_unfused_life_years_until, *arguments)),
+                _peak_memory_mb(partial(population._life_years_until, *arguments)),
+            )
+        )
+
+    estimate_rows = []
+    for risk_type in (RiskTypeAI.MISALIGNMENT, RiskTypeGLT.NUKES):
+        intervention = XRiskIntervention(risk_type=risk_type)
+        estimate_rows.append(
+            (
+                f"{risk_type.value} estimate",
+                time_call(partial(_estimate, intervention, _unfused_life_years_until), repeat=3),
+                time_call(partial(_estimate, intervention, population._life_years_until), repeat=3),
+            )
+        )
+
+    print("Life years kernel, latency")
+    print_comparison(kernel_rows, before="unfused", after="fused")
+    print()
+    print("Life years kernel, peak memory")
+    print_comparison(memory_rows, before="unfused", after="fused", unit="MB")
+    print()
+    print(f"X-risk estimates of healthy years saved, {ESTIMATE_SIMULATIONS:,} simulations")
+    print_comparison(estimate_rows, before="unfused", after="fused")
+
+
+if __name__ == "__main__":
+    benchmark_life_years()
@@ -0,0 +1,80 @@
+"""
+Measures the overhead that `@inject_parameters` adds to each call, for each submodel of Parameters.
+The indexed lookup is compared with a linear scan over the fields of Parameters, as done previously.
+
+Run with `python -m benchmarks.parameter_injection`.
+"""
+
+import timeit
+from collections.abc import Callable
+
+from ccm.base_parameters import BaseParameters
+from ccm.contexts import PARAMS_VAR, inject_parameters, using_parameters
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.world.longterm_params import LongTermParams
+
+from benchmarks.utils import print_comparison
+
+CALLS = 200_000
+
+
+def _inject_by_scan(f: Callable, submodel: type[BaseParameters] | None) -> Callable:
+    """Injects parameters the way `inject_parameters` used to: by a scan over the fields of Parameters."""
+
+    def get_parameters_by_scan() -> BaseParameters:
+        params = PARAMS_VAR.get()
+        if submodel is None:
+            return params
+        for _, value in params:
+            if isinstance(value, submodel):
+                return value
+        raise LookupError(submodel)
+
+    def wrapper(*args, **kwargs):
+        return f(get_parameters_by_scan(), *args, **kwargs)
+
+    return wrapper
+
+
+def _overhead_ns(f, plain_f) -> float:
+    """Returns the time per call of `f`, minus that of the undecorated `plain_f`, in nanoseconds."""
+    return (min(timeit.repeat(f, number=CALLS, repeat=5)) - min(timeit.repeat(plain_f, number=CALLS, repeat=5))) / (
+        CALLS / 1e9
+    )
+
+
+def benchmark_injection() -> None:
+    def plain() -> None:
+        pass
+
+    @inject_parameters
+    def with_parameters(params: Parameters) -> None:
+        pass
+
+    @inject_parameters
+    def with_longterm_params(params: LongTermParams) -> None:
+        pass
+
+    @inject_parameters
+    def with_simulation_params(params: SimulationParams) -> None:
+        pass
+
+    cases = [
+        ("Parameters", _inject_by_scan(with_parameters.__wrapped__, None), with_parameters),
+        ("LongTermParams", _inject_by_scan(with_longterm_params.__wrapped__, LongTermParams), with_longterm_params),
+        (
+            "SimulationParams",
+            _inject_by_scan(with_simulation_params.__wrapped__, SimulationParams),
+            with_simulation_params,
+        ),
+    ]
+    with using_parameters(Parameters()):
+        rows = [(name, _overhead_ns(scan, plain), _overhead_ns(indexed, plain)) for name, scan, indexed in cases]
+
+    print("Overhead per call")
+    print_comparison(rows, before="scan", after="indexed", unit="ns")
+
+
+if __name__ == "__main__":
+    benchmark_injection()
@@ -0,0 +1,72 @@
+"""
+Measures the cost of deriving parameters for each value of a sensitivity sweep, and fingerprinting them
+(as caches do). `sweep_parameters` is compared with entering `updated_parameters` for each value, as done
+previously: revalidating the updates as a whole model, and serializing all of the parameters to fingerprint them.
+
+Run with `python -m benchmarks.parameter_sweep`.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+
+from ccm.base_parameters import BaseParameters
+from ccm.contexts import _find_in_model, get_parameters, sweep_parameters, using_parameters
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.fingerprints import fingerprint_data
+from ccm.world.longterm_params import LongTermParams
+
+from benchmarks.utils import print_comparison, time_call
+
+VALUES = 1_000
+
+
+def _updated_by_revalidation(field: str, value: Any, submodel: type[BaseParameters]) -> Parameters:
+    """Derives parameters the way `updated_parameters` used to: revalidating the updates as a whole model."""
+    params = get_parameters()
+    name, old_submodel = _find_in_model(params, submodel)
+    old_submodel.model_validate({field: value})
+    return params.model_copy(update={name: old_submodel.model_copy(update={field: value})})
+
+
+def _serialized_fingerprint(params: Parameters) -> str:
+    """Fingerprints parameters by serializing all of them, as done before fingerprints were incremental."""
+    return fingerprint_data(params.model_dump(mode="json"))
+
+
+def _sweep_by_revalidation(field: str, values: list, submodel: type[BaseParameters]) -> Callable[[], None]:
+    def sweep() -> None:
+        for value in values:
+            _serialized_fingerprint(_updated_by_revalidation(field, value, submodel))
+
+    return sweep
+
+
+def _sweep(field: str, values: list, submodel: type[BaseParameters]) -> Callable[[], None]:
+    def sweep() -> None:
+        for params in sweep_parameters(field, values, submodel):
+            params.fingerprint()
+
+    return sweep
+
+
+def benchmark_sweeps() -> None:
+    cases = [
+        ("simulations", "simulations", list(range(1_000, 1_000 + VALUES)), SimulationParams),
+        ("max_creditable_year", "max_creditable_year", list(range(1_000, 1_000 + VALUES)), LongTermParams),
+    ]
+    rows = []
+    with using_parameters(Parameters()):
+        for name, field, values, submodel in cases:
+            # Per derived parameters, in microseconds
+            before = time_call(_sweep_by_revalidation(field, values, submodel)) * 1000 / VALUES
+            after = time_call(_sweep(field, values, submodel)) * 1000 / VALUES
+            rows.append((name, before, after))
+
+    print(f"Deriving and fingerprinting parameters, per value of a sweep over {VALUES} values")
+    print_comparison(rows, before="revalidated", after="swept", unit="µs")
+
+
+if __name__ == "__main__":
+    benchmark_sweeps()
@@ -0,0 +1,93 @@
+"""
+Compares sampling DistributionSpecs through squigglepy with their compiled samplers,
+both for single specs and for whole intervention estimates.
+
+Run with `python -m benchmarks.samplers`.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+
+import ccm.utility.squigglepy_wrapper as sqw
+from benchmarks.utils import parameters_with_simulations, print_comparison, time_call
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.utility.models import (
+    BetaDistributionSpec,
+    CategoricalDistributionSpec,
+    ConfidenceDistributionSpec,
+    DistributionSpec,
+    GammaDistributionSpec,
+    UniformDistributionSpec,
+)
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+
+SPECS: dict[str, DistributionSpec] = {
+    "normal": ConfidenceDistributionSpec.norm(1, 10, lclip=2),
+    "lognormal": ConfidenceDistributionSpec.lognorm(1, 10, credibility=80),
+    "beta": BetaDistributionSpec.create(2, 5),
+    "gamma": GammaDistributionSpec(type="gamma", distribution="gamma", shape=2, scale=3, clip=(None, 10)),
+    "uniform": UniformDistributionSpec(type="uniform", distribution="uniform", range=(0, 1)),
+    "categorical": CategoricalDistributionSpec(
+        type="categorical", distribution="categorical", items=[(0.2, 1), (0.3, 2), (0.5, 3)]
+    ),
+}
+
+
+def _sample_with_squigglepy(self: DistributionSpec, n: int):
+    return np.asarray(sqw.sample(self.get_distribution(), n=n))
+
+
+@contextmanager
+def _uncompiled():
+    # Restores the behaviour from before samplers were compiled
+    compiled_sample = DistributionSpec.sample
+    DistributionSpec.sample = _sample_with_squigglepy  # type: ignore
+    try:
+        yield
+    finally:
+        DistributionSpec.sample = compiled_sample  # type: ignore
+
+
+def benchmark_specs(n: int) -> None:
+    rows = []
+    for name, spec in SPECS.items():
+        with _uncompiled():
+            before = time_call(partial(spec.sample, n), repeat=20)
+        after = time_call(partial(spec.sample, n), repeat=20)
+        rows.append((f"{name} (n={n:,})", before, after))
+    print_comparison(rows, before="squigglepy", after="compiled")
+
+
+def _estimate(intervention) -> None:
+    # A fresh generator keeps cached estimates from being reused
+    with using_rng():
+        intervention.estimate_dalys_per_1000()
+
+
+def benchmark_estimators(simulations: int) -> None:
+    interventions = {
+        "GHD": GhdIntervention(name="benchmark"),
+        "animal": AnimalIntervention(animal=Animal.CHICKEN),
+        "x-risk": XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+    }
+    rows = []
+    with using_parameters(parameters_with_simulations(simulations)):
+        for name, intervention in interventions.items():
+            with _uncompiled():
+                before = time_call(partial(_estimate, intervention))
+            after = time_call(partial(_estimate, intervention))
+            rows.append((f"{name} estimate (n={simulations:,})", before, after))
+    print_comparison(rows, before="squigglepy", after="compiled")
+
+
+if __name__ == "__main__":
+    for n in (1_000, 100_000):
+        benchmark_specs(n)
+        print()
+    benchmark_estimators(50_000)
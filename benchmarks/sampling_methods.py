@@ -0,0 +1,46 @@
+"""
+Compares how precisely each sampling method estimates the percentiles of an intervention's estimate,
+for a range of sample counts. Precision is measured as the error of the percentiles across repeated runs,
+relative to a large Monte Carlo reference run.
+
+Run with `python -m benchmarks.sampling_methods`.
+"""
+
+from typing import get_args
+
+import numpy as np
+
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.intervention import Intervention
+from ccm.interventions.intervention_definitions.all_interventions import get_intervention
+from ccm.parameters import Parameters
+from ccm.simulation_params import SamplingMethod, SimulationParams
+
+PERCENTILES = [25, 50, 75, 90, 95]
+REFERENCE_SIMULATIONS = 1_000_000
+REPEATS = 20
+
+
+def _percentiles(intervention: Intervention, simulations: int, sampling_method: SamplingMethod) -> np.ndarray:
+    params = Parameters(simulation_params=SimulationParams(simulations=simulations, sampling_method=sampling_method))
+    with using_parameters(params), using_rng():
+        samples = intervention.estimate_dalys_per_1000()
+    return samples.percentile(PERCENTILES)
+
+
+def benchmark_percentile_errors(name: str, intervention: Intervention) -> None:
+    reference = _percentiles(intervention, REFERENCE_SIMULATIONS, "monte carlo")
+    print(f"{name}: mean relative error of the {PERCENTILES} percentiles over {REPEATS} runs")
+    print(f"{'samples':>8}" + "".join(f"  {method:>16}" for method in get_args(SamplingMethod)))
+    for simulations in (1_000, 4_000, 16_000, 64_000):
+        errors = []
+        for sampling_method in get_args(SamplingMethod):
+            runs = np.array([_percentiles(intervention, simulations, sampling_method) for _ in range(REPEATS)])
+            errors.append(np.mean(np.abs(runs - reference) / np.abs(reference)))
+        print(f"{simulations:>8,}" + "".join(f"  {error:>16.4f}" for error in errors))
+    print()
+
+
+if __name__ == "__main__":
+    benchmark_percentile_errors("GiveWell Bar", get_intervention("GiveWell Bar"))
+    benchmark_percentile_errors("Generic Chicken Campaign", get_intervention("Generic Chicken Campaign"))
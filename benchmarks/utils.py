@@ -0,0 +1,39 @@
+"""Helpers shared by the benchmark scripts."""
+
+import time
+from collections.abc import Callable
+from statistics import median
+from typing import Any
+
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+
+
+def time_call(f: Callable[[], Any], repeat: int = 5) -> float:
+    """Returns the median wall time of calling `f`, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        timings.append((time.perf_counter() - start) * 1000)
+    return median(timings)
+
+
+def parameters_with_simulations(simulations: int) -> Parameters:
+    return Parameters(simulation_params=SimulationParams(simulations=simulations))
+
+
+def print_comparison(
+    rows: list[tuple[str, float, float]],
+    before: str = "before",
+    after: str = "after",
+    unit: str = "ms",
+) -> None:
+    """Prints a table comparing two timings (in milliseconds, unless another unit is given) for each named case."""
+    name_width = max(len(name) for name, _, _ in rows)
+    print(f"{'case':<{name_width}}  {before:>12}  {after:>12}  {'speedup':>8}")
+    for name, before_time, after_time in rows:
+        print(
+            f"{name:<{name_width}}  {before_time:>10.2f}{unit:<2}  {after_time:>10.2f}{unit:<2}  "
+            f"{before_time / after_time:>7.1f}x"
+        )
@@ -0,0 +1,71 @@
+"""
+Compares drawing the second (later) extinction of the years credit calculator by rejection, redrawing samples until
+they are later than the first extinction, with drawing them in a single draw from the conditional distribution.
+
+Rejection is slowest when later extinctions are unlikely: when the first extinction falls late in an era of high
+risk, or when the risk drops sharply after a short era.
+
+Run with `python -m benchmarks.years_credit`.
+"""
+
+from functools import partial
+
+import numpy as np
+
+import ccm.interventions.xrisk.impact.utils.years_credit_calculator as years_credit_calculator
+from ccm.contexts import using_parameters, using_rng
+from ccm.parameters import Parameters
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
+from ccm.world.longterm_params import DEFAULT_ERAS
+
+from benchmarks.utils import print_comparison, time_call
+
+SAMPLES = 10_000
+YEARS_EFFECTIVE = 30
+
+DEFAULT_LENGTHS = [era.get_length() for era in DEFAULT_ERAS]
+DEFAULT_RISKS = [era.get_annual_extinction_probability() for era in DEFAULT_ERAS]
+
+ERA_CONFIGURATIONS = {
+    "default eras": (DEFAULT_LENGTHS, DEFAULT_RISKS),
+    "default eras, 10x risk": (DEFAULT_LENGTHS, [risk * 10 for risk in DEFAULT_RISKS]),
+    # Late first extinctions are rare, but their later extinctions are rarer still
+    "steep first era": ([30, *DEFAULT_LENGTHS[1:]], [0.3, *DEFAULT_RISKS[1:]]),
+    "steep long first era": ([200, *DEFAULT_LENGTHS[1:]], [0.05, *DEFAULT_RISKS[1:]]),
+}
+
+
+def _higher_samples(get_higher_samples, distribution, lower_samples, max_value) -> None:
+    get_higher_samples(distribution, lower_samples, max_value)
+
+
+def benchmark_higher_samples() -> None:
+    rows = []
+    with using_parameters(Parameters()), using_rng(0):
+        for name, (lengths, risks) in ERA_CONFIGURATIONS.items():
+            distribution = YearsToExtinctionDistribution(lengths, risks)
+            lower_samples = distribution.sample(SAMPLES)
+            max_value = np.full(SAMPLES, YEARS_EFFECTIVE)
+            by_rejection = time_call(
+                partial(
+                    _higher_samples,
+                    years_credit_calculator._get_higher_samples_by_rejection,
+                    distribution,
+                    lower_samples,
+                    max_value,
+                ),
+                repeat=3,
+            )
+            conditional = time_call(
+                partial(
+                    _higher_samples, years_credit_calculator._get_higher_samples, distribution, lower_samples, max_value
+                )
+            )
+            rows.append((name, by_rejection, conditional))
+
+    print(f"Drawing later extinctions for {SAMPLES:,} samples, for interventions effective for {YEARS_EFFECTIVE} years")
+    print_comparison(rows, before="rejection", after="conditional")
+
+
+if __name__ == "__main__":
+    benchmark_higher_samples()
@@ -0,0 +1,154 @@
+"""
+Adaptive estimation: instead of drawing a fixed number of simulations, batches of simulations are drawn until
+the Monte Carlo standard error of the estimate is small enough relative to the estimate itself.
+
+Cheap, well-behaved estimates settle after a batch or two, while heavy-tailed ones get more batches,
+up to the maximum number of simulations in the SimulationParams.
+"""
+
+import math
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ccm.contexts import inject_parameters, spawn_rngs, using_rng
+from ccm.interventions.intervention import Intervention
+from ccm.research_projects.projects.project_assessment import ProjectAssessment
+from ccm.research_projects.projects.research_project import ResearchProject
+from ccm.simulation_params import SimulationParams
+from ccm.utility.sparse_samples import (
+    SparseSampleArray,
+    order_statistic,
+    percentile_with_zeros,
+    weighted_percentile_with_zeros,
+)
+
+T = TypeVar("T")
+
+
+class AdaptiveResult(Generic[T]):
+    """The result of an adaptive estimation, along with the relative standard error it achieved
+    and the number of batches of simulations it took.
+    """
+
+    def __init__(self, result: T, relative_error: float, batches: int) -> None:
+        self.result = result
+        self.relative_error = relative_error
+        self.batches = batches
+
+
+def relative_standard_error(
+    samples: NDArray[np.floating],
+    zeros: int,
+    percentiles: tuple[float, ...],
+    weights: NDArray[np.float64] | None = None,
+) -> float:
+    """Returns the largest standard error of the mean and of the given percentiles of the samples (padded with
+    the given number of zeros), relative to the estimates of the mean and the percentiles.
+
+    The standard error of a percentile is estimated without assuming a distribution, as half the distance between
+    the order statistics one binomial standard deviation below and above the percentile's rank. For weighted
+    samples, the binomial standard deviation is that of the effective number of samples (Kish's), and the
+    order statistics are weighted quantiles.
+    """
+    if weights is not None:
+        return _weighted_relative_standard_error(samples, zeros, percentiles, weights)
+    sorted_samples = np.sort(samples.astype(np.float64))
+    n = len(sorted_samples) + zeros
+    if n < 2:
+        return math.inf
+
+    mean = np.sum(sorted_samples) / n
+    variance = (np.sum((sorted_samples - mean) ** 2) + zeros * mean**2) / (n - 1)
+    estimates_and_errors = [(mean, math.sqrt(variance / n))]
+    for percentile in percentiles:
+        q = percentile / 100
+        rank_error = math.sqrt(n * q * (1 - q))
+        lower = order_statistic(sorted_samples, zeros, max(math.floor(n * q - rank_error), 0))
+        upper = order_statistic(sorted_samples, zeros, min(math.ceil(n * q + rank_error), n - 1))
+        estimates_and_errors.append((percentile_with_zeros(sorted_samples, zeros, q), (upper - lower) / 2))
+
+    return _largest_relative_error(estimates_and_errors)
+
+
+def _weighted_relative_standard_error(
+    samples: NDArray[np.floating],
+    zeros: int,
+    percentiles: tuple[float, ...],
+    weights: NDArray[np.float64],
+) -> float:
+    samples = samples.astype(np.float64)
+    total_weight = np.sum(weights) + zeros
+    effective_n = total_weight**2 / (np.sum(weights**2) + zeros)
+    if effective_n < 2:
+        return math.inf
+
+    mean = np.dot(samples, weights) / total_weight
+    # (The standard error of a ratio estimator, whose denominator is the total weight)
+    mean_error = math.sqrt(np.dot(weights**2, (samples - mean) ** 2) + zeros * mean**2) / total_weight
+    estimates_and_errors = [(mean, mean_error)]
+    for percentile in percentiles:
+        q = percentile / 100
+        q_error = math.sqrt(q * (1 - q) / effective_n)
+        lower, estimate, upper = weighted_percentile_with_zeros(
+            samples, weights, zeros, [max(q - q_error, 0), q, min(q + q_error, 1)]
+        )
+        estimates_and_errors.append((estimate, (upper - lower) / 2))
+    return _largest_relative_error(estimates_and_errors)
+
+
+def _largest_relative_error(estimates_and_errors: list[tuple[float, float]]) -> float:
+    relative_errors = [
+        0.0 if error == 0 else abs(error / estimate) if estimate != 0 else math.inf
+        for estimate, error in estimates_and_errors
+    ]
+    return max(relative_errors)
+
+
+def _draw_batches(
+    params: SimulationParams,
+    draw_batch: Callable[[], T],
+    get_samples: Callable[[list[T]], SparseSampleArray],
+) -> tuple[list[T], float]:
+    # The first batch is drawn with the generator of the context, so that a single batch gives the same result
+    # as drawing without this wrapper. Later batches get generators of their own, so that cached estimates of
+    # the first batch aren't reused.
+    batches = [draw_batch()]
+    while True:
+        samples = get_samples(batches)
+        relative_error = relative_standard_error(
+            samples.data, samples.num_zeros, params.tolerance_percentiles, samples.weights
+        )
+        if params.tolerance is None or relative_error <= params.tolerance:
+            break
+        if (len(batches) + 1) * params.simulations > params.max_simulations:
+            break
+        with using_rng(spawn_rngs(1)[0]):
+            batches.append(draw_batch())
+    return batches, relative_error
+
+
+@inject_parameters
+def estimate_dalys_per_1000(params: SimulationParams, intervention: Intervention) -> AdaptiveResult[SparseSampleArray]:
+    """Estimates the DALYs per $1000 of the intervention, drawing batches of simulations until the tolerance
+    of the SimulationParams is met. Returns the samples of all batches combined.
+    """
+    batches, relative_error = _draw_batches(params, intervention.estimate_dalys_per_1000, SparseSampleArray.concatenate)
+    result = batches[0] if len(batches) == 1 else SparseSampleArray.concatenate(batches)
+    return AdaptiveResult(result, relative_error, len(batches))
+
+
+@inject_parameters
+def assess_project(params: SimulationParams, project: ResearchProject) -> AdaptiveResult[ProjectAssessment]:
+    """Assesses the research project, drawing batches of simulations until the net impact meets the tolerance
+    of the SimulationParams. Returns the assessment of all batches combined.
+    """
+
+    def get_samples(batches: list[ProjectAssessment]) -> SparseSampleArray:
+        return SparseSampleArray.concatenate([batch.net_impact_DALYs for batch in batches])
+
+    batches, relative_error = _draw_batches(params, project.assess_project, get_samples)
+    assessment = batches[0] if len(batches) == 1 else ProjectAssessment.concatenate(batches)
+    return AdaptiveResult(assessment, relative_error, len(batches))
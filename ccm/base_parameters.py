@@ -1,9 +1,19 @@
-from typing import Annotated, TypeAlias, TypeVar, get_args
+import functools
+from collections.abc import Iterator, Set
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import FunctionType, MethodType
+from typing import TYPE_CHECKING, Annotated, Any, TypeAlias, TypeVar, get_args
 
 from frozendict import frozendict
 from pydantic import BaseModel, ConfigDict, GetPydanticSchema, PlainSerializer
 from pydantic_core import core_schema
 
+from ccm.utility.fingerprints import field_fingerprints, fingerprint_from_fields
+
+if TYPE_CHECKING:
+    from ccm.contexts import ReadSet
+
 KT, KV = TypeVar("KT"), TypeVar("KV")
 
 FrozenDict: TypeAlias = Annotated[
@@ -18,6 +28,21 @@
 ]
 
 
+# The read set of the current context, while the parameters it reads are recorded (see `recording_reads`).
+# It is defined here rather than in ccm.contexts because views of parameters record the reads of their fields.
+READS_VAR: ContextVar["ReadSet | None"] = ContextVar("reads_var", default=None)
+
+
+@contextmanager
+def paused_reads() -> Iterator[None]:
+    """Stops recording reads of parameters for the duration of the context manager, e.g. while copying them."""
+    token = READS_VAR.set(None)
+    try:
+        yield
+    finally:
+        READS_VAR.reset(token)
+
+
 class BaseParameters(BaseModel, frozen=True):
     model_config: ConfigDict = ConfigDict(
         frozen=True,  # This repetition is to enable inheritance
@@ -34,3 +59,125 @@ def is_top_params_obj(cls) -> bool:
         """Read-only property that informs whether the object is a top-level Parameters object"""
 
         return False
+
+    def fingerprint(self) -> str:
+        """Structural fingerprint of the parameters, the same for equal parameters (see ccm.utility.fingerprints)."""
+        # Serializing the parameters isn't a read of them by the model
+        with paused_reads():
+            return fingerprint_from_fields(self, self.field_fingerprints)
+
+    def field_fingerprints(
+        self, derived_from: "BaseParameters | None" = None, changed: Set[str] = frozenset()
+    ) -> dict[str, str]:
+        """
+        Returns the fingerprints of the fields of the parameters, memoized. Submodels are fingerprinted as a whole.
+        If the parameters were derived from others by changing the given fields only (see `sweep_parameters`),
+        the fingerprints of the others are taken from the parameters they were derived from.
+        """
+        submodel_names = _submodel_names(type(self))
+        with paused_reads():
+            return {
+                **field_fingerprints(self, exclude=submodel_names, derived_from=derived_from, changed=changed),
+                **{name: getattr(self, name).fingerprint() for name in submodel_names},
+            }
+
+
+class RecordedParameters:
+    """
+    A view of a parameters model that records the reads of its fields into the read set of the context, if any.
+    `get_parameters` hands out views while reads are recorded (see `ccm.contexts.recording_reads`), so that the
+    parameters themselves are read at full speed otherwise. Views pass for the model in `isinstance` checks,
+    comparisons and hashing.
+
+    Fields that hold submodels are viewed in turn, so that the reads of their own fields are recorded. Methods of
+    the parameters classes are bound to the view, so that the fields they read are recorded. Other attributes of the
+    model (e.g. Pydantic's `model_dump`, or `__dict__`) count as reads of all of its fields.
+    """
+
+    __slots__ = ("_model",)
+
+    def __init__(self, model: BaseParameters):
+        object.__setattr__(self, "_model", model)
+
+    @property  # type: ignore[misc]
+    def __class__(self) -> type[BaseParameters]:  # type: ignore[override]
+        return type(self._model)
+
+    @property
+    def model(self) -> BaseParameters:
+        return object.__getattribute__(self, "_model")
+
+    def __getattr__(self, name: str) -> Any:
+        model = self.model
+        model_class = type(model)
+        reads = READS_VAR.get()
+        if name in model_class.model_fields:
+            value = getattr(model, name)
+            if isinstance(value, BaseParameters):
+                return RecordedParameters(value)
+            if reads is not None:
+                reads.fields.add((model_class, name))
+            return value
+        attribute = _attribute_of_parameters_class(model_class, name)
+        if isinstance(attribute, FunctionType):
+            return MethodType(attribute, self)
+        if isinstance(attribute, property) and attribute.fget is not None:
+            return attribute.fget(self)
+        if reads is not None and attribute is None and name not in _CLASS_ATTRIBUTES:
+            reads.fields.add((model_class, None))
+        # Other attributes of the parameters classes (e.g. `fingerprint`) don't read the fields of the model
+        return getattr(model, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.model, name, value)
+
+    # Hashing and comparing parameters (e.g. as cache keys) isn't a read of them by the model
+
+    def __eq__(self, other: Any) -> bool:
+        return self.model == (other.model if isinstance(other, RecordedParameters) else other)
+
+    def __hash__(self) -> int:
+        return hash(self.model)
+
+    def __repr__(self) -> str:
+        return repr(self.model)
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        reads = READS_VAR.get()
+        if reads is not None:
+            reads.fields.add((type(self.model), None))
+        return iter(self.model)
+
+
+_NOT_A_READ = object()
+
+# Attributes of Pydantic models that describe their class rather than the values of their fields
+_CLASS_ATTRIBUTES = frozenset({"model_fields", "model_config", "model_computed_fields"})
+
+
+@functools.cache
+def _attribute_of_parameters_class(model_class: type[BaseParameters], name: str) -> Any:
+    """
+    The attribute with the given name, as defined by a parameters class or BaseParameters (rather than
+    by Pydantic), or None. Static and class methods, and attributes of BaseParameters (e.g. `fingerprint`),
+    are returned as `_NOT_A_READ`, as they don't read the fields of the model.
+    """
+    for klass in model_class.__mro__:
+        if name in vars(klass):
+            attribute = vars(klass)[name]
+            if klass is BaseParameters or isinstance(attribute, (staticmethod, classmethod)):
+                return _NOT_A_READ
+            return attribute
+        if klass is BaseParameters:
+            return None
+    return None
+
+
+@functools.cache
+def _submodel_names(model_class: type[BaseParameters]) -> frozenset[str]:
+    """Names of the fields of a parameters class that hold parameters models themselves."""
+    return frozenset(
+        name
+        for name, field in model_class.model_fields.items()
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseParameters)
+    )
@@ -0,0 +1,154 @@
+"""
+Estimates of the whole catalogue of interventions, fanned out across processes.
+
+Each intervention is estimated in a task of its own, with a generator spawned for it from the generator of the
+context (see `spawn_rngs`), so that the results don't depend on how the tasks are scheduled across workers.
+Tasks send back SampleSummaries of their estimates (see `ccm.utility.summaries`) rather than the samples,
+which can number in the millions for each intervention, along with the time the estimate took. Other estimates
+of the catalogue, such as those of the snapshot of the default results (see `ccm.snapshot`), are fanned out
+the same way with `map_catalogue`.
+
+Run with `python -m ccm.catalogue --help` to print a summary table of the catalogue.
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, TypeVar
+
+import numpy as np
+
+from ccm.contexts import get_parameters, get_rng, using_parameters, using_rng
+from ccm.interventions.intervention import Intervention
+from ccm.interventions.intervention_definitions.all_interventions import (
+    get_all_interventions,
+    get_unscaled_interventions,
+)
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.summaries import SampleSummary
+
+T = TypeVar("T")
+
+# Percentiles reported in the summary table
+TABLE_PERCENTILES = (5, 50, 95)
+
+
+class CatalogueResult(NamedTuple):
+    """The summarized estimate of the DALYs per $1000 of an intervention, and how long it took, in seconds."""
+
+    name: str
+    summary: SampleSummary
+    seconds: float
+
+
+def run_catalogue(
+    interventions: Sequence[Intervention] | None = None,
+    max_workers: int | None = None,
+    on_result: Callable[[CatalogueResult], None] | None = None,
+) -> list[CatalogueResult]:
+    """
+    Estimates the DALYs per $1000 of each intervention (by default, of all interventions) with the parameters
+    of the context, in a pool of `max_workers` processes (by default, one per CPU). With no workers, the
+    interventions are estimated in this process, e.g. to warm up its caches.
+
+    Returns the results in the order of the interventions. `on_result` is called with each result as soon as
+    it is ready, e.g. to report progress.
+    """
+    if interventions is None:
+        interventions = get_all_interventions()
+    # Seeds rather than generators are sent, as generators don't keep their seed sequence when pickled
+    seeds = get_rng().bit_generator.seed_seq.spawn(len(interventions))  # type: ignore[attr-defined]
+    return map_catalogue(_summarize, interventions, seeds, max_workers, on_result)
+
+
+def map_catalogue(
+    estimate: Callable[[Intervention], T],
+    interventions: Sequence[Intervention],
+    seeds: Sequence[int | np.random.SeedSequence],
+    max_workers: int | None = None,
+    on_result: Callable[[T], None] | None = None,
+) -> list[T]:
+    """
+    Applies `estimate` to each intervention with the parameters of the context and a generator seeded with the seed
+    of the intervention, in a pool of `max_workers` processes (by default, one per CPU), or in this process with
+    no workers. `estimate` is sent to the workers, so it must be defined at the top level of a module.
+
+    Returns the results in the order of the interventions, and calls `on_result` with each as soon as it is ready.
+    """
+    params = get_parameters()
+    if max_workers == 0:
+        results = []
+        for intervention, seed in zip(interventions, seeds):
+            results.append(_apply(estimate, params, seed, intervention))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    # Workers are spawned rather than forked, as the caller may have threads (e.g. those of the API) whose locks
+    # a forked worker would inherit
+    with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(_apply, estimate, params, seed, intervention)
+            for intervention, seed in zip(interventions, seeds)
+        ]
+        if on_result is not None:
+            for future in futures:
+                future.add_done_callback(lambda done: on_result(done.result()))
+        return [future.result() for future in futures]
+
+
+def _apply(
+    estimate: Callable[[Intervention], T],
+    params: Parameters,
+    seed: int | np.random.SeedSequence,
+    intervention: Intervention,
+) -> T:
+    with using_parameters(params), using_rng(seed):
+        return estimate(intervention)
+
+
+def _summarize(intervention: Intervention) -> CatalogueResult:
+    start = time.perf_counter()
+    samples = intervention.estimate_dalys_per_1000()
+    seconds = time.perf_counter() - start
+    summary = SampleSummary.from_samples(samples.data, samples.num_zeros, weights=samples.weights)
+    return CatalogueResult(intervention.name, summary, seconds)
+
+
+def format_table(results: Sequence[CatalogueResult]) -> str:
+    """Formats the results as a table of the mean and percentiles of each estimate, and its timing."""
+    name_width = max((len(result.name) for result in results), default=4)
+    percentile_headers = "".join(f"{f'p{percentile}':>12}" for percentile in TABLE_PERCENTILES)
+    lines = [f"{'name':<{name_width}}{'mean':>12}{percentile_headers}{'seconds':>10}"]
+    for name, summary, seconds in results:
+        percentiles = summary.quantile(np.array(TABLE_PERCENTILES) / 100)
+        columns = "".join(f"{value:>12.4g}" for value in (summary.mean, *percentiles))
+        lines.append(f"{name:<{name_width}}{columns}{seconds:>10.2f}")
+    total_seconds = sum(result.seconds for result in results)
+    lines.append(f"{'total':<{name_width}}{'':>{12 * (len(TABLE_PERCENTILES) + 1)}}{total_seconds:>10.2f}")
+    return "\n".join(lines)
+
+
+def main(args: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Estimates all interventions of the catalogue in parallel.")
+    parser.add_argument("--simulations", type=int, default=SimulationParams().simulations)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="0 to estimate in this process")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--unscaled", action="store_true", help="leave out the scaled interventions")
+    options = parser.parse_args(args)
+
+    interventions = get_unscaled_interventions() if options.unscaled else get_all_interventions()
+    parameters = Parameters(simulation_params=SimulationParams(simulations=options.simulations))
+    start = time.perf_counter()
+    with using_parameters(parameters), using_rng(options.seed):
+        results = run_catalogue(interventions, max_workers=options.workers)
+    print(format_table(results))
+    print(f"Estimated {len(results)} interventions in {time.perf_counter() - start:.2f}s of wall time")
+
+
+if __name__ == "__main__":
+    main()
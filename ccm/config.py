@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+# Default number of simulations; the number used for each estimate is set through SimulationParams
 SIMULATIONS = 50_000
 CURRENT_YEAR = 2023
 
@@ -14,6 +16,8 @@
 OUTPUT_DIR = BASE_DIR / "output"
 OUTPUT_CSVS_DIR = OUTPUT_DIR / "csvs"
 OUTPUT_PLOTS_DIR = OUTPUT_DIR / "plots"
+# Results with the default parameters, served by the API (see ccm.snapshot)
+DEFAULT_RESULTS_SNAPSHOT = Path(os.getenv("DEFAULT_RESULTS_SNAPSHOT", OUTPUT_DIR / "snapshots" / "default_results.npz"))
 
 RISK_WEIGHTER = "WLU - aggressive"  # EU, MIN, MAX, WLU - aggressive, WLU - symmetric
 
@@ -1,13 +1,18 @@
 import functools
-from collections.abc import Callable
+import hashlib
+from collections.abc import Callable, Hashable, Iterable, Iterator
 from contextlib import contextmanager
 from contextvars import ContextVar, Token
 from inspect import Signature, ismethod, signature
-from typing import Any, Concatenate, ParamSpec, TYPE_CHECKING, TypeVar, overload
+from typing import Annotated, Any, Concatenate, NamedTuple, ParamSpec, TYPE_CHECKING, TypeVar, overload
 
+import numpy as np
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from pyparsing import Generator
 
-from ccm.base_parameters import BaseParameters
+from ccm.base_parameters import READS_VAR, BaseParameters, RecordedParameters, paused_reads
+from ccm.utility.bounded_cache import BoundedCache, freeze, nbytes
+from ccm.utility.fingerprints import fingerprint_data
 
 
 if TYPE_CHECKING:
@@ -18,10 +23,51 @@
 # see https://docs.python.org/3/library/contextvars.html
 PARAMS_VAR: ContextVar["ModelParameters"] = ContextVar("config_var")
 
+# The generator used outside of `using_rng` blocks, whose draws are never memoized, so that they keep advancing
+_PROCESS_RNG = np.random.default_rng()
+
+# Context variable used to access the random number generator that all samples are drawn from
+# Outside of a `using_rng` block, a process-wide generator is used
+RNG_VAR: ContextVar[np.random.Generator] = ContextVar("rng_var", default=_PROCESS_RNG)
+
+# Anything that can be used to seed a random number generator
+Seed = int | np.random.SeedSequence | np.random.Generator | None
+
+
+class _Draws(NamedTuple):
+    """The stream that the memoized draws of a context are keyed by and derived from"""
+
+    stream: Hashable
+    # Streams seeded from fresh entropy (and the streams derived from them) are never drawn from again by other
+    # contexts, so their draws are kept for the context alone, and dropped with it, rather than in the memos
+    local: BoundedCache | None
+
+
+# Context variable used to access the draws of the generator of the context (None for the process-wide generator)
+DRAWS_VAR: ContextVar[_Draws | None] = ContextVar("draws_var", default=None)
+
+# Context variable used to access the draws of the world, when they are shared by the estimates of several
+# interventions (see `sharing_world_draws`)
+WORLD_VAR: ContextVar[_Draws | None] = ContextVar("world_var", default=None)
+
 # This enables the functions to behave generically
 ArbitraryParamsModel = TypeVar("ArbitraryParamsModel", bound=BaseParameters)
 
 
+@functools.cache
+def _submodel_field_names(model_class: type[BaseParameters]) -> dict[type, str]:
+    """
+    Indexes the fields of a parameters class by their type, so that submodels can be looked up without
+    iterating over the fields of the parameters object (which is slow for Pydantic models).
+    Built once per parameters class.
+    """
+    field_names: dict[type, str] = {}
+    for name, field in model_class.model_fields.items():
+        if isinstance(field.annotation, type):
+            field_names.setdefault(field.annotation, name)
+    return field_names
+
+
 def _find_in_model(
     model: "ModelParameters",
     requested_model: type[ArbitraryParamsModel],
@@ -30,9 +76,14 @@ def _find_in_model(
     Given the class of the requested parameter model, returns the
     attribute name instance of that class in the currently valid parameters object.
     """
-    for name, value in model:
-        if isinstance(value, requested_model):
-            return name, value
+    name = _submodel_field_names(type(model)).get(requested_model)
+    if name is not None:
+        return name, getattr(model, name)
+    # Fall back to a scan, for submodels whose field is annotated with a subclass of the requested model
+    with paused_reads():
+        for name, value in model:
+            if isinstance(value, requested_model):
+                return name, value
     raise LookupError(f"No object of type {requested_model} found in Parameters. Please make sure it exists.")
 
 
@@ -82,21 +133,334 @@ def updated_parameters(
         >>>     with updated_parameters({"number": 3}):
         >>>         assert get_parameters() == MockParameters(number=3)  # A new object is returned
     """
-    old_params = get_parameters()
-    if submodel:
-        name, old_submodel = _find_in_model(old_params, submodel)
-        # Validate the updates
-        old_submodel.model_validate(updates)
-        # Perform a granular update
-        updated_submodel = old_submodel.model_copy(update=updates)
-        updated_params = old_params.model_copy(update={name: updated_submodel})
-        yield from _update_params(updated_params)
-    else:
-        # Validate the updates
-        old_params.model_validate(updates)
-        # Perform a granular update
-        updated_params = old_params.model_copy(update=updates)
-        yield from _update_params(updated_params)
+    # Copying the parameters doesn't read them
+    with paused_reads():
+        old_params = get_parameters()
+        if submodel:
+            name, old_submodel = _find_in_model(old_params, submodel)
+            # Perform a granular update, validating only the updated fields
+            updated_submodel = old_submodel.model_copy(update=_validate_updates(type(old_submodel), updates))
+            updated_params = old_params.model_copy(update={name: updated_submodel})
+        else:
+            updated_params = old_params.model_copy(update=_validate_updates(type(old_params), updates))
+    yield from _update_params(updated_params)
+
+
+def sweep_parameters(
+    field: str,
+    values: Iterable[Any],
+    submodel: type[BaseParameters] | None = None,
+) -> Iterator["ModelParameters"]:
+    """
+    Yields copies of the parameters of the current context with the given attribute of the given parameters
+    model (by default, the Parameters model) set to each of the values in turn, e.g. for sensitivity analyses.
+
+    This is much cheaper per value than entering `updated_parameters` for each: all values are validated
+    up front, against the type of the attribute alone. Each copy shares all of the unchanged submodels with
+    the parameters of the context, and is fingerprinted from the fingerprints of their fields, but the changed one.
+
+    Examples:
+        >>> for params in sweep_parameters("simulations", [1_000, 10_000], SimulationParams):
+        >>>     with using_parameters(params):
+        >>>         ...
+    """
+    with paused_reads():
+        base_params = get_parameters()
+        name, base_submodel = _find_in_model(base_params, submodel) if submodel else (None, base_params)
+        model_class = type(base_submodel)
+        validated_values = [_validate_updates(model_class, {field: value})[field] for value in values]
+
+    for value in validated_values:
+        with paused_reads():
+            params = base_submodel.model_copy(update={field: value})
+            # Only the changed field needs to be serialized to fingerprint the copy
+            params.field_fingerprints(derived_from=base_submodel, changed={field})
+            if name is not None:
+                params = base_params.model_copy(update={name: params})
+        yield params
+
+
+@functools.cache
+def _field_adapter(model_class: type[BaseParameters], field: str) -> TypeAdapter:
+    """Builds a validator for values of the field of a parameters class, with the constraints of the field."""
+    field_info = model_class.model_fields[field]
+    annotation = field_info.annotation
+    if field_info.metadata:
+        annotation = Annotated[(annotation, *field_info.metadata)]  # type: ignore[assignment]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return TypeAdapter(annotation)
+    return TypeAdapter(annotation, config=model_class.model_config)
+
+
+def _validate_updates(model_class: type[BaseParameters], updates: dict[str, Any]) -> dict[str, Any]:
+    """Validates updates to attributes of a parameters class, returning the validated values."""
+    unknown_fields = updates.keys() - model_class.model_fields.keys()
+    if unknown_fields:
+        raise ValidationError.from_exception_data(
+            model_class.__name__,
+            [{"type": "extra_forbidden", "loc": (field,), "input": updates[field]} for field in sorted(unknown_fields)],
+        )
+    return {field: _field_adapter(model_class, field).validate_python(value) for field, value in updates.items()}
+
+
+@contextmanager
+def using_rng(seed: Seed = None) -> Generator[np.random.Generator, None, None]:
+    """
+    Provides a random number generator to the context for the duration of the context manager.
+    All sampling (including squigglepy's, through `ccm.utility.squigglepy_wrapper`) draws from this generator,
+    so that running the model with the same Parameters object and the same seed always produces the same samples.
+
+    If an integer or SeedSequence is given, a new generator is seeded from it. If a generator is given,
+    it is used as-is. If nothing is given, a new generator is seeded from fresh entropy, which still
+    keeps the samples of concurrent contexts (e.g. API requests) from interleaving.
+
+    Examples:
+        >>> with using_rng(42):
+        >>>     first = get_rng().random()
+        >>> with using_rng(42):
+        >>>     assert get_rng().random() == first
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    draws = _draws_of(rng, seed)
+    token: Token[np.random.Generator] = RNG_VAR.set(rng)
+    draws_token = DRAWS_VAR.set(draws)
+    try:
+        yield rng
+    finally:
+        DRAWS_VAR.reset(draws_token)
+        RNG_VAR.reset(token)
+
+
+def get_rng() -> np.random.Generator:
+    """Returns the random number generator of the current context."""
+    return RNG_VAR.get()
+
+
+def spawn_rngs(n: int) -> list[np.random.Generator]:
+    """
+    Returns `n` independent generators derived from the generator of the current context,
+    e.g. to hand each parallel worker its own stream. The result is deterministic if the
+    current generator was seeded.
+    """
+    return get_rng().spawn(n)
+
+
+def stream_key(rng: np.random.Generator) -> Hashable | None:
+    """
+    Returns a hashable key of the stream of the generator, or None if it wasn't seeded from a SeedSequence,
+    or is the process-wide generator (whose draws are meant to differ from one call to the next).
+    Generators seeded alike (e.g. with the seed of an API request), or spawned alike, have the same stream.
+    """
+    seed_seq = rng.bit_generator.seed_seq
+    if rng is _PROCESS_RNG or not isinstance(seed_seq, np.random.SeedSequence):
+        return None
+    entropy = seed_seq.entropy
+    return (tuple(entropy) if isinstance(entropy, list | tuple) else entropy, seed_seq.spawn_key)
+
+
+def _draws_of(rng: np.random.Generator, seed: Seed) -> _Draws | None:
+    stream = stream_key(rng)
+    if stream is None:
+        return None
+    if seed is None:
+        return _Draws(stream, BoundedCache(DEFAULT_MEMO_MAX_BYTES))
+    # Generators and seeds derived from an unseeded stream (e.g. by `spawn_rngs` or `derived_seed`), which have
+    # its entropy, are no more seeded than it is, and keep their draws along with its
+    entropy, _ = stream  # type: ignore[misc]
+    for context_draws in (WORLD_VAR.get(), DRAWS_VAR.get()):
+        if context_draws is not None and context_draws.local is not None and context_draws.stream[0] == entropy:
+            return _Draws(stream, context_draws.local)
+    if entropy == _PROCESS_RNG.bit_generator.seed_seq.entropy:  # type: ignore[attr-defined]
+        return _Draws(stream, BoundedCache(DEFAULT_MEMO_MAX_BYTES))
+    return _Draws(stream, None)
+
+
+def derived_seed(stream: Hashable, label: str) -> np.random.SeedSequence:
+    """
+    Returns a child of the stream (see `stream_key`) for what the label names, in the manner of
+    `SeedSequence.spawn`, so that what is drawn for it doesn't depend on what else is drawn from the stream.
+    """
+    entropy, spawn_key = stream  # type: ignore[misc]
+    digest = hashlib.sha256(label.encode()).digest()
+    words = tuple(int.from_bytes(digest[i : i + 4], "little") for i in range(0, 16, 4))
+    return np.random.SeedSequence(entropy, spawn_key=(*spawn_key, *words))
+
+
+@contextmanager
+def sharing_world_draws(seed: Seed = None) -> Generator[Hashable, None, None]:
+    """
+    Shares the samples of the world (e.g. the populations per star, or the moral weights of animals) between
+    all that is estimated in the context, instead of drawing them for each estimate. Estimates of several
+    interventions then model the same worlds, and the world is only sampled once.
+
+    Samples of the world are drawn by functions memoized with `inject_parameters_with_memo(per_rng=True)`.
+    In the context, they are keyed by the stream of the given seed rather than by the stream of the generator of
+    the caller, and drawn from a stream of their own derived from it. If no seed is given, the stream of the
+    generator of the context is used (or, for the process-wide generator, a stream spawned from it).
+
+    Examples:
+        >>> with using_rng(42), sharing_world_draws():
+        >>>     with using_rng(1):
+        >>>         speeds = sample_expansion_speeds(1000)
+        >>>     with using_rng(2):
+        >>>         assert sample_expansion_speeds(1000) is speeds
+    """
+    if seed is None:
+        seed = get_rng() if get_rng() is not _PROCESS_RNG else get_rng().spawn(1)[0]
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    draws = _draws_of(rng, seed)
+    if draws is None:
+        raise ValueError("World draws can only be shared from a generator seeded from a SeedSequence")
+    token = WORLD_VAR.set(draws)
+    try:
+        yield draws.stream
+    finally:
+        WORLD_VAR.reset(token)
+
+
+def get_world_stream() -> Hashable | None:
+    """Returns the stream that samples of the world are drawn from in the context, if they are shared."""
+    draws = WORLD_VAR.get()
+    return None if draws is None else draws.stream
+
+
+def draws_are_memoized() -> bool:
+    """
+    Returns whether functions that sample, memoized with `inject_parameters_with_memo(per_rng=True)`, keep their
+    samples in the context, rather than drawing them anew on each call (as with the process-wide generator).
+    """
+    return (WORLD_VAR.get() or DRAWS_VAR.get()) is not None
+
+
+class ReadSet:
+    """
+    The parameters read in a context (see `recording_reads`): the classes of the submodels requested through
+    `get_parameters` and `inject_parameters`, and the fields read from parameters models, by model class.
+    A field of None stands for all the fields of the model.
+    """
+
+    def __init__(self):
+        self.submodels: set[type[BaseParameters]] = set()
+        self.fields: set[tuple[type[BaseParameters], str | None]] = set()
+
+    def update(self, other: "ReadSet") -> None:
+        self.submodels |= other.submodels
+        self.fields |= other.fields
+
+    def dependencies(self, params: "ModelParameters") -> list[str]:
+        """Returns the sorted dotted paths of the fields read within the given parameters,
+        e.g. "longterm_params.risk_eras", or the path of the model if all of its fields were read."""
+        return sorted({".".join(path) for path, _, _ in self._resolve(params)})
+
+    def fingerprint(self, params: "ModelParameters") -> str:
+        """
+        Returns the fingerprint of the values that the fields read have in the given parameters.
+        Results computed in a context that read these fields are the same for all parameters with the same
+        fingerprint (given everything else the computation depends on, such as the generator), so they can be
+        cached under it rather than under the fingerprint of the whole parameters.
+        """
+        # The memoized fingerprints of the parameters are used, so that fingerprinting a read set again for the
+        # same parameters (as caches do on each lookup) doesn't serialize them again
+        with paused_reads():
+            return fingerprint_data(
+                {
+                    ".".join(path): model.fingerprint() if field is None else model.field_fingerprints()[field]
+                    for path, model, field in self._resolve(params)
+                }
+            )
+
+    def replay(self) -> None:
+        """Adds these reads to the reads being recorded, if any, e.g. when a result computed with them is reused."""
+        current_reads = READS_VAR.get()
+        if current_reads is not None:
+            current_reads.update(self)
+
+    def _resolve(self, params: "ModelParameters") -> list[tuple[tuple[str, ...], BaseParameters, str | None]]:
+        # Each read as its path, the model that holds it and its field
+        resolved = []
+        with paused_reads():
+            for model_class, field in self.fields:
+                model_path = _submodel_path(type(params), model_class)
+                model = functools.reduce(getattr, model_path, params)
+                resolved.append((model_path if field is None else (*model_path, field), model, field))
+        return resolved
+
+
+@functools.cache
+def _submodel_paths(model_class: type[BaseParameters]) -> dict[type[BaseParameters], tuple[str, ...]]:
+    """Indexes the (possibly nested) submodels of a parameters class by their path of field names."""
+    paths: dict[type[BaseParameters], tuple[str, ...]] = {model_class: ()}
+    for name, field in model_class.model_fields.items():
+        if isinstance(field.annotation, type) and issubclass(field.annotation, BaseParameters):
+            for submodel, path in _submodel_paths(field.annotation).items():
+                paths.setdefault(submodel, (name, *path))
+    return paths
+
+
+def _submodel_path(model_class: type[BaseParameters], submodel: type[BaseParameters]) -> tuple[str, ...]:
+    paths = _submodel_paths(model_class)
+    if submodel in paths:
+        return paths[submodel]
+    # Submodels whose field is annotated with a superclass of theirs
+    for annotated_submodel, path in paths.items():
+        if issubclass(submodel, annotated_submodel):
+            return path
+    raise LookupError(f"No object of type {submodel} found in {model_class}.")
+
+
+@contextmanager
+def recording_reads() -> Generator[ReadSet, None, None]:
+    """
+    Records the parameters read for the duration of the context manager, including in nested contexts
+    and (replayed) by memoized functions, into the read set it provides. Reads are also added to the read set
+    of an enclosing `recording_reads`, if any.
+
+    Examples:
+        >>> with using_parameters(Parameters()), recording_reads() as reads:
+        >>>     GhdIntervention(name="test").estimate_dalys_per_1000()
+        >>> reads.dependencies(Parameters())
+            ['ghd_intervention_params.adjust_for_xrisk', 'longterm_params.risk_eras', ...]
+    """
+    reads = ReadSet()
+    token = READS_VAR.set(reads)
+    try:
+        yield reads
+    finally:
+        READS_VAR.reset(token)
+        enclosing_reads = READS_VAR.get()
+        if enclosing_reads is not None:
+            enclosing_reads.update(reads)
+
+
+def _recording_reads_of(f: Callable) -> Callable:
+    """
+    Wraps a function to be cached so that it returns its result along with the reads it made, if reads are
+    being recorded (or None), so that they can be replayed when the result is taken from the cache.
+    """
+
+    @functools.wraps(f)
+    def f_recording(*args, **kwargs):
+        if READS_VAR.get() is None:
+            return f(*args, **kwargs), None
+        with recording_reads() as reads:
+            return f(*args, **kwargs), reads
+
+    return f_recording
+
+
+def _replay_reads(reads: ReadSet | None, args: tuple) -> None:
+    """Adds the reads of a cached result to the reads being recorded, if any."""
+    current_reads = READS_VAR.get()
+    if current_reads is None:
+        return
+    if reads is not None:
+        reads.replay()
+        return
+    # The result was computed while reads weren't recorded, so all of the parameters it was given count as read
+    for arg in args:
+        if isinstance(arg, BaseParameters):
+            current_reads.submodels.add(arg.__class__)
+            current_reads.fields.add((arg.__class__, None))
 
 
 def get_parameters(
@@ -127,15 +491,16 @@ def get_parameters(
             "Please use the `using_parameters` context manager to provide one."
         ) from e
 
-    needed_param = None
-    if requested_submodel:
+    needed_param = params
+    if requested_submodel is not None:
         # Perform a lookup in the Parameters object
         _, needed_param = _find_in_model(params, requested_submodel)
-        assert isinstance(needed_param, requested_submodel)
-    else:
-        needed_param = params
-
-    return needed_param
+    reads = READS_VAR.get()
+    if reads is None:
+        return needed_param
+    # While reads are recorded, the parameters are handed out in a view that records the reads of their fields
+    reads.submodels.add(type(needed_param))
+    return RecordedParameters(needed_param)  # type: ignore[return-value]
 
 
 # These help preserve strict type checking when using the decorator
@@ -222,7 +587,7 @@ def inject_parameters(f: Callable) -> Callable:
     if is_method:
 
         def f_method(self, *args, **kwargs):
-            needed_param = get_parameters(requested_submodel=submodel)
+            needed_param = get_parameters(submodel)
             return f(self, needed_param, *args, **kwargs)
 
         wrapper = f_method  # This signals rebinding
@@ -230,7 +595,7 @@ def f_method(self, *args, **kwargs):
     else:
 
         def f_function(*args, **kwargs):
-            needed_param = get_parameters(requested_submodel=submodel)
+            needed_param = get_parameters(submodel)
             return f(needed_param, *args, **kwargs)
 
         wrapper = f_function
@@ -242,9 +607,9 @@ def f_function(*args, **kwargs):
     # Transfer docstrings and metadata
     wrapper_with_metadata = functools.update_wrapper(wrapper, f)
 
-    # Update annotations
+    # Update annotations (on a copy, since update_wrapper shares the annotations dict with the wrapped function)
     if isinstance(wrapper.__annotations__, dict):
-        wrapper.__annotations__.pop(params_arg_name, None)
+        wrapper.__annotations__ = {k: v for k, v in wrapper.__annotations__.items() if k != params_arg_name}
 
     return wrapper_with_metadata
 
@@ -267,11 +632,7 @@ def inject_parameters_with_cache(f: Callable) -> Callable:
     """
     Caches the function alongside the injected parameters object.
     This ensures that the cache is invalidated whenever the injected parameters change.
-    Equivalent to @cache + @fetch_parameters, but with proper type hints.
-
-    Note: to keep things safe from memory leaks, probably don't use this function. It's technically okay to use when you
-    know there is a tightly bounded set of permutations of Parameters available to be input into the target function,
-    however that could always change in a future iteration without someone realizing they're creating a memory leak.
+    Equivalent to `inject_parameters_with_memo()`, with the default memory budget.
 
     Examples:
         >>> class MockParameters(BaseParameters):
@@ -289,10 +650,7 @@ def inject_parameters_with_cache(f: Callable) -> Callable:
         >>> some_function(3) # But here the cache is invalidated
             LookupError: No Parameters object found in context...
     """
-    # Cache and then wrap the function
-    cached_f = functools.cache(f)
-    injected_f = inject_parameters(cached_f)
-    return functools.update_wrapper(injected_f, f)
+    return inject_parameters_with_memo()(f)
 
 
 def inject_parameters_with_lru_cache(maxsize: int = 128):
@@ -315,9 +673,125 @@ def lru_cached_injector(
         ...
 
     def lru_cached_injector(f: Callable) -> Callable:
-        cache_wrapper = functools.lru_cache(maxsize=maxsize)
-        cached_f = cache_wrapper(f)
-        injected_f = inject_parameters(cached_f)
-        return functools.update_wrapper(injected_f, f)
+        cached_f = functools.lru_cache(maxsize=maxsize)(_recording_reads_of(f))
+
+        def f_replaying(*args, **kwargs):
+            result, reads = cached_f(*args, **kwargs)
+            _replay_reads(reads, args)
+            return result
+
+        return inject_parameters(functools.update_wrapper(f_replaying, f))
 
     return lru_cached_injector
+
+
+# Budget for the values memoized by each function decorated with `inject_parameters_with_memo`
+DEFAULT_MEMO_MAX_BYTES = 256 * 2**20
+
+
+def _simulation_key() -> Hashable:
+    # Memoized values (e.g. samples) may depend on the number of simulations, and samples on how they are drawn
+    from ccm.simulation_params import SimulationParams
+
+    with paused_reads():
+        try:
+            params = get_parameters(SimulationParams)
+        except LookupError:
+            return None
+        return (params.simulations, params.sampling_method, params.dtype)
+
+
+def _memo_key_part(value: Any) -> Hashable:
+    # Models are keyed by their structure, so that equal parameters (e.g. of separate API requests) share entries
+    if isinstance(value, BaseModel) and hasattr(value, "fingerprint"):
+        return (value.__class__, value.fingerprint())
+    return value
+
+
+def inject_parameters_with_memo(max_bytes: int = DEFAULT_MEMO_MAX_BYTES, per_rng: bool = False):
+    """
+    Memoizes the function by the fingerprint of the injected parameters model and the call arguments,
+    then injects the parameters (see `inject_parameters`). Models passed as arguments, such as `self`
+    for methods of interventions, are also keyed by their fingerprint; other arguments must be hashable.
+    Values are also keyed by the number of simulations, sampling method and precision of the context, which the
+    function may read without being given them.
+
+    Unlike `functools.lru_cache`, the memo is bounded by the total size of the memoized values, with numpy
+    arrays counted by their data, so that it is safe to use in a long-running process. The least recently used
+    values are evicted first. Memoized arrays are made read-only, since they are shared by all callers.
+
+    Functions that sample should set `per_rng`, which also keys the memo on the stream of the generator of the
+    context (see `stream_key`), or on the world's stream where world draws are shared (see `sharing_world_draws`).
+    The samples are drawn from a stream derived from it for the function and its arguments, rather than from the
+    generator itself, so that calls with the same seed share their samples (e.g. to model the same worlds)
+    whatever was drawn before, while calls with another seed draw samples of their own. Samples drawn in contexts
+    seeded from fresh entropy are only shared within the context, and calls with the process-wide generator (outside
+    of `using_rng`) aren't memoized at all, so that they draw new samples each time.
+
+    The decorated function exposes `cache_info()`, which returns a CacheInfo, and `cache_clear()`.
+
+    Examples:
+        >>> @inject_parameters_with_memo(max_bytes=2**20)
+        >>> def some_function(params: MockParameters, x: int) -> int:
+        >>>    return params.number + x
+        >>>
+        >>> with using_parameters(MockParameters(number=2)):
+        >>>   assert some_function(3) == 5
+        >>> with using_parameters(MockParameters(number=2)):
+        >>>   assert some_function(3) == 5  # The result is memoized, as the parameters are equal
+        >>> some_function.cache_info()
+            CacheInfo(hits=1, misses=1, evictions=0, entries=1, nbytes=28, max_bytes=1048576)
+    """
+
+    @overload
+    def memo_injector(
+        f: Callable[Concatenate[ArbitraryParamsModel, Parameters], ReturnValue]
+    ) -> Callable[Parameters, ReturnValue]:
+        ...
+
+    @overload
+    def memo_injector(
+        f: Callable[Concatenate[Self, ArbitraryParamsModel, Parameters], ReturnValue]
+    ) -> Callable[Concatenate[Self, Parameters], ReturnValue]:
+        ...
+
+    def memo_injector(f: Callable) -> Callable:
+        memo = BoundedCache(max_bytes)
+        f_recording = _recording_reads_of(f)
+
+        def memoized(*args, **kwargs):
+            arguments = (
+                tuple(_memo_key_part(arg) for arg in args),
+                tuple((name, _memo_key_part(value)) for name, value in sorted(kwargs.items())),
+            )
+            draws = (WORLD_VAR.get() or DRAWS_VAR.get()) if per_rng else None
+            if per_rng and draws is None:
+                # Generators without a stream (such as the process-wide generator) draw anew on each call
+                return f(*args, **kwargs)
+            store, key = memo, (*arguments, _simulation_key())
+            if draws is not None:
+                store = memo if draws.local is None else draws.local
+                # (Local draws are shared by all memoized functions)
+                key = (*key, draws.stream) if draws.local is None else (memoized, *key, draws.stream)
+            found, entry = store.get(key)
+            if not found:
+                if draws is None:
+                    value, reads = f_recording(*args, **kwargs)
+                else:
+                    # Drawn the same whichever call samples them first
+                    with using_rng(derived_seed(draws.stream, f"{f.__module__}.{f.__qualname__}/{arguments!r}")):
+                        value, reads = f_recording(*args, **kwargs)
+                entry = (freeze(value), reads)
+                # Read sets are small, so only values count towards the budget
+                store.put(key, entry, nbytes(value))
+            value, reads = entry
+            _replay_reads(reads, args)
+            return value
+
+        memoized.cache_info = memo.info  # type: ignore[attr-defined]
+        memoized.cache_clear = memo.clear  # type: ignore[attr-defined]
+        # The memoized function carries the metadata of f (including the stats),
+        # which inject_parameters transfers to the result
+        return inject_parameters(functools.update_wrapper(memoized, f))
+
+    return memo_injector
@@ -10,16 +10,15 @@
 from pydantic import AfterValidator, Field
 from squigglepy.numbers import K, M
 
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
 from ccm.contexts import inject_parameters
 from ccm.interventions.animal.animal_intervention_params import INTERVENABLE_ANIMALS, AnimalInterventionParams
 from ccm.interventions.intervention import EstimatorIntervention
+from ccm.simulation_params import get_num_simulations
 from ccm.utility.models import BetaDistributionSpec, ConfidenceDistributionSpec, SomeDistribution
 from ccm.utility.moral_weight_adapter import moral_weight_adjustor
 from ccm.world.animals import Animal
 
-SIMULATIONS = config.get_simulations()
 HOURS_PER_YEAR = 24 * 365.25
 
 
@@ -197,7 +196,7 @@ def __init__(self, **data):
 
     def animal_dalys_per_1000_estimator(self) -> NDArray[np.float64]:
         if self.use_override:
-            animal_yrs_per_1000 = sqw.sample(self.suffering_years_per_dollar_override.get_distribution(), n=SIMULATIONS)
+            animal_yrs_per_1000 = self.suffering_years_per_dollar_override.sample(get_num_simulations())
         else:
             animal_yrs_per_1000 = self._expected_years_suffering_per_dollar() * 1000
 
@@ -211,22 +210,21 @@ def animal_dalys_per_1000_estimator(self) -> NDArray[np.float64]:
 
     @property
     def _successes(self) -> NDArray[np.bool_]:
-        prob_success = sqw.sample(self.prob_success.get_distribution(), n=SIMULATIONS)
-        random_results = sqw.sample(sq.uniform(0, 1), n=SIMULATIONS)
+        num_simulations = get_num_simulations()
+        prob_success = self.prob_success.sample(num_simulations)
+        random_results = sqw.sample(sq.uniform(0, 1), n=num_simulations)
         successes = prob_success >= random_results
         return successes
 
     @inject_parameters
     def _expected_years_suffering_per_dollar(self, params: AnimalInterventionParams) -> NDArray[np.float64]:
-        hours_spent_suffering = sqw.sample(self.hours_spent_suffering.get_distribution(), n=SIMULATIONS)
-        prop_suffering_reduced = sqw.sample(self.prop_suffering_reduced.get_distribution(), n=SIMULATIONS)
-        prop_affected = sqw.sample(self.prop_affected.get_distribution(), n=SIMULATIONS)
-        intervention_effect_persistence = sqw.sample(self.persistence.get_distribution(), n=SIMULATIONS)
-        cost_of_intervention = sqw.sample(self.cost_of_intervention.get_distribution(), n=SIMULATIONS)
-        num_animals_born_per_year = sqw.sample(
-            params.num_animals_born_per_year[self.animal].get_distribution(),
-            n=SIMULATIONS,
-        )
+        num_simulations = get_num_simulations()
+        hours_spent_suffering = self.hours_spent_suffering.sample(num_simulations)
+        prop_suffering_reduced = self.prop_suffering_reduced.sample(num_simulations)
+        prop_affected = self.prop_affected.sample(num_simulations)
+        intervention_effect_persistence = self.persistence.sample(num_simulations)
+        cost_of_intervention = self.cost_of_intervention.sample(num_simulations)
+        num_animals_born_per_year = params.num_animals_born_per_year[self.animal].sample(num_simulations)
 
         # Years suffering averted, if the intervention is successful
         animal_yrs_suffering_averted_annually = (
@@ -0,0 +1,114 @@
+"""
+A cache of the results of estimates, shared by everything that estimates interventions (the API, the funding pools
+of research projects, and the batch tools), so that an intervention estimated again with the same parameters,
+number of simulations and seed isn't simulated again.
+
+Results are content-addressed: they are keyed by the fingerprint of the intervention, the fingerprint of the values
+of the parameters the estimate read (see `ccm.contexts.recording_reads`), the number of simulations, the stream
+of the generator of the context, and the stream of the world draws if they are shared (see
+`ccm.contexts.sharing_world_draws`). Equal interventions and parameters sent in separate API requests then share
+entries, and changing parameters that an estimate doesn't read doesn't invalidate it.
+
+Each result is computed with a generator of its own, derived from the stream of the generator of the context and
+what is estimated, so that it doesn't depend on what else was drawn from that generator before it. Otherwise,
+a cached result would differ from the one computed in its place.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import TYPE_CHECKING, TypeVar
+
+from ccm.base_parameters import paused_reads
+from ccm.contexts import (
+    ReadSet,
+    derived_seed,
+    get_parameters,
+    get_rng,
+    get_world_stream,
+    recording_reads,
+    stream_key,
+    using_rng,
+)
+from ccm.simulation_params import get_num_simulations
+from ccm.utility.bounded_cache import BoundedCache, CacheInfo, freeze, nbytes
+
+if TYPE_CHECKING:
+    from ccm.interventions.intervention import Intervention
+
+T = TypeVar("T")
+
+# Budget for the results held by the shared cache
+DEFAULT_ESTIMATE_CACHE_MAX_BYTES = 512 * 2**20
+
+# Number of interventions whose read sets are kept (read sets are small, but not bounded by the result cache)
+_MAX_READ_SETS = 4096
+
+
+class EstimateCache:
+    """
+    A least-recently-used cache of the results of estimates, bounded by the memory the results take up.
+    Results are read-only (numpy arrays are frozen), as they are shared by all that request them.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_ESTIMATE_CACHE_MAX_BYTES):
+        self._results = BoundedCache(max_bytes)
+        # The read sets that the results of each intervention (and label) were computed with, from least to most
+        # recently computed. An estimate usually reads the same parameters whatever their values, but may not:
+        # e.g. GHD interventions only read the x-risk parameters if they adjust for x-risk.
+        self._read_sets: OrderedDict[tuple[str, str], list[ReadSet]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, intervention: "Intervention", label: str, compute: Callable[[], T]) -> T:
+        """
+        Returns the cached result of `compute` for the intervention in the current context, computing it
+        on a miss. The label tells apart results of different computations for the same intervention.
+        """
+        stream = stream_key(get_rng())
+        if stream is None:
+            # Generators that weren't seeded from a SeedSequence can't be keyed by their stream
+            return compute()
+
+        # Looking up the result isn't a read of the parameters by the estimate
+        with paused_reads():
+            params = get_parameters()
+            key = (intervention.fingerprint(), label, get_num_simulations(), stream, get_world_stream())
+        for reads in self._known_read_sets(key[:2]):
+            with paused_reads():
+                found, result = self._results.get((*key, reads.fingerprint(params)), count_miss=False)
+            if found:
+                reads.replay()
+                return result
+        self._results.count_miss()
+
+        with recording_reads() as reads, using_rng(derived_seed(stream, "/".join(key[:2]))):
+            result = freeze(compute())
+        with paused_reads():
+            self._results.put((*key, reads.fingerprint(params)), result, nbytes(result))
+        self._add_read_set(key[:2], reads)
+        return result
+
+    def cache_info(self) -> CacheInfo:
+        return self._results.info()
+
+    def cache_clear(self) -> None:
+        self._results.clear()
+        with self._lock:
+            self._read_sets.clear()
+
+    def _known_read_sets(self, key: tuple[str, str]) -> list[ReadSet]:
+        with self._lock:
+            return list(self._read_sets.get(key, ()))
+
+    def _add_read_set(self, key: tuple[str, str], reads: ReadSet) -> None:
+        with self._lock:
+            read_sets = self._read_sets.setdefault(key, [])
+            self._read_sets.move_to_end(key)
+            if all(known.fields != reads.fields for known in read_sets):
+                read_sets.append(reads)
+            while len(self._read_sets) > _MAX_READ_SETS:
+                self._read_sets.popitem(last=False)
+
+
+# The cache shared by all estimates of interventions
+ESTIMATE_CACHE = EstimateCache()
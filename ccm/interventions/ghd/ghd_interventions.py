@@ -7,7 +7,6 @@
 """
 
 
-from functools import lru_cache
 from inspect import cleandoc
 from typing import Annotated, Literal, Optional
 
@@ -17,13 +16,12 @@
 
 import ccm.config as config
 import ccm.utility.risk_calculator as risk_calculator
-import ccm.utility.squigglepy_wrapper as sqw
 from ccm.contexts import inject_parameters
 from ccm.interventions.ghd.ghd_intervention_params import GhdInterventionParams
 from ccm.interventions.intervention import EstimatorIntervention
+from ccm.simulation_params import get_num_simulations
 from ccm.utility.models import ConfidenceDistributionSpec, SomeDistribution
 
-SIMULATIONS = config.get_simulations()
 CUR_YEAR = config.get_current_year()
 
 DEFAULT_YEARS_UNTIL_INTERVENTION_HAS_EFFECT = ConfidenceDistributionSpec.lognorm(2, 20)
@@ -75,14 +73,14 @@ class GhdIntervention(EstimatorIntervention, frozen=True):
     ] = DEFAULT_YEARS_UNTIL_INTERVENTION_HAS_EFFECT
 
     def __init__(self, **data):
-        super().__init__(_estimator=lru_cache(maxsize=1)(self.risk_adjusted_dalys_per_1000), **data)
+        super().__init__(_estimator=self.risk_adjusted_dalys_per_1000, **data)
 
     def risk_adjusted_dalys_per_1000(self) -> NDArray[np.float64]:
         """Input params define normal distribution of dollars-per-DALY, output is in DALYs/$1000 discounted by the
         possibility that x-risk event precludes benefits.
         """
         p_survival = self._get_p_survival()
-        dalys_per_1000 = 1000 / (sqw.sample(self.cost_per_daly.get_distribution(), n=SIMULATIONS) / p_survival)
+        dalys_per_1000 = 1000 / (self.cost_per_daly.sample(len(p_survival)) / p_survival)
 
         return dalys_per_1000
 
@@ -96,21 +94,15 @@ def _get_p_survival(self, params: GhdInterventionParams) -> NDArray[np.float64]:
         adjust_for_xrisk (bool): Whether to use the xrisk adjustment, or skip it (force p_survival=1.0); setting this to
             True will result in higher DALY efficiency values being output for all GHD Interventions.
         """
+        num_simulations = get_num_simulations()
         if not params.adjust_for_xrisk:
-            return np.ones(SIMULATIONS)
+            return np.ones(num_simulations)
 
         # Years until intervention effects are counted. If everyone dies before this, no effect is credited.
-        forward_years = (
-            sqw.sample(
-                self.years_until_intervention_has_effect.get_distribution(),
-                n=SIMULATIONS,
-            )
-            .round()
-            .astype(int)
-        )
-        years = np.array([CUR_YEAR] * SIMULATIONS) + forward_years
-
-        total_x_risk = risk_calculator.get_cumulative_risk_over_years(years)
-        p_survival = np.ones(SIMULATIONS) - total_x_risk
+        forward_years = self.years_until_intervention_has_effect.sample(num_simulations).round().astype(int)
+        years = CUR_YEAR + forward_years
+
+        total_x_risk = risk_calculator.get_risk_table().cumulative(years)
+        p_survival = 1 - total_x_risk
 
         return p_survival
@@ -8,11 +8,12 @@
 from numpy.typing import NDArray
 from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
+from ccm.interventions.estimate_cache import ESTIMATE_CACHE
+from ccm.simulation_params import get_dtype, get_num_simulations
+from ccm.utility.fingerprints import distribution_data, fingerprint
 from ccm.utility.models import SomeDistribution
-
-SIMULATIONS = config.get_simulations()
+from ccm.utility.sparse_samples import SparseSampleArray
 
 
 class Intervention(BaseModel, ABC, frozen=True):
@@ -37,11 +38,26 @@ class Intervention(BaseModel, ABC, frozen=True):
     model_config = ConfigDict(arbitrary_types_allowed=True)
     __hash__: Callable[..., int] = object.__hash__
 
+    def estimate_dalys_per_1000(self) -> SparseSampleArray:
+        """
+        Returns the DALY per $1000 effectiveness of the intervention as an array of samples, of which those
+        of the simulations in which it had no effect are zeros. Estimates are cached
+        (see ccm.interventions.estimate_cache), so the samples are read-only.
+        """
+        return ESTIMATE_CACHE.get(self, "dalys_per_1000", self._estimate_dalys_per_1000)
+
     @abstractmethod
-    def estimate_dalys_per_1000(self) -> tuple[NDArray[np.float64], int]:
-        """Returns the DALY per $1000 effectiveness of the intervention as an array of samples."""
+    def _estimate_dalys_per_1000(self) -> SparseSampleArray:
         ...
 
+    def fingerprint(self) -> str:
+        """
+        Structural fingerprint of the intervention, the same for all equal interventions
+        (see ccm.utility.fingerprints). Together with the fingerprint of the parameters,
+        it identifies the distribution of the estimate.
+        """
+        return fingerprint(self)
+
 
 class ResultIntervention(Intervention, frozen=True):
     """
@@ -54,8 +70,8 @@ class ResultIntervention(Intervention, frozen=True):
     ] = "A simple intervention defined by a result distribution"
     result_distribution: SomeDistribution
 
-    def estimate_dalys_per_1000(self) -> tuple[NDArray[np.float64], int]:
-        return sqw.sample(self.result_distribution.to_sq(), SIMULATIONS), 0
+    def _estimate_dalys_per_1000(self) -> SparseSampleArray:
+        return SparseSampleArray(self.result_distribution.sample(get_num_simulations()))
 
 
 class EstimatorIntervention(Intervention, frozen=True):
@@ -69,7 +85,7 @@ class EstimatorIntervention(Intervention, frozen=True):
     # Estimators and scale distributions can't be serialized,
     # so we exclude them from the output;
     # SEE https://docs.pydantic.dev/latest/usage/models/#private-model-attributes
-    _estimator: Callable[[], NDArray[np.float64]]
+    _estimator: Callable[[], NDArray[np.float64] | SparseSampleArray]
     _scale_dist: sq.OperableDistribution | None = None
 
     def __init__(self, **data):
@@ -78,17 +94,30 @@ def __init__(self, **data):
             raise AttributeError("Missing estimator; please provide a callable for `_estimator` argument")
         super().__init__(**data)
         self.__setattr__("_estimator", estimator)
+        # (Pydantic doesn't set private attributes from the arguments of the constructor)
+        self.__setattr__("_scale_dist", data.get("_scale_dist"))
 
-    def estimate_dalys_per_1000(self) -> tuple[NDArray[np.float64], int]:
+    def _estimate_dalys_per_1000(self) -> SparseSampleArray:
         results = self._estimator()
-        if isinstance(results, tuple):
-            samples, zeros = results
-        else:
-            samples = results
-            zeros = 0
+        samples = results if isinstance(results, SparseSampleArray) else SparseSampleArray(results)
         if self._scale_dist is not None:
-            return self._scale(samples), zeros
-        return samples, zeros
-
-    def _scale(self, samples: NDArray[np.float64]) -> NDArray[np.float64]:
-        return samples * sqw.sample(self._scale_dist, n=SIMULATIONS)
+            samples = self._scale(samples)
+        # Intermediate results may need more precision, but the estimate takes the precision of the context
+        return samples.astype(get_dtype())
+
+    def fingerprint(self) -> str:
+        # The estimator and scale distribution aren't serialized. Estimators are named after their function,
+        # which is a method of the intervention for all subclasses, and scale distributions are described by
+        # their exact parameters.
+        estimator = getattr(self._estimator, "__func__", self._estimator)
+        return fingerprint(
+            self,
+            extra=lambda: {
+                "estimator": f"{estimator.__module__}.{estimator.__qualname__}",
+                "scale_dist": None if self._scale_dist is None else distribution_data(self._scale_dist),
+            },
+        )
+
+    def _scale(self, samples: SparseSampleArray) -> SparseSampleArray:
+        # Zeros stay zeros when scaled, so only the stored values are
+        return samples * sqw.sample(self._scale_dist, n=samples.nnz)
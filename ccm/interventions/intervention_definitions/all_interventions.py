@@ -6,7 +6,7 @@
 import squigglepy as sq
 from pydantic import Field
 
-import ccm.config as config
+import ccm.utility.squigglepy_wrapper as sqw
 import ccm.world.animals as animals
 from ccm.interventions.animal.animal_interventions import DEFAULT_ANIMAL_PARAMS, AnimalIntervention
 from ccm.interventions.ghd.ghd_interventions import GhdIntervention
@@ -17,10 +17,9 @@
 from ccm.interventions.intervention_definitions.scaled_interventions import SCALED_INTERVENTIONS
 from ccm.interventions.intervention_definitions.xrisk_interventions import XRISK_INTERVENTIONS
 from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.simulation_params import get_num_simulations
 from ccm.world.risk_types import RiskTypeAI, RiskTypeGLT
 
-SIMULATIONS = config.get_simulations()
-
 UNSCALED_INTERVENTIONS = DEFAULT_INTERVENTIONS.copy()
 UNSCALED_INTERVENTIONS.extend(ANIMAL_WELFARE_INTERVENTIONS)
 UNSCALED_INTERVENTIONS.extend(XRISK_INTERVENTIONS)
@@ -59,7 +58,7 @@ def construct_cause_benchmark_intervention(
 ) -> Intervention:
     scale_display = ""
     if scaling_dist is not None:
-        scale_display = f" scaled to ~{np.mean(sq.sample(scaling_dist, n=SIMULATIONS)) * 100:,.0f}%"
+        scale_display = f" scaled to ~{np.mean(sqw.sample(scaling_dist, n=get_num_simulations())) * 100:,.0f}%"
     if cause == "GHD":
         return GhdIntervention(
             name=f"{cause} - {subcause} Benchmark{scale_display}",
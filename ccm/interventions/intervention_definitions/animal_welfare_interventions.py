@@ -2,7 +2,6 @@
 
 from typing import TYPE_CHECKING
 
-import ccm.config as config
 from ccm.interventions.animal.animal_interventions import DEFAULT_ANIMAL_PARAMS, AnimalIntervention
 from ccm.world.animals import Animal
 from ccm.interventions.intervention_definitions.shrimp_interventions import shrimp_ammonia, shrimp_slaughter
@@ -10,8 +9,6 @@
 if TYPE_CHECKING:
     from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
 
-SIMULATIONS = config.get_simulations()
-
 
 #  Generic Interventions
 
@@ -6,7 +6,6 @@
 import squigglepy as sq
 from squigglepy.numbers import K
 
-import ccm.config as config
 from ccm.interventions.ghd.ghd_interventions import (
     GD_COST_EFFECTIVENESS,
     GW_COST_EFFECTIVENESS,
@@ -19,8 +18,6 @@
 if TYPE_CHECKING:
     from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
 
-SIMULATIONS = config.get_simulations()
-
 
 # Note: If you change the name of an Intervention here, also change it in data/projects/projects.csv
 
@@ -5,7 +5,6 @@
 import squigglepy as sq
 from squigglepy.numbers import K, M
 
-import ccm.config as config
 from ccm.interventions.animal.animal_interventions import DEFAULT_ANIMAL_PARAMS, AnimalIntervention
 from ccm.interventions.ghd.ghd_interventions import GW_COST_EFFECTIVENESS, GhdIntervention
 from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
@@ -16,8 +15,6 @@
 if TYPE_CHECKING:
     from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
 
-SIMULATIONS = config.get_simulations()
-
 standard_ghd = GhdIntervention(
     area="ghd",
     name="GiveWell Bar Scaled to ~88%",
@@ -4,7 +4,6 @@
 
 from squigglepy.numbers import K, M, B
 
-import ccm.config as config
 from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
 from ccm.utility.models import ConfidenceDistributionSpec
 from ccm.world.risk_types import RiskTypeAI, RiskTypeGLT
@@ -12,8 +11,6 @@
 if TYPE_CHECKING:
     from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
 
-SIMULATIONS = config.get_simulations()
-
 
 major_ai_misalignment = XRiskIntervention(
     # broadly inspirated by OpenAI's Superalignment Team
@@ -8,13 +8,15 @@
 import ccm.utility.risk_calculator as risk_calculator
 import ccm.utility.squigglepy_wrapper as sqw
 import ccm.world.population as population
-from ccm.contexts import inject_parameters
+from ccm.contexts import get_rng, inject_parameters
+from ccm.simulation_params import get_num_simulations
+from ccm.utility.sparse_samples import SparseSampleArray
 from ccm.world.longterm_params import LongTermParams
 from ccm.world.population import WORLD_POPULATION_NOW
 from ccm.world.risk_types import RiskType
+from ccm.world.simulation import get_world_simulation, sample_catastrophe_intensities
 
 CUR_YEAR = config.get_current_year()
-SIMULATIONS = config.get_simulations()
 
 
 class ImpactMethod(ABC):
@@ -62,11 +64,11 @@ def calc_base_impact(
         prob_good = len(np.where(proportion_extinction_risk_changed > 0)[0]) / np.count_nonzero(
             proportion_extinction_risk_changed
         )
-        good_or_bad = np.where(np.random.random(len(proportion_extinction_risk_changed)) < prob_good, 1, -1)
+        good_or_bad = np.where(get_rng().random(len(proportion_extinction_risk_changed)) < prob_good, 1, -1)
 
         # Separately calculate the value of life lost due to extinction and to current living population
         # Calculate the value of life lost to extinction
-        life_years_changed_xrisk = self._sample_life_years_changed_xrisk(
+        life_years_changed = self._sample_life_years_changed_xrisk(
             risk_type,
             good_or_bad,
             years_risk_changed,
@@ -80,7 +82,8 @@ def calc_base_impact(
             years_risk_changed,
         )
 
-        return life_years_changed_xrisk + life_years_changed_catastrophe
+        life_years_changed[life_years_changed_catastrophe.positions] += life_years_changed_catastrophe.data
+        return life_years_changed
 
     # //////////// Private ////////////////
 
@@ -89,32 +92,38 @@ def _sample_life_years_changed_catastrophe(
         risk_type: RiskType,
         proportion_catastrophe_risk_changed: NDArray[np.float64],
         years_risk_changed: NDArray[np.int64],
-    ) -> NDArray[np.float64]:
-        """Generates random sample of how many life years gained or lost from catastrophe risk changes"""
+    ) -> SparseSampleArray:
+        """
+        Generates random sample of how many life years gained or lost from catastrophe risk changes. Only the
+        simulations in which a catastrophe is averted (or caused) are stored, at their positions among the others.
+        """
         # Probability a catastrophe will occur at some point during the period this intervention covers
         catastrophe_probability = risk_calculator.get_cumulative_catastrophe_risk(
             risk_type,
             years_risk_changed,
         )
 
-        # Deaths if a catastrophe were to occur
+        # First find the catastrophes that would be averted, which are usually few
+        aversion_probability = np.abs(proportion_catastrophe_risk_changed) * catastrophe_probability
+        is_averted = sqw.sample_probabilities(len(aversion_probability)) < aversion_probability
+        averted_indices = np.flatnonzero(is_averted)
+
+        # Then the deaths of those catastrophes only
         catastrophe_results = self._sample_catastrophe_deaths(
             risk_type=risk_type,
             world_pop=WORLD_POPULATION_NOW,
+            num_samples=len(years_risk_changed),
+            indices=averted_indices,
         )
-        # Filter out those catastrophes that wouldn't be averted
-
-        probability_changed_signs = np.where(proportion_catastrophe_risk_changed < 0, -1, 1)
-        abs_proportion_catastrophe_risk_changed = np.abs(proportion_catastrophe_risk_changed)
-        aversion_probability = abs_proportion_catastrophe_risk_changed * catastrophe_probability
-        catastrophe_samples = np.where(
-            sqw.sample_probabilities(SIMULATIONS) < aversion_probability,
-            catastrophe_results,
-            0,
-        )
+        probability_changed_signs = np.where(proportion_catastrophe_risk_changed[averted_indices] < 0, -1, 1)
+
         # Some of these might cross over max_creditable_year for very short windows.
         # Go from number of people killed to number of life years lost
-        return population.calculate_life_years_lost(catastrophe_samples) * probability_changed_signs
+        return SparseSampleArray(
+            population.calculate_life_years_lost(catastrophe_results) * probability_changed_signs,
+            len(years_risk_changed) - len(averted_indices),
+            averted_indices,
+        )
 
     def _sample_life_years_changed_xrisk(
         self,
@@ -144,7 +153,10 @@ def _sample_life_years_changed_xrisk(
 
         # Trim the num years exinction delayed to the max creditable year. We don't care beyond that.
         absolute_value_years = self.trim_to_max_year(absolute_value_years)
-        life_years_changed_xrisk = population.get_total_life_years_until(absolute_value_years)
+        life_years_changed_xrisk = population.get_total_life_years_until(
+            absolute_value_years,
+            get_world_simulation(len(absolute_value_years)),
+        )
 
         return life_years_changed_xrisk * effect_signs
 
@@ -153,11 +165,10 @@ def _sample_intervention_delays_to_extinction(
         changes_in_extinction_probability: NDArray[np.float64],
         years_risk_changed: NDArray[np.int64],
     ) -> NDArray[np.float64]:
-        """Given a list of eras and a sampling of changes of absolute probability, call the years credit calculator to
-        sample whether those probability changes makes a difference and how big of a difference they make."""
-        dist = risk_calculator.get_distribution_of_years_to_extinction()
-        years_extinction_delayed_samples = years_credit_calculator.sample_years_credit(
-            dist,
+        """Given a sampling of changes of absolute probability, call the years credit calculator to sample whether
+        those probability changes makes a difference in the simulated worlds and how big of a difference they make."""
+        years_extinction_delayed_samples = years_credit_calculator.sample_years_credit_in_world(
+            get_world_simulation(len(changes_in_extinction_probability)),
             changes_in_extinction_probability,
             years_risk_changed,
         )
@@ -179,14 +190,12 @@ def trim_to_max_year(
         return years_extinction_delayed_samples
 
     @staticmethod
-    @inject_parameters
     def _sample_catastrophe_deaths(
-        params: LongTermParams,
         risk_type: RiskType,
         world_pop: int = WORLD_POPULATION_NOW,
+        num_samples: int | None = None,
+        indices: NDArray[np.intp] | None = None,
     ) -> NDArray[np.float64]:
-        proportion_dead = sqw.sample(
-            params.catastrophe_intensities[risk_type].get_distribution(),
-            n=SIMULATIONS,
-        )
-        return world_pop * proportion_dead
+        """Deaths of a catastrophe of the given type in each of the simulated worlds (or in those at the indices)"""
+        num_samples = get_num_simulations() if num_samples is None else num_samples
+        return world_pop * sample_catastrophe_intensities(risk_type, num_samples, indices)
@@ -7,7 +7,6 @@
 from ccm.world.longterm_params import DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK, DEFAULT_MAX_CREDITABLE_YEAR
 from ccm.world.risk_types import RiskType
 
-SIMULATIONS = config.get_simulations()
 CUR_YEAR = config.get_current_year()
 
 TIME_OF_PERILS_ERAS = (
@@ -1,14 +1,15 @@
 import numpy as np
 from numpy.typing import NDArray
 import squigglepy as sq
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
-
-SIMULATIONS = config.get_simulations()
+from ccm.contexts import get_rng
+from ccm.simulation_params import get_dtype
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
+from ccm.world.simulation import WorldSimulation
 
 
 def sample_years_credit(
-    year_of_extinction_distribution: sq.OperableDistribution,
+    year_of_extinction_distribution: sq.OperableDistribution | YearsToExtinctionDistribution,
     change_in_probability_by_sample: NDArray[np.float64],
     num_years_intervention_effective: NDArray[np.int64],
     # Note, there must be possible extinction dates beyond the span when the intervention is effective.
@@ -17,13 +18,47 @@ def sample_years_credit(
     # Take two samples,  one an expected time to a close call with extinction, the second the subsequent extinction.
     # Our intervention has a chance of making a difference if the first close call falls within the period of
     # intervention effect.
-    sampled_time_of_first_risk = sqw.sample(year_of_extinction_distribution, n=SIMULATIONS)
+    sampled_time_of_first_risk = sqw.sample(year_of_extinction_distribution, n=len(change_in_probability_by_sample))
     sampled_time_of_second_risk = _get_higher_samples(
         year_of_extinction_distribution,
         sampled_time_of_first_risk,
         num_years_intervention_effective,
     )
 
+    return _years_credit(
+        sampled_time_of_first_risk,
+        sampled_time_of_second_risk,
+        change_in_probability_by_sample,
+        num_years_intervention_effective,
+    )
+
+
+def sample_years_credit_in_world(
+    world: WorldSimulation,
+    change_in_probability_by_sample: NDArray[np.float64],
+    num_years_intervention_effective: NDArray[np.int64],
+) -> NDArray[np.float64]:
+    """
+    Like `sample_years_credit`, with the close call with extinction and the subsequent extinction of each of the
+    simulated worlds, rather than samples of them of its own. Only whether the intervention makes a difference is
+    sampled.
+    """
+    if world.num_samples != len(change_in_probability_by_sample):
+        raise ValueError(f"Expected a change in probability for each of the {world.num_samples} simulated worlds")
+    return _years_credit(
+        world.years_to_extinction,
+        world.years_to_later_extinction,
+        change_in_probability_by_sample,
+        num_years_intervention_effective,
+    )
+
+
+def _years_credit(
+    sampled_time_of_first_risk: NDArray[np.float64],
+    sampled_time_of_second_risk: NDArray[np.float64],
+    change_in_probability_by_sample: NDArray[np.float64],
+    num_years_intervention_effective: NDArray[np.int64],
+) -> NDArray[np.float64]:
     # Examine indices where first risk occurs in time of intervention. If random sample < probability the intervention
     # makes a positive or negative difference, then the index makes a difference
     indices_where_makes_a_difference = _get_indices_where_intervention_makes_a_difference(
@@ -50,7 +85,7 @@ def _get_indices_where_intervention_makes_a_difference(
 ) -> NDArray[np.bool_]:
     """Get indices of values in sampled_time_of_first_risk where it is in the intervention period and a random sample
     is less than the reduction in probability the intervention causes"""
-    probability_samples = np.random.random(SIMULATIONS)
+    probability_samples = get_rng().random(len(sampled_time_of_first_risk))
 
     return np.logical_and(
         sampled_time_of_first_risk <= num_years_intervention_effective,
@@ -59,13 +94,30 @@ def _get_indices_where_intervention_makes_a_difference(
 
 
 def _get_higher_samples(
-    dist: sq.OperableDistribution,
+    dist: sq.OperableDistribution | YearsToExtinctionDistribution,
     lower_samples: NDArray[np.float64],
     max_value: NDArray[np.int64],
 ):
     """From a distribution and a list of samples, select samples from the distribution that are > first samples if
     those samples have a value less than or equal to max_value"""
-    # Including a max_value lets us only focus on the values that need resampling.
+    if not isinstance(dist, YearsToExtinctionDistribution):
+        return _get_higher_samples_by_rejection(dist, lower_samples, max_value)
+    # Including a max_value lets us only focus on the values that need to be higher.
+    in_range = lower_samples <= max_value
+    higher_samples = np.empty(len(lower_samples), dtype=get_dtype())
+    higher_samples[~in_range] = dist.sample(np.count_nonzero(~in_range))
+    # Drawn from the distribution conditioned on being higher, in a single draw
+    higher_samples[in_range] = dist.sample_greater_than(lower_samples[in_range])
+    return higher_samples
+
+
+def _get_higher_samples_by_rejection(
+    dist: sq.OperableDistribution,
+    lower_samples: NDArray[np.float64],
+    max_value: NDArray[np.int64],
+):
+    """Like `_get_higher_samples`, for distributions whose conditional distribution isn't known: samples are
+    redrawn until they are higher, which takes many draws if higher samples are unlikely."""
     higher_samples = sqw.sample(dist, n=len(lower_samples))
     in_range = lower_samples <= max_value
     while True:
@@ -4,7 +4,6 @@
 
 
 from inspect import cleandoc
-from functools import cached_property
 from typing import Annotated, Literal, Optional
 
 import numpy as np
@@ -13,23 +12,22 @@
 from pydantic import AfterValidator, Field
 from squigglepy import B, M
 
-import ccm.config as config
 import ccm.interventions.xrisk.impact.utils.years_credit_calculator as years_credit_calculator
 import ccm.utility.risk_calculator as risk_calculator
 import ccm.utility.squigglepy_wrapper as sqw
 import ccm.world.population as population
-from ccm.contexts import inject_parameters
+from ccm.contexts import get_rng, inject_parameters
 from ccm.interventions.intervention import EstimatorIntervention
 from ccm.parameters import Parameters
+from ccm.simulation_params import get_stratified_sampling, get_num_simulations
 from ccm.utility.models import ConfidenceDistributionSpec, SomeDistribution
-from ccm.utility.squigglepy_wrapper import RNG
+from ccm.utility.sparse_samples import SparseSampleArray
 from ccm.world.longterm_params import LongTermParams
 from ccm.world.risk_types import RiskType
 from ccm.world.population import WORLD_POPULATION_NOW
+from ccm.world.simulation import get_world_simulation
 
 
-SIMULATIONS = config.get_simulations()
-
 DEFAULT_PERSISTENCE = ConfidenceDistributionSpec.lognorm(15, 25, lclip=0)
 DEFAULT_PROB_GOOD: float = 0.7
 DEFAULT_PROB_NO_EFFECT = 0.2
@@ -136,24 +134,33 @@ def __init__(self, **data):
             **data,
         )
 
-    def glt_dalys_per_1000_estimator(self) -> tuple[NDArray[np.float64], int]:
-        healthy_life_yrs_saved, zeros = self.estimate_healthy_years_saved()
+    def glt_dalys_per_1000_estimator(self) -> SparseSampleArray:
+        healthy_life_yrs_saved = self.estimate_healthy_years_saved()
 
         if self.cost:
-            megaproject_cost = sqw.sample(self.cost.get_distribution(), n=SIMULATIONS)
+            megaproject_cost = self.cost.sample(healthy_life_yrs_saved.nnz)
         else:
             megaproject_cost = self._project_cost_per_year_given_base_xrisk_impact_magnitude()
-        glt_dalys_per_1000 = self._calc_megaproject_dalys_per_1000(healthy_life_yrs_saved, megaproject_cost)
+        glt_dalys_per_1000 = self._calc_megaproject_dalys_per_1000(healthy_life_yrs_saved.data, megaproject_cost)
 
-        return glt_dalys_per_1000, zeros
+        return healthy_life_yrs_saved.with_data(glt_dalys_per_1000)
 
     @inject_parameters
-    def estimate_healthy_years_saved(self, params: LongTermParams) -> tuple[NDArray[np.float64], int]:
+    def estimate_healthy_years_saved(self, params: LongTermParams) -> SparseSampleArray:
+        num_simulations = get_num_simulations()
+        # the same persistence samples are used for both the impact and the proportion of simulations with an effect
+        years_risk_changed = self._sample_years_risk_changed()
+
         # calculate xrisk event magnitudes, conditional on them happening while the intervention is effective
-        dalys_conditional_on_xrisk_changed = self._estimate_conditional_impact_xrisk()
+        dalys_conditional_on_xrisk_changed = self._estimate_conditional_impact_xrisk(years_risk_changed)
 
-        # calculate the magnitude for the proportional number of non-extinction catastrophes
         prop_catastrophe_to_xrisk = params.catastrophe_extinction_risk_ratios[self.risk_type]
+        if get_stratified_sampling() and len(dalys_conditional_on_xrisk_changed) > 0:
+            return self._estimate_healthy_years_saved_by_stratified_sampling(
+                years_risk_changed, dalys_conditional_on_xrisk_changed, prop_catastrophe_to_xrisk
+            )
+
+        # calculate the magnitude for the proportional number of non-extinction catastrophes
         num_catastrophe_events = len(dalys_conditional_on_xrisk_changed) * prop_catastrophe_to_xrisk
         dalys_conditional_on_catastrophe_changed = self._estimate_conditional_impact_catastrophe(
             num_events=num_catastrophe_events,
@@ -175,46 +182,99 @@ def estimate_healthy_years_saved(self, params: LongTermParams) -> tuple[NDArray[
         num_non_zero_results = len(healthy_life_yrs_saved)
         zeros = int(
             num_non_zero_results
-            / (self._prop_simulations_xrisk_is_changed + self._prop_simulations_catastrophe_is_changed)
+            / (
+                self._prop_simulations_xrisk_is_changed(years_risk_changed)
+                + self._prop_simulations_catastrophe_is_changed(years_risk_changed)
+            )
         )
 
-        # fill with explicit zeros so that the result array has at least a number of elements == SIMULATIONS
-        if len(healthy_life_yrs_saved) < SIMULATIONS:
-            num_explicit_zeros = SIMULATIONS - len(healthy_life_yrs_saved)
+        # fill with explicit zeros so that the result array has at least a number of elements == num_simulations
+        if len(healthy_life_yrs_saved) < num_simulations:
+            num_explicit_zeros = num_simulations - len(healthy_life_yrs_saved)
             healthy_life_yrs_saved = np.concatenate((healthy_life_yrs_saved, np.zeros(num_explicit_zeros)))
             zeros -= num_explicit_zeros
-        # resample and remove zeros if the result array has a number of elements > SIMULATIONS
-        if len(healthy_life_yrs_saved) > SIMULATIONS:
+        # resample and remove zeros if the result array has a number of elements > num_simulations
+        if len(healthy_life_yrs_saved) > num_simulations:
             original_length = len(healthy_life_yrs_saved)
-            healthy_life_yrs_saved = RNG.choice(healthy_life_yrs_saved, size=SIMULATIONS, replace=False)
-            zeros = int(zeros * SIMULATIONS / original_length)
+            healthy_life_yrs_saved = get_rng().choice(healthy_life_yrs_saved, size=num_simulations, replace=False)
+            zeros = int(zeros * num_simulations / original_length)
 
-        return healthy_life_yrs_saved, zeros
+        return SparseSampleArray(healthy_life_yrs_saved, zeros)
 
     # ///////////////// Private Functions /////////////////
 
+    def _estimate_healthy_years_saved_by_stratified_sampling(
+        self,
+        years_risk_changed: NDArray[np.int64],
+        dalys_conditional_on_xrisk_changed: NDArray[np.float64],
+        prop_catastrophe_to_xrisk: float,
+    ) -> SparseSampleArray:
+        """Like `estimate_healthy_years_saved`, but samples extinctions and catastrophes as separate strata: up to half
+        of the samples are kept for extinction events, however many catastrophes there are for each of them, rather
+        than subsampling both in proportion. The samples are weighted by the number of events they stand for, so the
+        simulations they stand for are the same as without stratified sampling."""
+        num_simulations = get_num_simulations()
+        num_xrisk_events = len(dalys_conditional_on_xrisk_changed)
+        num_catastrophe_events = num_xrisk_events * prop_catastrophe_to_xrisk
+        zeros = int(
+            (num_xrisk_events + num_catastrophe_events)
+            / (
+                self._prop_simulations_xrisk_is_changed(years_risk_changed)
+                + self._prop_simulations_catastrophe_is_changed(years_risk_changed)
+            )
+        )
+
+        num_xrisk_samples = min(num_xrisk_events, num_simulations // 2) if num_catastrophe_events else num_simulations
+        num_catastrophe_samples = num_simulations - num_xrisk_samples
+        if num_xrisk_samples <= num_xrisk_events:
+            xrisk_samples = get_rng().choice(dalys_conditional_on_xrisk_changed, size=num_xrisk_samples, replace=False)
+            xrisk_weights = np.full(num_xrisk_samples, num_xrisk_events / num_xrisk_samples)
+        else:
+            # Without catastrophes, missing samples are filled with explicit zeros, as without stratified sampling
+            num_explicit_zeros = num_xrisk_samples - num_xrisk_events
+            xrisk_samples = np.concatenate((dalys_conditional_on_xrisk_changed, np.zeros(num_explicit_zeros)))
+            xrisk_weights = np.ones(num_xrisk_samples)
+            zeros -= num_explicit_zeros
+
+        catastrophe_samples = self._estimate_conditional_impact_catastrophe(num_events=num_catastrophe_samples)
+        catastrophe_weights = np.full(num_catastrophe_samples, num_catastrophe_events / max(num_catastrophe_samples, 1))
+
+        healthy_life_yrs_saved = np.concatenate(
+            (
+                self._adjust_results_for_backfiring(xrisk_samples),
+                self._adjust_results_for_backfiring(catastrophe_samples),
+            )
+        )
+        return SparseSampleArray(
+            healthy_life_yrs_saved, zeros, weights=np.concatenate((xrisk_weights, catastrophe_weights))
+        )
+
     def _default_name(self) -> str:
         return f"A generic {self.risk_type.value.title()} intervention"
 
-    @cached_property
-    def _years_risk_changed(self) -> NDArray[np.int64]:
-        return sqw.sample(self.persistence.get_distribution(), n=SIMULATIONS).astype(int)
+    def _sample_years_risk_changed(self) -> NDArray[np.int64]:
+        return self.persistence.sample(get_num_simulations()).astype(int)
 
     @inject_parameters
-    def _estimate_conditional_impact_xrisk(self, params: Parameters) -> NDArray[np.float64]:
+    def _estimate_conditional_impact_xrisk(
+        self,
+        params: Parameters,
+        years_risk_changed: NDArray[np.int64],
+    ) -> NDArray[np.float64]:
         """Estimate the amount of DALYs averted in each sample, provided that a potential extinction event happens
         while the effects of the intervention persist, it is of the type targeted, and the intervention is effective in
         protecting against it."""
         impact_method = params.impact_method.get_impact_method()
 
-        distribution_of_years_to_extinction = risk_calculator.get_distribution_of_years_to_extinction()
-        years_extinction_delayed = years_credit_calculator.sample_years_credit(
-            distribution_of_years_to_extinction,
-            np.ones(SIMULATIONS),
-            num_years_intervention_effective=self._years_risk_changed,
+        # The years of extinction and the populations are those of the simulated worlds, shared by all interventions
+        world = get_world_simulation(len(years_risk_changed))
+        years_extinction_delayed = years_credit_calculator.sample_years_credit_in_world(
+            world,
+            np.ones(len(years_risk_changed)),
+            num_years_intervention_effective=years_risk_changed,
         )
         trimmed_years_extinction_delayed = impact_method.trim_to_max_year(years_extinction_delayed)
-        total_life_years_lost = population.get_total_life_years_until(trimmed_years_extinction_delayed)
+        total_life_years_lost = population.get_total_life_years_until(trimmed_years_extinction_delayed, world)
 
         return total_life_years_lost[total_life_years_lost != 0]
 
@@ -222,35 +282,30 @@ def _estimate_conditional_impact_xrisk(self, params: Parameters) -> NDArray[np.f
     def _estimate_conditional_impact_catastrophe(
         self,
         params: LongTermParams,
-        num_events: int = SIMULATIONS,
+        num_events: int | None = None,
     ) -> NDArray[np.float64]:
         """Estimate the amount of DALYs averted in each sample, provided that a potential catastrophic event happens
         while the effects of the intervention persist, it is of the type targeted, and the intervention is effective in
         protecting against it."""
-        proportion_dead = sqw.sample(
-            params.catastrophe_intensities[self.risk_type].get_distribution(),
-            n=num_events,
+        proportion_dead = params.catastrophe_intensities[self.risk_type].sample(
+            get_num_simulations() if num_events is None else num_events
         )
         people_dead = WORLD_POPULATION_NOW * proportion_dead
         return population.calculate_life_years_lost(people_dead)
 
-    @cached_property
-    def _prop_simulations_xrisk_is_changed(self) -> float:
+    def _prop_simulations_xrisk_is_changed(self, years_risk_changed: NDArray[np.int64]) -> float:
         """Estimates in which proportion of simulations the intervention should have an effect (either causing or
         preventing) a potential existential risk event."""
         # probability of an extinction event caused by this risk during the period when this intervention's effects
         # persist
         risk_type_extinction_risk = risk_calculator.get_cumulative_risk_over_years_by_type(
             self.risk_type,
-            self._years_risk_changed,
+            years_risk_changed,
         )
 
         # probability of the intervention preventing an extinction event, conditional on a potential extinction event of
         # this type happening while the effects of the intervention persist
-        prob_effect_xrisk = (1 - self.prob_no_effect) * sqw.sample(
-            self.effect_on_xrisk.get_distribution(),
-            n=SIMULATIONS,
-        )
+        prob_effect_xrisk = (1 - self.prob_no_effect) * self.effect_on_xrisk.sample(len(years_risk_changed))
 
         # probability of a potential extinction event of this type happening while the intervention persists AND it
         # being successful in preventing the risk
@@ -258,22 +313,20 @@ def _prop_simulations_xrisk_is_changed(self) -> float:
 
         return prop_has_effect_xrisk
 
-    @cached_property
-    def _prop_simulations_catastrophe_is_changed(self) -> float:
+    def _prop_simulations_catastrophe_is_changed(self, years_risk_changed: NDArray[np.int64]) -> float:
         """Estimates in which proportion of simulations the intervention should have an effect (either causing or
         preventing) a potential catastrophic event."""
         # probability of a catastrophic event caused by this risk during the period when this intervention's effects
         # persist
         risk_type_catastrophe_risk = risk_calculator.get_cumulative_catastrophe_risk(
             risk_type=self.risk_type,
-            num_years=self._years_risk_changed,
+            num_years=years_risk_changed,
         )
 
         # probability of the intervention preventing a catastrophic event, conditional on a potential catastrophe of
         # this type happening while the effects of the intervention persist
-        prob_effect_catastrophe = (1 - self.prob_no_effect) * sqw.sample(
-            self.effect_on_catastrophic_risk.get_distribution(),
-            n=SIMULATIONS,
+        prob_effect_catastrophe = (1 - self.prob_no_effect) * self.effect_on_catastrophic_risk.sample(
+            len(years_risk_changed)
         )
 
         # probability of a potential catastrophic event of this type happening while the intervention persists AND it
@@ -293,21 +346,20 @@ def _adjust_results_for_backfiring(self, impact_results: NDArray[np.float64]) ->
         ).astype(bool)
         return np.where(are_bad_results, -impact_results, impact_results)
 
-    @cached_property
+    @property
     def _intensity_modifiers(self) -> NDArray[np.float64]:
         ## 50/50 as to whether a project is net good or bad, conditioning on having an impact at all
-        bernoulli = sqw.sample(sq.discrete({1: self.prob_good, 0: 1 - self.prob_good}), n=SIMULATIONS)
+        bernoulli = sqw.sample(sq.discrete({1: self.prob_good, 0: 1 - self.prob_good}), n=get_num_simulations())
         # set intensity to intensity_bad if bernoulli result is 0
         intensity_modifiers = np.where(bernoulli == 0, self.intensity_bad * -1, 1)
 
         return intensity_modifiers
 
-    @cached_property
+    @property
     def _base_xrisk_impact_magnitude(self) -> NDArray[np.float64]:
+        intensity_modifiers = self._intensity_modifiers
         return np.abs(
-            self._intensity_modifiers
-            * (1 - self.prob_no_effect)
-            * sqw.sample(self.effect_on_xrisk.get_distribution(), n=SIMULATIONS),
+            intensity_modifiers * (1 - self.prob_no_effect) * self.effect_on_xrisk.sample(len(intensity_modifiers)),
         )
 
     def _project_cost_per_year_given_base_xrisk_impact_magnitude(self) -> NDArray[np.float64]:
@@ -316,11 +368,8 @@ def _project_cost_per_year_given_base_xrisk_impact_magnitude(self) -> NDArray[np
         later in the process. (Such a correlation could dominate all other factors, making results not useful; see
         https://github.com/rethinkpriorities/cross-cause-model/issues/28)
         """
-        mu = (
-            (self._base_xrisk_impact_magnitude / 0.005)
-            * 10**13
-            * np.exp(-13 * (1 - self._base_xrisk_impact_magnitude))
-        )
+        base_xrisk_impact_magnitude = self._base_xrisk_impact_magnitude
+        mu = (base_xrisk_impact_magnitude / 0.005) * 10**13 * np.exp(-13 * (1 - base_xrisk_impact_magnitude))
         moe = mu / 3
 
         # This should produce something in the ballpark of
@@ -328,7 +377,7 @@ def _project_cost_per_year_given_base_xrisk_impact_magnitude(self) -> NDArray[np
         # means and std are very similar to sampling separately with each mean and std, but clipping is only approximate
         # We take a normal distribution and stretch it to different amounts
         # as if its mean were values in base_xrisk_impact array
-        sampled_deviations_from_mean = sqw.sample(sq.norm(mean=0, sd=1), n=len(self._base_xrisk_impact_magnitude))
+        sampled_deviations_from_mean = sqw.sample(sq.norm(mean=0, sd=1), n=len(base_xrisk_impact_magnitude))
         rescaled_deviations = sampled_deviations_from_mean * moe
         # Apply rescaled deviations to rescaled means
         cost_per_year = rescaled_deviations + mu
@@ -2,6 +2,7 @@
 from ccm.interventions.animal.animal_intervention_params import AnimalInterventionParams
 from ccm.interventions.ghd.ghd_intervention_params import GhdInterventionParams
 from ccm.interventions.xrisk.impact.impact_method_params import ImpactMethodParams
+from ccm.simulation_params import SimulationParams
 from ccm.world.longterm_params import LongTermParams
 
 
@@ -14,6 +15,7 @@ class Parameters(BaseParameters, frozen=True):
     animal_intervention_params: AnimalInterventionParams = AnimalInterventionParams()
     longterm_params: LongTermParams = LongTermParams()
     impact_method: ImpactMethodParams = ImpactMethodParams()
+    simulation_params: SimulationParams = SimulationParams()
 
     @classmethod
     def is_top_params_obj(cls) -> bool:
@@ -10,7 +10,6 @@ class CauseBenchmarkInterventionFundingPool(FundingPool):
 
     def __init__(self, cause: str, sub_cause: str) -> None:
         self.intervention = interventions.construct_cause_benchmark_intervention(cause, sub_cause)
-        super().__init__()
 
     def get_name(self) -> str:
         return "Cause Area Benchmark"
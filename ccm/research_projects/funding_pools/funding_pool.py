@@ -1,12 +1,11 @@
 from abc import ABC, abstractmethod
-from copy import deepcopy
 
 import numpy as np
 from numpy.typing import NDArray
-from scipy.sparse import coo_array
 
+from ccm.interventions.estimate_cache import ESTIMATE_CACHE
 from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
-from ccm.utility.squigglepy_wrapper import RNG
+from ccm.utility.sparse_samples import SparseSampleArray
 
 
 class FundingPool(ABC):
@@ -16,9 +15,6 @@ class FundingPool(ABC):
     the 'cheaper' that money is counterfactually in DALY terms.
     """
 
-    def __init__(self) -> None:
-        self._cached_DALY_efficiency: coo_array | None = None
-
     @abstractmethod
     def get_name(self) -> str:
         pass
@@ -27,34 +23,19 @@ def get_name(self) -> str:
     def get_counterfactual_intervention(self) -> SomeIntervention:
         pass
 
-    def convert_dollars_to_dalys(self, cost: NDArray[np.float64] | float) -> coo_array:
+    def convert_dollars_to_dalys(self, cost: NDArray[np.float64] | float) -> SparseSampleArray:
         """Convert a single float or array of Dollar amounts into an array of equivalent DALY amounts, based on the
         effectiveness of an underlying Counterfactual Intervention.
         """
-        if self._cached_DALY_efficiency is not None:
-            daly_efficiency = self._cached_DALY_efficiency
-        else:
-            counterfactual = self.get_counterfactual_intervention()
-            samples, zeros = counterfactual.estimate_dalys_per_1000()
-
-            sample_length_with_zeros = len(samples) + zeros
-            positions = RNG.choice(
-                sample_length_with_zeros,
-                size=len(samples),
-                replace=False,
-            )
-            # Insert the samples at random positions in a sparse array of zeros
-            sparse_samples = coo_array(
-                (samples, (np.zeros(len(samples)), positions)),
-                shape=(1, sample_length_with_zeros),
-            )
-
-            daly_efficiency = sparse_samples / 1000
-
-            # Cache so that the sample order will remain the same between comparisons
-            self._cached_DALY_efficiency = daly_efficiency
-
-        cost_in_dalys = deepcopy(daly_efficiency)  # copy matrix shape and non-zero positions
-        cost_in_dalys.data = cost * daly_efficiency.data  # type: ignore  false-positive (??)
-
-        return cost_in_dalys
+        counterfactual = self.get_counterfactual_intervention()
+        samples = counterfactual.estimate_dalys_per_1000()
+        # The samples are placed at random positions among the zeros. The positions are cached alongside
+        # the estimate, so that the sample order remains the same between comparisons. They only depend
+        # on the number of samples and zeros of the estimate.
+        positions = ESTIMATE_CACHE.get(
+            counterfactual,
+            f"funding_pool_positions/{samples.nnz}/{samples.num_zeros}",
+            lambda: samples.with_random_positions().positions,
+        )
+        daly_efficiency = SparseSampleArray(samples.data / 1000, samples.num_zeros, positions, samples.weights)
+        return daly_efficiency * cost
@@ -10,7 +10,6 @@ class SpecifiedInterventionFundingPool(FundingPool):
     def __init__(self, intervention: Intervention, name: str = "Specified Intervention") -> None:
         self.intervention = intervention
         self._name = name
-        super().__init__()
 
     def get_name(self) -> str:
         return self._name
@@ -1,5 +1,6 @@
 import numpy as np
-from scipy.sparse import coo_array
+
+from ccm.utility.sparse_samples import SparseSampleArray
 
 
 class BottomLine:
@@ -14,11 +15,25 @@ class BottomLine:
 
     def __init__(
         self,
-        roi: coo_array,
+        roi: SparseSampleArray,
         average_roi: np.float64,
-        gross_dalys_per_1000: coo_array,
+        gross_dalys_per_1000: SparseSampleArray,
     ) -> None:
         self.roi = roi
         # Average ROI calculated as a Ratio of Averages (rather than an Average of Ratios)
         self.average_roi = average_roi
         self.gross_dalys_per_1000 = gross_dalys_per_1000
+
+    @classmethod
+    def concatenate(cls, bottom_lines: list["BottomLine"]) -> "BottomLine":
+        """Joins the samples of several BottomLines that were computed from separate batches of simulations.
+        The Average ROI of the batches is averaged, weighted by the number of samples in each batch.
+        """
+        num_samples = [bottom_line.roi.size for bottom_line in bottom_lines]
+        return cls(
+            roi=SparseSampleArray.concatenate([bottom_line.roi for bottom_line in bottom_lines]),
+            average_roi=np.average([bottom_line.average_roi for bottom_line in bottom_lines], weights=num_samples),
+            gross_dalys_per_1000=SparseSampleArray.concatenate(
+                [bottom_line.gross_dalys_per_1000 for bottom_line in bottom_lines]
+            ),
+        )
@@ -1,9 +1,9 @@
 import numpy as np
 from numpy.typing import NDArray
-from scipy.sparse import coo_array
 
 from ccm.research_projects.funding_pools.funding_pool import FundingPool
 from ccm.research_projects.projects.bottom_line import BottomLine
+from ccm.utility.sparse_samples import SparseSampleArray
 
 
 class ProjectAssessment:
@@ -14,9 +14,9 @@ def __init__(
         short_name: str,
         cost: NDArray[np.float64],
         years_credit: NDArray[np.float64],
-        gross_impact_dalys: coo_array,
-        net_impact_dalys: coo_array,
-        net_dalys_per_staff_year: coo_array,
+        gross_impact_dalys: SparseSampleArray,
+        net_impact_dalys: SparseSampleArray,
+        net_dalys_per_staff_year: SparseSampleArray,
         bottom_lines: dict[FundingPool, BottomLine],
     ) -> None:
         self.short_name = short_name
@@ -26,3 +26,23 @@ def __init__(
         self.net_impact_DALYs = net_impact_dalys
         self.net_DALYs_per_staff_year = net_dalys_per_staff_year
         self.bottom_lines = bottom_lines
+
+    @classmethod
+    def concatenate(cls, assessments: list["ProjectAssessment"]) -> "ProjectAssessment":
+        """Joins the samples of several assessments of the same project, made from separate batches of simulations."""
+        return cls(
+            short_name=assessments[0].short_name,
+            cost=np.concatenate([assessment.cost for assessment in assessments]),
+            years_credit=np.concatenate([assessment.years_credit for assessment in assessments]),
+            gross_impact_dalys=SparseSampleArray.concatenate(
+                [assessment.gross_impact_DALYs for assessment in assessments]
+            ),
+            net_impact_dalys=SparseSampleArray.concatenate([assessment.net_impact_DALYs for assessment in assessments]),
+            net_dalys_per_staff_year=SparseSampleArray.concatenate(
+                [assessment.net_DALYs_per_staff_year for assessment in assessments]
+            ),
+            bottom_lines={
+                pool: BottomLine.concatenate([assessment.bottom_lines[pool] for assessment in assessments])
+                for pool in assessments[0].bottom_lines
+            },
+        )
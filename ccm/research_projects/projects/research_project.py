@@ -1,22 +1,20 @@
-from copy import deepcopy
-
 import numpy as np
 import squigglepy as sq
 from numpy.typing import NDArray
-from scipy.sparse import coo_array
 from squigglepy.numbers import K, M
 
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
+from ccm.contexts import get_rng
 from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
 from ccm.research_projects.funding_pools.funding_pool import FundingPool
 from ccm.research_projects.projects.bottom_line import BottomLine
 from ccm.research_projects.projects.funding_profile import FundingProfile
 from ccm.research_projects.projects.project_assessment import ProjectAssessment
-from ccm.utility.squigglepy_wrapper import RNG
-from ccm.utility.utils import enforce_min_absolute_value, match_coo_axis_lengths
+from ccm.simulation_params import get_dtype, get_num_simulations
+from ccm.utility.models import DistributionSpec
+from ccm.utility.sparse_samples import SparseSampleArray, match_sizes
+from ccm.utility.utils import enforce_min_absolute_value
 
-SIMULATIONS = config.get_simulations()
 DOLLAR_TO_1000_D_CONVERSION = 1_000
 DALY_EFFICIENCY_MIN_ABSOLUTE_VALUE = 1e-20
 
@@ -67,6 +65,8 @@ def __init__(
         self.years_credit = years_credit
         self.funding_profile = funding_profile
         self.cost_per_staff_year = cost_per_staff_year
+        # DistributionSpec equivalents of the distributions above (None if there is none), by id of the distribution
+        self._specs: dict[int, DistributionSpec | None] = {}
 
     def assess_project(self) -> ProjectAssessment:
         """Assess the gain in DALYs of pursuing this research project
@@ -95,32 +95,20 @@ def assess_project(self) -> ProjectAssessment:
         )
 
         # Estimate DALYs producted if support were redirected from existing interventions to this research project.
-        samples, zeros = self.target_intervention.estimate_dalys_per_1000()
-
-        sample_length_with_zeros = len(samples) + zeros
-        positions = RNG.choice(sample_length_with_zeros, size=len(samples), replace=False)
-        sparse_samples = coo_array(
-            (samples, (np.zeros(len(samples)), positions)),
-            shape=(1, sample_length_with_zeros),
-        )
-
-        target_int_dalys_per_dollar = sparse_samples / DOLLAR_TO_1000_D_CONVERSION
+        target_int_dalys_per_1000 = self.target_intervention.estimate_dalys_per_1000().with_random_positions()
+        target_int_dalys_per_dollar = target_int_dalys_per_1000 / DOLLAR_TO_1000_D_CONVERSION
 
         # the source and the target in interventions may have different total lengths, because the lower the probability
         # of an intervention being effective, the more zeros will have be added when calling its
         # `.estimate_dalys_per_1000()` method. Therefore, before any comparison is made between the two, we need to
         # resize one of them so that they have the same lengths, while keeping the right proportion of zeros
-        resized_target_int_dalys_per_dollar, resized_counterfactual_int_dalys_per_dollar = match_coo_axis_lengths(
+        resized_target_int_dalys_per_dollar, resized_counterfactual_int_dalys_per_dollar = match_sizes(
             target_int_dalys_per_dollar,
             counterfactual_int_dalys_per_dollar,
-            axis=1,
         )
 
         # The difference is the net gain in DALYs, per dollar.
-        additional_dalys_per_dollar = deepcopy(resized_target_int_dalys_per_dollar)
-        additional_dalys_per_dollar.data = (  # type: ignore  # scipy-related error
-            resized_target_int_dalys_per_dollar.data - resized_counterfactual_int_dalys_per_dollar.data
-        )
+        additional_dalys_per_dollar = resized_target_int_dalys_per_dollar - resized_counterfactual_int_dalys_per_dollar
 
         # Impact only lasts as long as years of advance RP offers to interventions inevitable discovery.
         # Adjust DALY gain by years of discovery advance AND by percentage of support to be shifted.
@@ -133,9 +121,10 @@ def assess_project(self) -> ProjectAssessment:
         net_impact_in_dalys = ResearchProject._calc_net_impact(gross_impact_in_dalys, cost_segments_dalys)
 
         # Calcuate impact as ratio of staff time.
-        fte_years_for_project_resized = RNG.choice(fte_years_for_project, size=net_impact_in_dalys.nnz, replace=False)
-        net_dalys_per_staff_year = deepcopy(net_impact_in_dalys)
-        net_dalys_per_staff_year.data = net_impact_in_dalys.data / fte_years_for_project_resized
+        fte_years_for_project_resized = get_rng().choice(
+            fte_years_for_project, size=net_impact_in_dalys.nnz, replace=False
+        )
+        net_dalys_per_staff_year = net_impact_in_dalys / fte_years_for_project_resized
 
         bottom_lines = ResearchProject._calc_bottom_lines_for_each_funding_pool(
             gross_impact_in_dalys,
@@ -157,22 +146,33 @@ def assess_project(self) -> ProjectAssessment:
 
     # ///////////////// Private Instance Methods /////////////////
 
+    def _sample(self, dist: sq.OperableDistribution, n: int) -> NDArray[np.float64]:
+        """Samples one of the project's distributions through its DistributionSpec where possible,
+        so that it follows the sampling method of the context like the interventions do."""
+        if id(dist) not in self._specs:
+            try:
+                self._specs[id(dist)] = DistributionSpec.from_distribution(dist)
+            except (TypeError, ValueError):
+                self._specs[id(dist)] = None
+        spec = self._specs[id(dist)]
+        return sqw.sample(dist, n=n) if spec is None else spec.sample(n)
+
     def _estimate_fte_years(self) -> NDArray[np.float64]:
-        fte_years_for_project = sqw.sample(self.fte_years, n=SIMULATIONS)
+        fte_years_for_project = self._sample(self.fte_years, get_num_simulations())
         return fte_years_for_project
 
     def _estimate_counterfactual_credit_years(self) -> NDArray[np.float64]:
         """Estimate how many years of counterfactual credit RP gets for the project. In other words, in how many years
         would the Target Intervention or better have been discovered by the funder without the Research Project?
         """
-        credit_years = sqw.sample(self.years_credit, n=SIMULATIONS)
+        credit_years = self._sample(self.years_credit, get_num_simulations())
         return credit_years
 
     def _estimate_gross_impact_in_dalys(
         self,
         num_years_credit: NDArray[np.float64],
-        additional_dalys_per_dollar: coo_array,
-    ) -> coo_array:
+        additional_dalys_per_dollar: SparseSampleArray,
+    ) -> SparseSampleArray:
         """Estimate gross amount of DALYs produced by the Research Project, based on how much of the relevant cause
         area money we expect to influence, how many additional DALYs per dollar we are expecting from the Target
         Intervention as compared to the counterfactual, and how many years of counterfactual impact we can take credit
@@ -180,10 +180,11 @@ def _estimate_gross_impact_in_dalys(
         """
 
         non_zero_samples = additional_dalys_per_dollar.nnz
-        prob_conclusions_need_updating = sqw.sample(self.conclusions_require_updating, n=non_zero_samples)
-        prob_target_updating = sqw.sample(self.target_updating, n=non_zero_samples)
-        money_in_area_per_year = sqw.sample(self.money_in_area_millions, n=non_zero_samples) * M
-        percent_money_influenced_per_year = sqw.sample(self.percent_money_influenceable, n=non_zero_samples)
+        prob_conclusions_need_updating = self._sample(self.conclusions_require_updating, non_zero_samples)
+        prob_target_updating = self._sample(self.target_updating, non_zero_samples)
+        # A float multiplier keeps float32 samples in float32, where an integer this large would upcast them
+        money_in_area_per_year = self._sample(self.money_in_area_millions, non_zero_samples) * float(M)
+        percent_money_influenced_per_year = self._sample(self.percent_money_influenceable, non_zero_samples)
 
         influenced_money_per_year = ResearchProject._calc_amount_money_influenced_per_year(
             prob_conclusions_need_updating,
@@ -192,21 +193,15 @@ def _estimate_gross_impact_in_dalys(
             percent_money_influenced_per_year,
         )
 
-        influenced_money_per_year_sparse = deepcopy(additional_dalys_per_dollar)  # copy shape and non-zero positions
-        influenced_money_per_year_sparse.data = influenced_money_per_year
-
         impr_per_year = ResearchProject._calc_val_impr_per_year(
-            influenced_money_per_year_sparse,
+            additional_dalys_per_dollar.with_data(influenced_money_per_year),
             additional_dalys_per_dollar,
         )
 
-        est_impact = deepcopy(impr_per_year)  # copy matrix shape and non-zero positions
-        est_impact.data = impr_per_year.data * num_years_credit  # type: ignore  # scipy-related typing error
-
-        return est_impact
+        return impr_per_year * num_years_credit
 
     def _estimate_project_costs(self, fte_years_for_project: NDArray[np.float64]) -> NDArray[np.float64]:
-        staff_cost_per_fte_year = sqw.sample(self.cost_per_staff_year, n=SIMULATIONS)
+        staff_cost_per_fte_year = self._sample(self.cost_per_staff_year, len(fte_years_for_project))
         project_cost = staff_cost_per_fte_year * fte_years_for_project
 
         return project_cost
@@ -224,7 +219,7 @@ def _segment_costs_by_funding_pool(
 
     def _convert_cost_segments_to_dalys(
         self, cost_segments_dollars: dict[FundingPool, NDArray[np.float64]]
-    ) -> dict[FundingPool, coo_array]:
+    ) -> dict[FundingPool, SparseSampleArray]:
         """Using each Funding Pools counterfactual conversion rate, convert each Cost Segment from Dollars to DALYs."""
         cost_segments_dalys = {}
         for pool, segment_dollar_cost in cost_segments_dollars.items():
@@ -234,20 +229,18 @@ def _convert_cost_segments_to_dalys(
     # ///////////////// Private Static Methods /////////////////
 
     @staticmethod
-    def _estimate_weighted_dalys_per_dollar(weighted_funding_pools: dict[FundingPool, float]) -> coo_array:
+    def _estimate_weighted_dalys_per_dollar(weighted_funding_pools: dict[FundingPool, float]) -> SparseSampleArray:
         """Estimate a weighted average DALYs/dollar conversion rate based on the given Funding Pools."""
-        dalys_per_dollar: coo_array | None = None
+        dalys_per_dollar: SparseSampleArray | None = None
         for pool, weight in weighted_funding_pools.items():
-            weighted_dalys_per_dollar = pool.convert_dollars_to_dalys(np.ones(SIMULATIONS)) * weight
+            weighted_dalys_per_dollar = (
+                pool.convert_dollars_to_dalys(np.ones(get_num_simulations(), dtype=get_dtype())) * weight
+            )
             if dalys_per_dollar is None:
                 dalys_per_dollar = weighted_dalys_per_dollar
             else:
-                dalys_per_dollar, weighted_dalys_per_dollar = match_coo_axis_lengths(
-                    dalys_per_dollar,
-                    weighted_dalys_per_dollar,
-                    axis=1,
-                )
-                dalys_per_dollar.data += weighted_dalys_per_dollar.data  # type: ignore  # scipy-related typing error
+                dalys_per_dollar, weighted_dalys_per_dollar = match_sizes(dalys_per_dollar, weighted_dalys_per_dollar)
+                dalys_per_dollar = dalys_per_dollar + weighted_dalys_per_dollar
 
         assert dalys_per_dollar is not None, "Empty funding pool"
         return dalys_per_dollar
@@ -267,35 +260,32 @@ def _calc_amount_money_influenced_per_year(
 
     @staticmethod
     def _calc_net_impact(
-        gross_impact_in_dalys: coo_array,
-        cost_segments_dalys: dict[FundingPool, coo_array],
-    ) -> coo_array:
+        gross_impact_in_dalys: SparseSampleArray,
+        cost_segments_dalys: dict[FundingPool, SparseSampleArray],
+    ) -> SparseSampleArray:
         """Net-Impact-in-DALYs is defined as (gross impact in DALYS - total cost in DALYs). Note that the Gross Impact
         and Costs must both be in the same unit.
         """
-        net_impact_in_dalys = deepcopy(gross_impact_in_dalys)  # copy matrix shape and non-zero positions
+        net_impact_in_dalys = gross_impact_in_dalys
         for cost_segment_dalys in cost_segments_dalys.values():
-            net_impact_in_dalys.data = gross_impact_in_dalys.data - cost_segment_dalys.data  # type: ignore
+            net_impact_in_dalys = gross_impact_in_dalys - cost_segment_dalys.data
         return net_impact_in_dalys
 
     @staticmethod
     def _calc_val_impr_per_year(
-        mon_infl_per_year: coo_array,
-        additional_dalys_per_dollar: coo_array,
-    ) -> coo_array:
+        mon_infl_per_year: SparseSampleArray,
+        additional_dalys_per_dollar: SparseSampleArray,
+    ) -> SparseSampleArray:
         """Calculate amount of gross DALYs obtained by the Research Project."""
-
-        impr_per_year = deepcopy(mon_infl_per_year)  # copy matrix shape and non-zero positions
-        impr_per_year.data = mon_infl_per_year.data * additional_dalys_per_dollar.data  # type: ignore  # scipy's fault
-        return impr_per_year
+        return mon_infl_per_year * additional_dalys_per_dollar
 
     @staticmethod
     def _calc_bottom_lines_for_each_funding_pool(
-        gross_impact_in_dalys: coo_array,
-        net_impact_in_dalys: coo_array,
+        gross_impact_in_dalys: SparseSampleArray,
+        net_impact_in_dalys: SparseSampleArray,
         total_project_costs: NDArray[np.float64],
         cost_segments_dollars: dict[FundingPool, NDArray[np.float64]],
-        cost_segments_dalys: dict[FundingPool, coo_array],
+        cost_segments_dalys: dict[FundingPool, SparseSampleArray],
     ) -> dict[FundingPool, BottomLine]:
         """Calculates the bottom-line figures per Funding Pool."""
         bottom_lines = {}
@@ -311,11 +301,11 @@ def _calc_bottom_lines_for_each_funding_pool(
 
     @staticmethod
     def _calc_bottom_line_for_funding_pool(
-        gross_impact_in_dalys: coo_array,
-        net_impact_in_dalys: coo_array,
+        gross_impact_in_dalys: SparseSampleArray,
+        net_impact_in_dalys: SparseSampleArray,
         total_cost_dollars: NDArray[np.float64],
         segment_cost_dollars: NDArray[np.float64],
-        segment_cost_in_dalys: coo_array,
+        segment_cost_in_dalys: SparseSampleArray,
     ) -> BottomLine:
         """Calculates the bottom-line figures for a given Funding Pool. In order to prevent double-counting of impact,
         we assign a proportion_of_credit weighted by how much of the total cost in dollars was covered by the given
@@ -323,30 +313,19 @@ def _calc_bottom_line_for_funding_pool(
         """
         # Note: Enforcing a minimum absolute value for current_DALYs_per_dollar,
         # to prevent division overflows and inf ratios
-        segment_cost_in_dalys.data = enforce_min_absolute_value(
-            segment_cost_in_dalys.data,  # type: ignore  # scipy's fault
-            DALY_EFFICIENCY_MIN_ABSOLUTE_VALUE,
+        segment_cost_in_dalys = segment_cost_in_dalys.with_data(
+            enforce_min_absolute_value(segment_cost_in_dalys.data, DALY_EFFICIENCY_MIN_ABSOLUTE_VALUE)
         )
 
         proportion_credit = segment_cost_dollars / total_cost_dollars
-        segment_net_impact_in_dalys_non_zeros = net_impact_in_dalys.data * proportion_credit  # type: ignore
-        roi_non_zeros = segment_net_impact_in_dalys_non_zeros.data / segment_cost_in_dalys.data
-
-        roi = deepcopy(segment_cost_in_dalys)  # copy matrix shape and non-zero positions
-        roi.data = roi_non_zeros
+        segment_net_impact_in_dalys = net_impact_in_dalys * proportion_credit
+        # (In the layout of the impact, which carries the weights of stratified sampling, if any)
+        roi = segment_net_impact_in_dalys.with_data(segment_net_impact_in_dalys.data / segment_cost_in_dalys.data)
 
-        ave_segment_net_impact_in_dalys = np.sum(segment_net_impact_in_dalys_non_zeros) / np.multiply(
-            *segment_cost_in_dalys.shape,
-        )
-        ave_segment_cost_dollars = np.sum(segment_cost_in_dalys.data) / np.multiply(*segment_cost_in_dalys.shape)
-        average_roi = ave_segment_net_impact_in_dalys / ave_segment_cost_dollars
-
-        segment_gross_impact_in_dalys_non_zeros = gross_impact_in_dalys.data * proportion_credit  # type: ignore
-        gross_dalys_per_1000_non_zeros = DOLLAR_TO_1000_D_CONVERSION * (
-            segment_gross_impact_in_dalys_non_zeros / segment_cost_dollars.data
-        )
+        # The ratio of the averages of the samples, zeros included
+        average_roi = np.float64(segment_net_impact_in_dalys.mean() / segment_cost_in_dalys.mean())
 
-        gross_dalys_per_1000 = deepcopy(gross_impact_in_dalys)  # copy matrix shape and non-zero positions
-        gross_dalys_per_1000.data = gross_dalys_per_1000_non_zeros
+        segment_gross_impact_in_dalys = gross_impact_in_dalys * proportion_credit
+        gross_dalys_per_1000 = DOLLAR_TO_1000_D_CONVERSION * (segment_gross_impact_in_dalys / segment_cost_dollars)
 
         return BottomLine(roi, average_roi, gross_dalys_per_1000)
@@ -0,0 +1,123 @@
+from typing import Annotated, Literal
+
+import numpy as np
+from pydantic import Field
+
+import ccm.config as config
+from ccm.base_parameters import BaseParameters
+from ccm.contexts import inject_parameters
+
+MAX_SIMULATIONS = 10_000_000
+
+# "monte carlo" draws independent pseudo-random samples, while the other methods spread the samples
+# of each distribution evenly over its quantiles, so that percentiles settle with fewer samples
+SamplingMethod = Literal["monte carlo", "sobol", "latin hypercube"]
+
+# Floating point precision of the samples. float32 halves memory use and bandwidth, at the cost of precision
+SampleDtype = Literal["float64", "float32"]
+
+
+class SimulationParams(BaseParameters, frozen=True):
+    """Parameters controlling how the Monte Carlo simulations are run."""
+
+    type: Literal["Simulation Parameters"] = "Simulation Parameters"
+    version: Literal["1"] = "1"
+    simulations: Annotated[
+        int,
+        Field(
+            title="Number of simulations",
+            description=(
+                "How many samples are drawn for each estimate. Fewer samples are faster to compute, "
+                "while more samples give more precise results."
+            ),
+            gt=0,
+            le=MAX_SIMULATIONS,
+        ),
+    ] = config.get_simulations()
+    sampling_method: Annotated[
+        SamplingMethod,
+        Field(
+            title="Sampling method",
+            description=(
+                "How samples are drawn from the input distributions. Sobol and Latin hypercube sampling "
+                "stratify the samples of each distribution, which needs fewer samples for the same precision."
+            ),
+        ),
+    ] = "monte carlo"
+    dtype: Annotated[
+        SampleDtype,
+        Field(
+            title="Sample precision",
+            description=(
+                "The floating point type of the samples. float32 uses half the memory of float64, "
+                "which is precise enough for displaying results."
+            ),
+        ),
+    ] = "float64"
+    tolerance: Annotated[
+        float | None,
+        Field(
+            title="Target relative standard error",
+            description=(
+                "If set, batches of simulations are drawn until the standard error of the mean and of the "
+                "tolerance percentiles, relative to their estimates, falls under this value. "
+                "Otherwise a single batch is drawn."
+            ),
+            gt=0,
+        ),
+    ] = None
+    tolerance_percentiles: Annotated[
+        tuple[Annotated[float, Field(ge=0, le=100)], ...],
+        Field(
+            title="Tolerance percentiles",
+            description="The percentiles whose standard error must fall under the tolerance, besides the mean.",
+        ),
+    ] = (5, 50, 95)
+    max_simulations: Annotated[
+        int,
+        Field(
+            title="Maximum number of simulations",
+            description=(
+                "The most samples that are drawn when batches are drawn until the tolerance is met, "
+                "even if the tolerance hasn't been met yet."
+            ),
+            gt=0,
+            le=MAX_SIMULATIONS,
+        ),
+    ] = 1_000_000
+    stratified_sampling: Annotated[
+        bool,
+        Field(
+            title="Stratified sampling",
+            description=(
+                "If set, the estimates of x-risk interventions sample extinctions and catastrophes as separate "
+                "strata, keeping up to half of the samples for extinctions however rare they are next to "
+                "catastrophes, and weight each sample by the number of events it stands for. "
+                "This makes the estimates of rare, high-impact outcomes more precise."
+            ),
+        ),
+    ] = False
+
+
+@inject_parameters
+def get_num_simulations(params: SimulationParams) -> int:
+    """Returns the number of simulations to run in the current context."""
+    return params.simulations
+
+
+@inject_parameters
+def get_sampling_method(params: SimulationParams) -> SamplingMethod:
+    """Returns the sampling method to use in the current context."""
+    return params.sampling_method
+
+
+@inject_parameters
+def get_dtype(params: SimulationParams) -> np.dtype:
+    """Returns the floating point type of the samples in the current context."""
+    return np.dtype(params.dtype)
+
+
+@inject_parameters
+def get_stratified_sampling(params: SimulationParams) -> bool:
+    """Returns whether x-risk interventions are estimated by stratified sampling in the current context."""
+    return params.stratified_sampling
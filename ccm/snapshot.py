@@ -0,0 +1,291 @@
+"""
+A snapshot of the results of the model with the default parameters, built ahead of time and served by the API,
+as most requests are made with the default parameters.
+
+The snapshot holds the estimates of the interventions of the catalogue (by fingerprint) and the assessments of
+the research projects (by short name, with their bottom lines by funding pool name), drawn with a fixed seed.
+It is written as an uncompressed npz file of columns: the samples of all interventions are one array, sliced by
+an array of offsets, and so on (as are the positions and weights of sparse samples, where they have them). Samples
+don't compress much, and uncompressed columns can be memory-mapped, so that loading the snapshot is instant
+and its pages are shared by the processes of the API.
+
+The snapshot is tagged with a hash of the code of the model and the fingerprint of the default parameters,
+and is only loaded if both still match.
+
+Build it with `python -m ccm.snapshot`, which estimates the interventions in a pool of processes.
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import struct
+import zipfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+import ccm.adaptive as adaptive
+import ccm.config as config
+from ccm.adaptive import AdaptiveResult
+from ccm.catalogue import map_catalogue
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.intervention import Intervention
+from ccm.interventions.intervention_definitions.all_interventions import get_unscaled_interventions
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.bottom_line import BottomLine
+from ccm.research_projects.projects.project_assessment import ProjectAssessment
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.research_projects.projects.research_project import ResearchProject
+from ccm.utility.sparse_samples import SparseSampleArray
+
+SNAPSHOT_SEED = 0
+
+# The fields of project assessments that are kept, and whether they are sparse
+_ASSESSMENT_COLUMNS = {
+    "cost": False,
+    "years_credit": False,
+    "gross_impact_DALYs": True,
+    "net_impact_DALYs": True,
+    "net_DALYs_per_staff_year": True,
+}
+
+
+def code_version() -> str:
+    """Returns a hash of the source of the model, which changes whenever its code does."""
+    digest = hashlib.sha256()
+    package_dir = config.BASE_DIR / "ccm"
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(path.relative_to(package_dir).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class ResultsSnapshot:
+    """The results of the model with the parameters and the code it was built with (see `build_snapshot`)."""
+
+    def __init__(self, columns: dict[str, NDArray]) -> None:
+        self._columns = columns
+        self.code_version = str(columns["metadata/code_version"][0])
+        self.parameters_fingerprint = str(columns["metadata/parameters_fingerprint"][0])
+        self._interventions = {
+            str(fingerprint): index for index, fingerprint in enumerate(columns["interventions/fingerprint"])
+        }
+        self._projects = {str(name): index for index, name in enumerate(columns["projects/short_name"])}
+
+    @classmethod
+    def load(cls, path: Path) -> "ResultsSnapshot | None":
+        """
+        Memory-maps the snapshot at the path. Returns None if there is none, or if it was built with another
+        version of the code or other default parameters, as its results would be out of date.
+        """
+        if not path.exists():
+            logging.info(f"No snapshot of the default results at {path}")
+            return None
+        snapshot = cls(_memory_map_npz(path))
+        if snapshot.code_version != code_version():
+            logging.warning(f"Ignoring the snapshot at {path}, as it was built with another version of the code")
+            return None
+        if snapshot.parameters_fingerprint != Parameters().fingerprint():
+            logging.warning(f"Ignoring the snapshot at {path}, as it was built with other default parameters")
+            return None
+        return snapshot
+
+    def estimate(self, intervention: Intervention, parameters: Parameters) -> AdaptiveResult[SparseSampleArray] | None:
+        """Returns the snapshot's estimate of the intervention, if it has one with these parameters."""
+        index = self._interventions.get(intervention.fingerprint())
+        if index is None or parameters.fingerprint() != self.parameters_fingerprint:
+            return None
+        return AdaptiveResult(
+            self._sparse("interventions/estimate", index),
+            float(self._columns["interventions/relative_error"][index]),
+            int(self._columns["interventions/batches"][index]),
+        )
+
+    def assessment(self, project: ResearchProject, parameters: Parameters) -> AdaptiveResult[ProjectAssessment] | None:
+        """
+        Returns the snapshot's assessment of the project, if it has one with these parameters, and its bottom lines
+        are for the funding pools of the project.
+        """
+        index = self._projects.get(project.short_name)
+        if index is None or parameters.fingerprint() != self.parameters_fingerprint:
+            return None
+        pools = {pool.get_name(): pool for pool in project.funding_profile.research_funding_sources}
+        bottom_line_indices = np.flatnonzero(self._columns["bottom_lines/project"] == index)
+        pool_names = [str(self._columns["bottom_lines/pool"][row]) for row in bottom_line_indices]
+        if sorted(pool_names) != sorted(pools):
+            return None
+        columns = {
+            name: self._sparse(f"projects/{name}", index) if sparse else self._dense(f"projects/{name}", index)
+            for name, sparse in _ASSESSMENT_COLUMNS.items()
+        }
+        assessment = ProjectAssessment(
+            project.short_name,
+            columns["cost"],
+            columns["years_credit"],
+            columns["gross_impact_DALYs"],
+            columns["net_impact_DALYs"],
+            columns["net_DALYs_per_staff_year"],
+            bottom_lines={
+                pools[pool_name]: BottomLine(
+                    self._sparse("bottom_lines/roi", row),
+                    np.float64(self._columns["bottom_lines/average_roi"][row]),
+                    self._sparse("bottom_lines/gross_dalys_per_1000", row),
+                )
+                for pool_name, row in zip(pool_names, bottom_line_indices)
+            },
+        )
+        return AdaptiveResult(
+            assessment,
+            float(self._columns["projects/relative_error"][index]),
+            int(self._columns["projects/batches"][index]),
+        )
+
+    def _dense(self, column: str, index: int) -> NDArray:
+        return _read_dense(self._columns, column, index)
+
+    def _sparse(self, column: str, index: int) -> SparseSampleArray:
+        return _read_sparse(self._columns, column, index)
+
+
+def build_snapshot(
+    path: Path,
+    interventions: Sequence[Intervention] | None = None,
+    projects: Sequence[ResearchProject] | None = None,
+    max_workers: int | None = 0,
+) -> None:
+    """
+    Estimates the interventions and assesses the projects (by default, those served by the API) with the
+    default parameters and a fixed seed, and writes the results to a snapshot at the path. The interventions are
+    estimated in a pool of `max_workers` processes (see `ccm.catalogue.map_catalogue`), by default in this one.
+    """
+    interventions = get_unscaled_interventions() if interventions is None else interventions
+    projects = get_all_projects(False) if projects is None else projects
+    parameters = Parameters()
+    with using_parameters(parameters), using_rng(SNAPSHOT_SEED):
+        # All with the seed of the snapshot, as each estimate draws from a stream of its own derived from it
+        # (see `ccm.interventions.estimate_cache`), whichever process it is drawn in
+        estimates = map_catalogue(
+            adaptive.estimate_dalys_per_1000, interventions, [SNAPSHOT_SEED] * len(interventions), max_workers
+        )
+        assessments = [adaptive.assess_project(project) for project in projects]
+
+    columns: dict[str, NDArray] = {
+        "metadata/code_version": np.array([code_version()]),
+        "metadata/parameters_fingerprint": np.array([parameters.fingerprint()]),
+        "interventions/fingerprint": np.array([intervention.fingerprint() for intervention in interventions]),
+        "interventions/relative_error": np.array([estimate.relative_error for estimate in estimates]),
+        "interventions/batches": np.array([estimate.batches for estimate in estimates]),
+        **_sparse_column("interventions/estimate", [estimate.result for estimate in estimates]),
+        "projects/short_name": np.array([project.short_name for project in projects]),
+        "projects/relative_error": np.array([assessment.relative_error for assessment in assessments]),
+        "projects/batches": np.array([assessment.batches for assessment in assessments]),
+    }
+    for name, sparse in _ASSESSMENT_COLUMNS.items():
+        samples = [getattr(assessment.result, name) for assessment in assessments]
+        columns.update(
+            _sparse_column(f"projects/{name}", samples) if sparse else _dense_column(f"projects/{name}", samples)
+        )
+    # One row for each funding pool of each project
+    bottom_lines = [
+        (index, pool.get_name(), bottom_line)
+        for index, assessment in enumerate(assessments)
+        for pool, bottom_line in assessment.result.bottom_lines.items()
+    ]
+    columns.update(
+        {
+            "bottom_lines/project": np.array([index for index, _, _ in bottom_lines], dtype=np.int64),
+            "bottom_lines/pool": np.array([pool_name for _, pool_name, _ in bottom_lines], dtype=str),
+            "bottom_lines/average_roi": np.array(
+                [bottom_line.average_roi for _, _, bottom_line in bottom_lines], dtype=np.float64
+            ),
+            **_sparse_column("bottom_lines/roi", [bottom_line.roi for _, _, bottom_line in bottom_lines]),
+            **_sparse_column(
+                "bottom_lines/gross_dalys_per_1000",
+                [bottom_line.gross_dalys_per_1000 for _, _, bottom_line in bottom_lines],
+            ),
+        }
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Uncompressed, so that the columns can be memory-mapped. Written aside and moved in place, so that processes
+    # that have the previous snapshot memory-mapped keep reading it whole
+    partial_path = path.with_suffix(".partial.npz")
+    np.savez(partial_path, **columns)
+    partial_path.replace(path)
+
+
+def _dense_column(column: str, arrays: Sequence[NDArray]) -> dict[str, NDArray]:
+    return {
+        f"{column}/data": np.concatenate(arrays) if arrays else np.array([]),
+        f"{column}/offsets": np.cumsum([0] + [len(array) for array in arrays]),
+    }
+
+
+def _sparse_column(column: str, arrays: Sequence[SparseSampleArray]) -> dict[str, NDArray]:
+    # Arrays without positions or weights have none in their columns
+    positions = [np.array([], dtype=np.intp) if array.positions is None else array.positions for array in arrays]
+    weights = [np.array([]) if array.weights is None else array.weights for array in arrays]
+    return {
+        **_dense_column(column, [array.data for array in arrays]),
+        f"{column}/num_zeros": np.array([array.num_zeros for array in arrays], dtype=np.int64),
+        **_dense_column(f"{column}/positions", positions),
+        f"{column}/has_positions": np.array([array.positions is not None for array in arrays], dtype=bool),
+        **_dense_column(f"{column}/weights", weights),
+        f"{column}/has_weights": np.array([array.weights is not None for array in arrays], dtype=bool),
+    }
+
+
+def _read_dense(columns: dict[str, NDArray], column: str, index: int) -> NDArray:
+    offsets = columns[f"{column}/offsets"]
+    return columns[f"{column}/data"][offsets[index] : offsets[index + 1]]
+
+
+def _read_sparse(columns: dict[str, NDArray], column: str, index: int) -> SparseSampleArray:
+    has_positions, has_weights = columns[f"{column}/has_positions"][index], columns[f"{column}/has_weights"][index]
+    return SparseSampleArray(
+        _read_dense(columns, column, index),
+        int(columns[f"{column}/num_zeros"][index]),
+        _read_dense(columns, f"{column}/positions", index) if has_positions else None,
+        _read_dense(columns, f"{column}/weights", index) if has_weights else None,
+    )
+
+
+def _memory_map_npz(path: Path) -> dict[str, NDArray]:
+    """Memory-maps the arrays of an uncompressed npz file (which `np.load` only does for npy files)."""
+    arrays: dict[str, NDArray] = {}
+    with zipfile.ZipFile(path) as archive, path.open("rb") as file:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"Can't memory-map the compressed array {info.filename} of {path}")
+            # The data of a member follows its local header, whose name and extra fields have lengths of their own
+            file.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", file.read(30)[26:30])
+            file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+            name = info.filename.removesuffix(".npy")
+            if np.prod(shape) == 0:
+                arrays[name] = np.empty(shape, dtype=dtype)
+            else:
+                order = "F" if fortran_order else "C"
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=file.tell(), shape=shape, order=order)
+    return arrays
+
+
+def main(args: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Builds the snapshot of the results with the default parameters.")
+    parser.add_argument("--path", type=Path, default=config.DEFAULT_RESULTS_SNAPSHOT)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="0 to estimate in this process")
+    options = parser.parse_args(args)
+    build_snapshot(options.path, max_workers=options.workers)
+    print(f"Wrote the snapshot of the default results to {options.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Streaming estimation: runs an intervention's estimate in fixed-size chunks of simulations and folds each chunk
+into a SampleSummary, so that memory use is bounded by the chunk size rather than the total number of samples.
+
+Summaries pickle and merge, so a very large run can also be split across processes: run this in each process
+with a generator of its own (see `spawn_rngs`), and merge the resulting summaries.
+"""
+
+import math
+
+from ccm.contexts import spawn_rngs, updated_parameters, using_rng
+from ccm.interventions.intervention import Intervention
+from ccm.simulation_params import SimulationParams
+from ccm.utility.summaries import DEFAULT_BINS_PER_DECADE, DEFAULT_COMPRESSION, SampleSummary
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def summarize_dalys_per_1000(
+    intervention: Intervention,
+    num_simulations: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compression: int = DEFAULT_COMPRESSION,
+    bins_per_decade: int = DEFAULT_BINS_PER_DECADE,
+) -> SampleSummary:
+    """Summarizes the DALYs per $1000 of the intervention over the given number of simulations, drawn in chunks.
+    As in `estimate_dalys_per_1000`, an intervention may add zeros for simulations in which it has no effect,
+    so the summary can count more samples than simulations.
+    """
+    summary = SampleSummary(compression, bins_per_decade)
+    num_chunks = math.ceil(num_simulations / chunk_size)
+    # Each chunk gets a generator of its own, so that cached estimates of a previous chunk aren't reused
+    for chunk, rng in enumerate(spawn_rngs(num_chunks)):
+        simulations = min(chunk_size, num_simulations - chunk * chunk_size)
+        with updated_parameters({"simulations": simulations}, SimulationParams), using_rng(rng):
+            samples = intervention.estimate_dalys_per_1000()
+        summary.add(samples.data, samples.num_zeros, samples.weights)
+    return summary
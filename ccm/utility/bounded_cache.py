@@ -0,0 +1,103 @@
+"""
+A least-recently-used cache bounded by the memory its values take up rather than their number, for caches of
+samples in a long-running process (such as the API), where entries vary in size by orders of magnitude.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, NamedTuple
+
+import numpy as np
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, in the manner of `functools.lru_cache`'s `cache_info()`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    nbytes: int
+    max_bytes: int
+
+
+class BoundedCache:
+    """A least-recently-used store of values, bounded by the total size of the values rather than their number."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # Values and their sizes, from least to most recently used
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # The API serves requests from several threads
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, count_miss: bool = True) -> tuple[bool, Any]:
+        """Returns whether the key was found, and its value if it was. Misses that are just one of several
+        lookups for a value can be left uncounted, and counted through `count_miss` instead."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if count_miss:
+                    self._misses += 1
+                return False, None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+                self._evictions += 1
+
+    def count_miss(self) -> None:
+        with self._lock:
+            self._misses += 1
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, len(self._entries), self._nbytes, self.max_bytes
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = self._hits = self._misses = self._evictions = 0
+
+
+def nbytes(value: Any) -> int:
+    """
+    Size of a value, counting the data of numpy arrays and of other values that report it (such as sparse arrays
+    of samples), also in tuples and lists, and the shallow size of others.
+    """
+    if isinstance(getattr(value, "nbytes", None), int):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def freeze(value: Any) -> Any:
+    """Makes the numpy arrays of a value read-only, as they will be shared by all callers."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif callable(getattr(value, "freeze", None)):
+        value.freeze()
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            freeze(item)
+    return value
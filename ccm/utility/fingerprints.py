@@ -0,0 +1,128 @@
+"""
+Structural fingerprints of models: hashes of their canonical serialization, so that equal models constructed
+separately (e.g. from the JSON of separate API requests) share a fingerprint, and can share cache entries
+across requests, processes and runs. Python's `hash` can't serve for this: it is salted per process, and
+most of these models hash by identity.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable, Set
+from typing import Any, TypeVar
+from weakref import finalize
+
+import numpy as np
+import squigglepy as sq
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Fingerprints (and fingerprints of the fields) by the id of the model they were computed from, dropped when the
+# model is garbage collected. Keyed by id (as compiled specs are) because not all models are hashable,
+# and to not keep models alive.
+_FINGERPRINTS: dict[int, str] = {}
+_FIELD_FINGERPRINTS: dict[int, dict[str, str]] = {}
+
+
+def fingerprint(
+    model: BaseModel,
+    extra: Callable[[], Any] | None = None,
+    exclude: Set[str] | None = None,
+) -> str:
+    """
+    Returns the fingerprint of the model: the SHA-256 hex digest of its class and JSON serialization,
+    with sorted keys. `extra` returns JSON-serializable data to include, such as what the serialization
+    leaves out, or the fingerprints of `exclude`d fields (so that they needn't be serialized again).
+
+    The fingerprint is computed on first use and memoized, so the model must not be mutated afterwards.
+    """
+    return _memoize(
+        _FINGERPRINTS,
+        model,
+        lambda: hashlib.sha256(canonical_json(model, None if extra is None else extra(), exclude).encode()).hexdigest(),
+    )
+
+
+def fingerprint_from_fields(model: BaseModel, fields: Callable[[], dict[str, str]]) -> str:
+    """
+    Returns the fingerprint of the model from the fingerprints of its fields (as returned by `fields`),
+    memoized like `fingerprint`. Models derived from others by changing some fields can then be fingerprinted
+    without serializing the other fields again (see `field_fingerprints`).
+    """
+    return _memoize(_FINGERPRINTS, model, lambda: fingerprint_data({"class": _class_name(model), "fields": fields()}))
+
+
+def field_fingerprints(
+    model: BaseModel,
+    exclude: Set[str] = frozenset(),
+    derived_from: BaseModel | None = None,
+    changed: Set[str] = frozenset(),
+) -> dict[str, str]:
+    """
+    Returns the fingerprints of the serializations of each field of the model, but the `exclude`d ones, memoized.
+    If the model was derived from another by changing the given fields only, only those are serialized,
+    and the fingerprints of the others are taken from the model it was derived from.
+    """
+
+    def compute() -> dict[str, str]:
+        inherited = {} if derived_from is None else field_fingerprints(derived_from, exclude)
+        serialized = model.model_dump(
+            mode="json",
+            include=None if derived_from is None else set(changed - exclude),
+            exclude=set(exclude),
+        )
+        return {**inherited, **{name: fingerprint_data(value) for name, value in serialized.items()}}
+
+    return _memoize(_FIELD_FINGERPRINTS, model, compute)
+
+
+def canonical_json(model: BaseModel, extra: Any = None, exclude: Set[str] | None = None) -> str:
+    """Serializes the model, tagged with its class, to JSON that is the same for all equal models."""
+    return _dumps(
+        {
+            "class": _class_name(model),
+            "data": model.model_dump(mode="json", exclude=exclude),
+            "extra": extra,
+        }
+    )
+
+
+def fingerprint_data(data: Any) -> str:
+    """Returns the SHA-256 hex digest of the JSON serialization of the data, with sorted keys."""
+    return hashlib.sha256(_dumps(data).encode()).hexdigest()
+
+
+def distribution_data(dist: Any) -> Any:
+    """
+    Returns JSON-serializable data that describes a Squigglepy distribution by its exact parameters (its type,
+    x/y/mean/sd..., clips, and the distributions it is composed of), unlike its description, which rounds them.
+    """
+    if isinstance(dist, sq.BaseDistribution):
+        data = {
+            name: distribution_data(value)
+            for name, value in vars(dist).items()
+            # (Functions of composed distributions are described by `fn_str`)
+            if not name.startswith("_") and name != "fn" and value is not None
+        }
+        return {"type": type(dist).__qualname__, **data}
+    if isinstance(dist, (list, tuple, np.ndarray)):
+        return [distribution_data(item) for item in dist]
+    if isinstance(dist, np.generic):
+        return dist.item()
+    return dist
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def _class_name(model: BaseModel) -> str:
+    return f"{type(model).__module__}.{type(model).__qualname__}"
+
+
+def _memoize(memo: dict[int, T], model: BaseModel, compute: Callable[[], T]) -> T:
+    memoized = memo.get(id(model))
+    if memoized is None:
+        memoized = memo[id(model)] = compute()
+        finalize(model, memo.pop, id(model), None)
+    return memoized
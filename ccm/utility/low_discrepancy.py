@@ -0,0 +1,36 @@
+"""
+Uniform samples on [0, 1) for the sampling method of the current context, to be turned into samples
+of a distribution through its inverse CDF.
+
+The low-discrepancy methods stratify the samples of each draw, and the samples of separate draws are
+paired up at random (as in Latin hypercube sampling). This keeps every distribution evenly covered
+without needing to know up front how many distributions a model samples from.
+"""
+
+import math
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.stats import qmc
+
+from ccm.contexts import get_rng
+from ccm.simulation_params import SamplingMethod, get_sampling_method
+
+
+def sample_uniforms(n: int, sampling_method: SamplingMethod | None = None) -> NDArray[np.float64]:
+    """
+    Draws `n` uniform samples using the given sampling method,
+    or the sampling method of the current context if none is given.
+    """
+    rng = get_rng()
+    sampling_method = sampling_method or get_sampling_method()
+    if sampling_method == "monte carlo" or n == 0:
+        return rng.uniform(0, 1, n)
+    elif sampling_method == "latin hypercube":
+        # Already in random order
+        return qmc.LatinHypercube(d=1, seed=rng).random(n)[:, 0]
+    elif sampling_method == "sobol":
+        # Sobol points are only balanced in powers of two, and come in a structured order
+        points = qmc.Sobol(d=1, scramble=True, seed=rng).random_base2(math.ceil(math.log2(n)))[:n, 0]
+        return rng.permutation(points)
+    raise ValueError(f"Unknown sampling method: {sampling_method}")
@@ -1,9 +1,34 @@
 from abc import abstractmethod
-from typing import Annotated, Callable, Literal, Optional, TypeAlias, Union
+from typing import Annotated, Any, Callable, Literal, NamedTuple, Optional, TypeAlias, Union
+from weakref import finalize
 
 import numpy as np
 import squigglepy as sq
+from numpy.typing import NDArray
 from pydantic import BaseModel, Field, field_validator
+from scipy import special
+
+import ccm.utility.squigglepy_wrapper as sqw
+from ccm.contexts import get_rng, inject_parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.fingerprints import fingerprint
+from ccm.utility.low_discrepancy import sample_uniforms
+
+# A compiled sampler draws the given number of samples from the generator of the current context
+Sampler: TypeAlias = Callable[[int], NDArray[np.float64]]
+# A compiled quantile function (inverse CDF) maps uniform samples on [0, 1) to samples of the distribution
+QuantileFunction: TypeAlias = Callable[[NDArray[np.float64]], NDArray[np.float64]]
+
+
+class _CompiledSpec(NamedTuple):
+    sampler: Sampler
+    # None if the distribution has no (cheap) inverse CDF
+    quantile_function: QuantileFunction | None
+
+
+# Compiled specs by the id of the (frozen) spec they were compiled from, dropped when the spec is garbage collected.
+# Keyed by id because not all specs are hashable, and must not reference their spec to not keep it alive.
+_COMPILED_SPECS: dict[int, _CompiledSpec] = {}
 
 
 def _clean_float(v) -> float | None:
@@ -18,6 +43,20 @@ def _has_x_y(dist: sq.OperableDistribution) -> bool:
     return dist.x is not None and dist.y is not None
 
 
+def _with_clip(
+    f: Callable[[Any], NDArray[np.float64]], lclip: float | None, rclip: float | None
+) -> Callable[[Any], NDArray[np.float64]]:
+    # Clipping is applied to the samples after they are drawn, as squigglepy does
+    if lclip is None and rclip is None:
+        return f
+
+    def clipped(arg) -> NDArray[np.float64]:
+        samples = f(arg)
+        return np.clip(samples, lclip, rclip, out=samples)
+
+    return clipped
+
+
 def clip_validator(v):
     if v[0] is not None and v[1] is not None and v[0] >= v[1]:
         raise ValueError("Left clip must be less than right clip")
@@ -41,6 +80,54 @@ def get_distribution(self) -> sq.OperableDistribution:
         """Obtains the Squigglepy distribution specified by this spec."""
         ...
 
+    def fingerprint(self) -> str:
+        """Structural fingerprint of the spec, the same for all equal specs (see ccm.utility.fingerprints)."""
+        return fingerprint(self)
+
+    @inject_parameters
+    def sample(self, params: SimulationParams, n: int) -> NDArray[np.floating]:
+        """
+        Draws `n` samples from the distribution specified by this spec, using the sampling method
+        and floating point type of the context. With Monte Carlo sampling, this is equivalent to sampling
+        `get_distribution()` with squigglepy, but much cheaper to call repeatedly.
+        Other sampling methods go through the inverse CDF where possible.
+        """
+        compiled = self._get_compiled()
+        if compiled.quantile_function is not None and params.sampling_method != "monte carlo":
+            samples = compiled.quantile_function(sample_uniforms(n, params.sampling_method))
+        else:
+            samples = compiled.sampler(n)
+        return samples.astype(params.dtype, copy=False)
+
+    def get_sampler(self) -> Sampler:
+        """Obtains the compiled (Monte Carlo) sampler for this spec, compiling it on first use."""
+        return self._get_compiled().sampler
+
+    def get_quantile_function(self) -> QuantileFunction | None:
+        """Obtains the compiled inverse CDF of this spec, if it has one, compiling it on first use."""
+        return self._get_compiled().quantile_function
+
+    def _get_compiled(self) -> _CompiledSpec:
+        compiled = _COMPILED_SPECS.get(id(self))
+        if compiled is None:
+            compiled = _CompiledSpec(self._compile_sampler(), self._compile_quantile_function())
+            _COMPILED_SPECS[id(self)] = compiled
+            finalize(self, _COMPILED_SPECS.pop, id(self), None)
+        return compiled
+
+    def _compile_sampler(self) -> Sampler:
+        """
+        Builds a vectorized sampler for this spec, doing all of the per-distribution work
+        (e.g. deriving the parameters from a confidence interval) up front.
+        Falls back to sampling the Squigglepy distribution.
+        """
+        dist = self.get_distribution()
+        return lambda n: np.asarray(sqw.sample(dist, n=n), dtype=np.float64)
+
+    def _compile_quantile_function(self) -> QuantileFunction | None:
+        """Builds the vectorized inverse CDF of this spec. By default, specs don't have one."""
+        return None
+
     @classmethod
     def from_distribution(cls, dist: sq.OperableDistribution) -> "SomeDistribution":
         """Constructs a DistributionSpec from a Squigglepy distribution."""
@@ -80,6 +167,14 @@ class ConstantDistributionSpec(DistributionSpec, frozen=True):
     def get_distribution(self):
         return sq.ConstantDistribution(self.value)
 
+    def _compile_sampler(self) -> Sampler:
+        value = self.value
+        return lambda n: np.full(n, value, dtype=np.float64)
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        value = self.value
+        return lambda quantiles: np.full(len(quantiles), value, dtype=np.float64)
+
     @classmethod
     def from_distribution(cls, dist: sq.ConstantDistribution):
         return cls(type="constant", distribution="constant", value=float(dist.x))
@@ -114,6 +209,14 @@ def get_distribution(self):
             return sq.uniform(x, y)
         raise ValueError(f"Unknown distribution type: {self.distribution}")
 
+    def _compile_sampler(self) -> Sampler:
+        low, high = self.range
+        return lambda n: get_rng().uniform(low, high, n)
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        low, high = self.range
+        return lambda quantiles: low + (high - low) * quantiles
+
     @classmethod
     def from_distribution(cls, dist: sq.UniformDistribution | sq.BetaDistribution | sq.GammaDistribution):
         if not _has_x_y(dist):
@@ -160,6 +263,23 @@ def get_distribution(self):
             return sq.to(x, y, credibility=self.credibility, lclip=self.clip[0], rclip=self.clip[1])
         raise ValueError(f"Unknown distribution type: {self.distribution}")
 
+    def _compile_sampler(self) -> Sampler:
+        # Squigglepy derives the parameters of the underlying normal from the confidence interval
+        dist = self.get_distribution()
+        if isinstance(dist, sq.NormalDistribution):
+            mean, sd = dist.mean, dist.sd
+            return _with_clip(lambda n: get_rng().normal(mean, sd, n), *self.clip)
+        norm_mean, norm_sd = dist.norm_mean, dist.norm_sd
+        return _with_clip(lambda n: get_rng().lognormal(norm_mean, norm_sd, n), *self.clip)
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        dist = self.get_distribution()
+        if isinstance(dist, sq.NormalDistribution):
+            mean, sd = dist.mean, dist.sd
+            return _with_clip(lambda quantiles: mean + sd * special.ndtri(quantiles), *self.clip)
+        norm_mean, norm_sd = dist.norm_mean, dist.norm_sd
+        return _with_clip(lambda quantiles: np.exp(norm_mean + norm_sd * special.ndtri(quantiles)), *self.clip)
+
     @classmethod
     def from_distribution(cls, dist: sq.NormalDistribution | sq.LognormalDistribution):
         if not _has_x_y(dist):
@@ -240,6 +360,14 @@ def clip_validator(cls, v):
     def get_distribution(self):
         return sq.gamma(self.shape, self.scale, lclip=self.clip[0], rclip=self.clip[1])  # type: ignore
 
+    def _compile_sampler(self) -> Sampler:
+        shape, scale = self.shape, self.scale
+        return _with_clip(lambda n: get_rng().gamma(shape, scale, n), *self.clip)
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        shape, scale = self.shape, self.scale
+        return _with_clip(lambda quantiles: scale * special.gammaincinv(shape, quantiles), *self.clip)
+
     @classmethod
     def from_distribution(cls, dist: sq.GammaDistribution):
         return cls(
@@ -264,6 +392,14 @@ class BetaDistributionSpec(DistributionSpec, frozen=True):
     def get_distribution(self):
         return sq.beta(self.alpha, self.beta)
 
+    def _compile_sampler(self) -> Sampler:
+        alpha, beta = self.alpha, self.beta
+        return lambda n: get_rng().beta(alpha, beta, n)
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        alpha, beta = self.alpha, self.beta
+        return lambda quantiles: special.betaincinv(alpha, beta, quantiles)
+
     @classmethod
     def from_distribution(cls, dist: sq.BetaDistribution):
         return cls(type="beta", distribution="beta", alpha=float(dist.a), beta=float(dist.b))
@@ -291,6 +427,23 @@ def categories_validator(cls, v):
     def get_distribution(self):
         return sq.discrete([[x, y] for x, y in self.items])
 
+    def _compile_sampler(self) -> Sampler:
+        # Like squigglepy, picks the first category whose cumulative probability reaches a uniform draw
+        quantile_function = self._compile_quantile_function()
+        return lambda n: quantile_function(get_rng().uniform(0, 1, n))
+
+    def _compile_quantile_function(self) -> QuantileFunction:
+        cumulative_probabilities = np.cumsum([probability for probability, _ in self.items])
+        categories = np.array([category for _, category in self.items], dtype=np.float64)
+        last_index = len(categories) - 1
+
+        def quantile_function(quantiles: NDArray[np.float64]) -> NDArray[np.float64]:
+            indices = np.searchsorted(cumulative_probabilities, quantiles, side="left")
+            # Guards against the cumulative probabilities summing to slightly less than 1
+            return categories[np.minimum(indices, last_index)]
+
+        return quantile_function
+
     @classmethod
     def from_distribution(cls, dist: sq.DiscreteDistribution):
         if isinstance(dist.items, list):
@@ -7,14 +7,12 @@
 import squigglepy as sq
 from numpy.typing import NDArray
 
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
-from ccm.contexts import inject_parameters
+from ccm.contexts import inject_parameters, inject_parameters_with_memo
 from ccm.interventions.animal.animal_intervention_params import INTERVENABLE_ANIMALS, AnimalInterventionParams
+from ccm.simulation_params import get_num_simulations
 from ccm.world.animals import Animal
 
-SIMULATIONS = config.SIMULATIONS
-
 # Capacity Parameters from Bob Fischer
 # Each key is the name of a approach to assessing relative moral weight
 # Each value is a quantitative comparison according to that model, relative to human beings
@@ -83,12 +81,13 @@
 @inject_parameters
 def get_sentience_estimates(params: AnimalInterventionParams, animal: Animal) -> NDArray[np.float64]:
     try:
-        sentience_distribution = params.moral_weight_params.sentience_ranges[animal].get_distribution()
+        sentience_range = params.moral_weight_params.sentience_ranges[animal]
     except KeyError as err:
         raise ValueError(f"Unsupported animal input for get_sentience_estimates: {animal}") from err
 
-    sentience_values = sqw.sample(sentience_distribution, n=SIMULATIONS)
-    random_numbers = sqw.sample(sq.uniform(0, 1), n=SIMULATIONS)
+    num_simulations = get_num_simulations()
+    sentience_values = sentience_range.sample(num_simulations)
+    random_numbers = sqw.sample(sq.uniform(0, 1), n=num_simulations)
     species_is_sentient = sentience_values >= random_numbers
     return species_is_sentient.astype(np.float64)
 
@@ -101,10 +100,7 @@ def get_capacity_for_welfare_estimates(params: AnimalInterventionParams, animal:
     """
     if params.moral_weight_params.override_type == "Only welfare capacities":
         try:
-            return sqw.sample(
-                params.moral_weight_params.welfare_capacities_override[animal].get_distribution(),
-                n=SIMULATIONS,
-            )
+            return params.moral_weight_params.welfare_capacities_override[animal].sample(get_num_simulations())
         except KeyError as err:
             raise ValueError(f"Unsupported animal input for get_welfare_capacity: {animal}") from err
 
@@ -128,18 +124,15 @@ def get_capacity_for_welfare_estimates(params: AnimalInterventionParams, animal:
         )
     welfare_capacities_distribution = sq.discrete(welfare_capacities_x_weight)
 
-    return sqw.sample(welfare_capacities_distribution, n=SIMULATIONS)
+    return sqw.sample(welfare_capacities_distribution, n=get_num_simulations())
 
 
-@inject_parameters
+@inject_parameters_with_memo(per_rng=True)
 def moral_weight_adjustor(params: AnimalInterventionParams, animal: Animal) -> NDArray[np.float64]:
     """Combines sampled capacity welfare conditional on sentience with estimated probabilities of sentience"""
     if params.moral_weight_params.override_type == "All moral weight calculations":
         try:
-            return sqw.sample(
-                params.moral_weight_params.moral_weights_override[animal].get_distribution(),
-                n=SIMULATIONS,
-            )
+            return params.moral_weight_params.moral_weights_override[animal].sample(get_num_simulations())
         except KeyError as err:
             raise ValueError(f"Unsupported animal input for moral_weight_adjustor: {animal}") from err
 
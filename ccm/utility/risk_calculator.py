@@ -1,45 +1,40 @@
+import functools
 from typing import Literal
 
 import numpy as np
-import squigglepy as sq
 from numpy.typing import NDArray
 
 import ccm.config as config
 import ccm.world.risk_types as risk_types
 from ccm.contexts import inject_parameters
+from ccm.utility.risk_tables import RiskTable
 from ccm.utility.utils import ONE_BASIS_POINT, replace_zero_float_with_tiny
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
 from ccm.world.longterm_params import LongTermParams
 from ccm.world.risk_types import RiskType, RiskTypeAI
 
 
-SIMULATIONS = config.get_simulations()
 CUR_YEAR = config.get_current_year()
 
 
 @inject_parameters
-def get_distribution_of_years_to_extinction(params: LongTermParams) -> sq.OperableDistribution:
+def get_distribution_of_years_to_extinction(params: LongTermParams) -> YearsToExtinctionDistribution:
     """
     Given a list of eras,
     returns a distribution of time until extinction based on each era's annual risk probability
     """
-    distributions: list[sq.OperableDistribution] = []
-    probabilities: list[float] = []
-    start: int = 0
-    for era in params.risk_eras:
-        era_length = era.get_length()
-        era_risk = era.get_annual_extinction_probability()
-        end = start + era_length - 1
-        next_dist = _approximate_geometric(start, end, era_risk)
-        if era == params.risk_eras[-1]:
-            next_prob = 1 - sum(probabilities)
-        else:
-            next_prob = (1 - sum(probabilities)) * (1 - (1 - era_risk) ** era_length)
-        distributions.append(next_dist)
-        probabilities.append(next_prob)
-        start = end + 1
-
-    mix = sq.mixture(distributions, probabilities)
-    return mix
+    eras = tuple((era.get_length(), era.get_annual_extinction_probability()) for era in params.risk_eras)
+    return _get_distribution_of_years_to_extinction_for_eras(eras)
+
+
+@inject_parameters
+def get_risk_table(params: LongTermParams) -> RiskTable:
+    """Returns the table of cumulative risks over the eras, in total and by type (shared by all risk lookups)"""
+    eras = tuple(
+        (era.get_length(), era.get_annual_extinction_probability(), tuple(era.get_absolute_risks().items()))
+        for era in params.risk_eras
+    )
+    return _get_risk_table_for_eras(eras)
 
 
 @inject_parameters
@@ -62,62 +57,31 @@ def get_cumulative_catastrophe_risk(
 def one_basis_point_percent_of_each_xrisk_by_type(
     num_years: NDArray[np.int64],
 ) -> dict[RiskType | Literal["total"] | Literal["non-ai"], NDArray[np.float64]]:
-    basis_pt_dict = {}
-    for risk_type in risk_types.get_risk_types():
-        risk = get_cumulative_risk_over_years_by_type(risk_type, num_years)
-        basis_pt_dict[risk_type] = ONE_BASIS_POINT / np.vectorize(replace_zero_float_with_tiny)(risk)
-    basis_pt_dict["total"] = ONE_BASIS_POINT / get_cumulative_risk_over_years(num_years)
-    basis_pt_dict["non-ai"] = ONE_BASIS_POINT / np.vectorize(replace_zero_float_with_tiny)(
-        get_cumulative_risk_over_years(num_years)
-        - get_cumulative_risk_over_years_by_type(RiskTypeAI.MISALIGNMENT, num_years)
-        - get_cumulative_risk_over_years_by_type(RiskTypeAI.MISUSE, num_years)
+    risk_table = get_risk_table()
+    risks_by_type = {
+        risk_type: risk_table.cumulative(num_years, risk_type) for risk_type in risk_types.get_risk_types()
+    }
+    total_risk = risk_table.cumulative(num_years)
+
+    basis_pt_dict: dict[RiskType | Literal["total"] | Literal["non-ai"], NDArray[np.float64]] = {}
+    for risk_type, risk in risks_by_type.items():
+        basis_pt_dict[risk_type] = ONE_BASIS_POINT / replace_zero_float_with_tiny(risk)
+    basis_pt_dict["total"] = ONE_BASIS_POINT / total_risk
+    basis_pt_dict["non-ai"] = ONE_BASIS_POINT / replace_zero_float_with_tiny(
+        total_risk - risks_by_type[RiskTypeAI.MISALIGNMENT] - risks_by_type[RiskTypeAI.MISUSE]
     )
 
     return basis_pt_dict
 
 
-@inject_parameters
-def get_average_total_risk_over_years(params: LongTermParams, num_years: NDArray[np.int64]) -> NDArray[np.float64]:
+def get_average_total_risk_over_years(num_years: NDArray[np.int64]) -> NDArray[np.float64]:
     """Returns the mean yearly risk across multiple eras, staring with the first era and going for num_years"""
-    max_year_sampled = max(num_years)
-    risks_by_year = np.zeros(max_year_sampled)
-    idx = 0
-    for era in params.risk_eras:
-        risks_by_year[idx : min(idx + era.get_length(), max_year_sampled)] = era.get_annual_extinction_probability()
-        idx += era.get_length()
-        if idx > max_year_sampled:
-            break
-
-    all_years = np.unique(num_years)
-    year_x_avg_risk = {year: np.mean(risks_by_year[:year]) for year in all_years}
-
-    u, inv = np.unique(num_years, return_inverse=True)
-    avg_risks = np.array([year_x_avg_risk[year] for year in u])
-    return avg_risks[inv]
+    return get_risk_table().average(num_years)
 
 
-@inject_parameters
-def get_average_risk_over_years_by_type(
-    params: LongTermParams,
-    risk_type: RiskType,
-    num_years: NDArray[np.int64],
-) -> NDArray[np.float64]:
+def get_average_risk_over_years_by_type(risk_type: RiskType, num_years: NDArray[np.int64]) -> NDArray[np.float64]:
     """Returns the mean yearly risk across multiple eras by type, staring with the first era and going for num_years"""
-    max_year_sampled = max(num_years)
-    risks_by_year = np.zeros(max_year_sampled)
-    idx = 0
-    for era in params.risk_eras:
-        risks_by_year[idx : min(idx + era.get_length(), max_year_sampled)] = era.get_absolute_risks()[risk_type]
-        idx += era.get_length()
-        if idx > max_year_sampled:
-            break
-
-    all_years = np.unique(num_years)
-    year_x_avg_risk = {year: np.mean(risks_by_year[:year]) for year in all_years}
-
-    u, inv = np.unique(num_years, return_inverse=True)
-    avg_risks = np.array([year_x_avg_risk[year] for year in u])
-    return avg_risks[inv]
+    return get_risk_table().average(num_years, risk_type)
 
 
 @inject_parameters
@@ -138,14 +102,14 @@ def get_average_catastrophe_risk_over_years_by_type(
 
 def get_cumulative_risk_over_years(num_years: NDArray[np.int64]) -> NDArray[np.float64]:
     """given eras and a number of years, returns the average risk across those eras over the next num_years"""
-    return get_average_total_risk_over_years(num_years) * num_years
+    return get_risk_table().cumulative(num_years)
 
 
 def get_cumulative_risk_over_years_by_type(risk_type: RiskType, num_years: NDArray[np.int64]) -> NDArray[np.float64]:
     """
     Given eras, a irsk type, and a number of years, returns the average risk across those eras over the next num_years
     """
-    return get_average_risk_over_years_by_type(risk_type, num_years) * num_years
+    return get_risk_table().cumulative(num_years, risk_type)
 
 
 def get_by_type_year(params: LongTermParams, risk_type: RiskType, target_year: int) -> float:
@@ -162,12 +126,17 @@ def get_by_type_year(params: LongTermParams, risk_type: RiskType, target_year: i
 # ///////////////// Private Functions /////////////////
 
 
-# This should really be a geometric distribution, but it approximates it ok.
-def _approximate_geometric(bottom: int, top: int, iteration_probability: float) -> sq.OperableDistribution:
-    def floor_and_add_bottom(val):
-        return np.floor(val + bottom)
+# Built once for each configuration of eras, by their lengths and annual extinction probabilities
+@functools.lru_cache(maxsize=128)
+def _get_distribution_of_years_to_extinction_for_eras(
+    eras: tuple[tuple[int, float], ...],
+) -> YearsToExtinctionDistribution:
+    lengths, annual_risks = zip(*eras)
+    return YearsToExtinctionDistribution(lengths, annual_risks)
+
 
-    exponential_distribution = sq.exponential(1 / iteration_probability, lclip=0, rclip=(top - bottom))
-    dist = sq.dist_fn(exponential_distribution, floor_and_add_bottom)
-    assert isinstance(dist, sq.OperableDistribution)
-    return dist
+# Built once for each configuration of eras, by their lengths and annual extinction probabilities in total and by type
+@functools.lru_cache(maxsize=128)
+def _get_risk_table_for_eras(eras: tuple[tuple[int, float, tuple[tuple[RiskType, float], ...]], ...]) -> RiskTable:
+    lengths, total_risks, risks_by_type = zip(*eras)
+    return RiskTable(lengths, total_risks, [dict(risks) for risks in risks_by_type])
@@ -0,0 +1,56 @@
+"""
+Cumulative extinction risks over the first years of eras of constant annual risk.
+
+Summed over the years, the annual risk of a sequence of eras grows linearly within each era, so the cumulative
+risk over any number of years is interpolated between its values at the ends of the eras, instead of being summed
+year by year. A table of these values is built once for each configuration of eras, for the total risk and for
+each type of risk, and answers any number of years in time logarithmic in the number of eras.
+"""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ccm.world.risk_types import RiskType
+
+
+class RiskTable:
+    """
+    Cumulative annual extinction risks, in total and by type, for eras of the given lengths and annual risks by
+    type. There is no risk after the end of the last era, nor risk of types that an era has no risk for.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        total_risks: Sequence[float],
+        risks_by_type: Sequence[Mapping[RiskType, float]],
+    ) -> None:
+        if len(lengths) == 0:
+            raise ValueError("At least one era is needed for a table of risks")
+        self.ends = np.concatenate(([0], np.cumsum(lengths, dtype=np.float64)))
+        self._cumulative_total = self._cumulative_at_ends(lengths, total_risks)
+        # (In the order the eras list them)
+        risk_types = dict.fromkeys(risk_type for risks in risks_by_type for risk_type in risks)
+        self._cumulative_by_type = {
+            risk_type: self._cumulative_at_ends(lengths, [risks.get(risk_type, 0.0) for risks in risks_by_type])
+            for risk_type in risk_types
+        }
+
+    def cumulative(self, num_years: ArrayLike, risk_type: RiskType | None = None) -> NDArray[np.float64]:
+        """
+        The sum of the annual risks (of the given type, or in total) over each number of years, from the start of
+        the first era.
+        """
+        cumulative_at_ends = self._cumulative_total if risk_type is None else self._cumulative_by_type[risk_type]
+        return np.interp(np.asarray(num_years, dtype=np.float64), self.ends, cumulative_at_ends)
+
+    def average(self, num_years: ArrayLike, risk_type: RiskType | None = None) -> NDArray[np.float64]:
+        """The mean annual risk (of the given type, or in total) over each number of years (nan for none)."""
+        num_years = np.asarray(num_years, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.cumulative(num_years, risk_type) / num_years
+
+    def _cumulative_at_ends(self, lengths: Sequence[int], annual_risks: Sequence[float]) -> NDArray[np.float64]:
+        return np.concatenate(([0.0], np.cumsum(np.multiply(lengths, annual_risks, dtype=np.float64))))
@@ -0,0 +1,389 @@
+"""
+Sparse arrays of samples. Estimates of interventions that have no effect in most simulations (such as x-risk
+interventions, whose effect may be conditional on a catastrophe) would need billions of zeros if kept dense,
+so their zeros are only counted.
+
+A SparseSampleArray holds the stored values (which may include explicit zeros), the number of implicit zeros,
+and optionally the positions of the stored values among all samples, for when the order of the samples matters
+(e.g. to compare the samples of a research project and of its funding pools simulation by simulation).
+
+Arrays drawn by stratified sampling (see `SimulationParams.stratified_sampling`) also hold a weight for each
+stored value: the number of simulations that the value stands for, while implicit zeros stand for one
+simulation each. Rare but consequential outcomes can then be oversampled, and their statistics are weighted back.
+"""
+
+import math
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ccm.contexts import get_rng
+
+
+class SparseSampleArray:
+    """
+    A one-dimensional array of samples, of which only the stored values are kept in memory, and the rest are zeros.
+
+    Arithmetic applies to the stored values, as they are paired simulation by simulation. Operands can be scalars,
+    arrays with a value per stored value, or sparse arrays of the same size and number of stored values.
+    Implicit zeros stay zero, so operations must map zero to zero (e.g. no adding a constant) for the result
+    to be the one of the dense samples. Results are new arrays that share the layout (the number of zeros
+    and the positions) of the left operand, which is never copied.
+    """
+
+    __slots__ = ("data", "num_zeros", "positions", "weights")
+
+    data: NDArray[np.floating]
+    num_zeros: int
+    positions: NDArray[np.intp] | None
+    weights: NDArray[np.float64] | None
+
+    def __init__(
+        self,
+        data: ArrayLike,
+        num_zeros: int = 0,
+        positions: NDArray[np.intp] | None = None,
+        weights: ArrayLike | None = None,
+    ) -> None:
+        data = np.asarray(data)
+        if data.ndim != 1:
+            raise ValueError(f"The values of a SparseSampleArray must be one-dimensional, not {data.ndim}-dimensional")
+        if num_zeros < 0:
+            raise ValueError(f"The number of zeros must not be negative, but is {num_zeros}")
+        if positions is not None and len(positions) != len(data):
+            raise ValueError(f"{len(positions)} positions were given for {len(data)} values")
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != data.shape:
+                raise ValueError(f"{len(weights)} weights were given for {len(data)} values")
+        self.data = data
+        self.num_zeros = int(num_zeros)
+        self.positions = positions
+        self.weights = weights
+
+    @classmethod
+    def from_dense(cls, samples: ArrayLike) -> "SparseSampleArray":
+        """Stores the non-zero samples of a dense array, at their positions."""
+        samples = np.asarray(samples)
+        positions = np.flatnonzero(samples)
+        return cls(samples[positions], len(samples) - len(positions), positions)
+
+    @classmethod
+    def concatenate(cls, arrays: Sequence["SparseSampleArray"]) -> "SparseSampleArray":
+        """Joins the samples of the arrays, one after another (e.g. of separate batches of simulations)."""
+        positions = None
+        if all(array.positions is not None for array in arrays):
+            offsets = np.cumsum([0] + [array.size for array in arrays[:-1]])
+            positions = np.concatenate([array.positions + offset for array, offset in zip(arrays, offsets)])
+        weights = None
+        if any(array.weights is not None for array in arrays):
+            weights = np.concatenate([array.weights_or_ones() for array in arrays])
+        return cls(
+            np.concatenate([array.data for array in arrays]),
+            sum(array.num_zeros for array in arrays),
+            positions,
+            weights,
+        )
+
+    # ///////////////// Shape /////////////////
+
+    @property
+    def size(self) -> int:
+        """Number of samples, zeros included."""
+        return len(self.data) + self.num_zeros
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored values (including explicit zeros), like scipy's sparse arrays."""
+        return len(self.data)
+
+    @property
+    def total_weight(self) -> float:
+        """Number of simulations that the samples stand for: the size, unless the samples are weighted."""
+        if self.weights is None:
+            return self.size
+        return float(np.sum(self.weights)) + self.num_zeros
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.data.dtype
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in (self.data, self.positions, self.weights) if array is not None)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        weighted = "" if self.weights is None else ", weighted"
+        return f"SparseSampleArray(nnz={self.nnz}, num_zeros={self.num_zeros}, dtype={self.dtype}{weighted})"
+
+    def weights_or_ones(self) -> NDArray[np.float64]:
+        """The weights of the stored values, which are all one if the samples aren't weighted."""
+        return np.ones(self.nnz) if self.weights is None else self.weights
+
+    # ///////////////// Derived arrays /////////////////
+
+    def with_data(self, data: ArrayLike) -> "SparseSampleArray":
+        """
+        Returns an array with the layout of this one (the number of zeros, the positions and the weights),
+        but other values.
+        """
+        data = np.asarray(data)
+        if data.shape != self.data.shape:
+            raise ValueError(f"Expected {len(self.data)} values, got an array of shape {data.shape}")
+        return SparseSampleArray(data, self.num_zeros, self.positions, self.weights)
+
+    def with_random_positions(self) -> "SparseSampleArray":
+        """Returns the array with its values at random positions among the zeros, drawn from the context's generator."""
+        positions = get_rng().choice(self.size, size=self.nnz, replace=False)
+        return SparseSampleArray(self.data, self.num_zeros, positions, self.weights)
+
+    def resized_like(self, other: "SparseSampleArray") -> "SparseSampleArray":
+        """
+        Resamples the array to the size of the other one, keeping the proportion of stored values: a random subset
+        of the values of this array (padded with explicit zeros) takes the layout of the other array. Both arrays
+        must have the same number of stored values, and this one must be the larger.
+        Weighted arrays are matched by `match_sizes` instead.
+        """
+        if self.weights is not None or other.weights is not None:
+            raise ValueError("Weighted arrays can't be resized, but can be matched with `match_sizes`")
+        if self.nnz != other.nnz:
+            raise ValueError("Both arrays should start with the same number of stored elements")
+        if self.size == other.size:
+            return self
+        num_values_to_keep = int(self.nnz / self.size * other.size)
+        kept_values = get_rng().choice(self.data, size=num_values_to_keep, replace=False)
+        # Explicit zeros, until the number of stored values is the same for both arrays
+        padding = np.zeros(other.nnz - num_values_to_keep, dtype=kept_values.dtype)
+        return other.with_data(np.concatenate((kept_values, padding)))
+
+    def astype(self, dtype: Any) -> "SparseSampleArray":
+        return self.with_data(self.data.astype(dtype, copy=False))
+
+    def freeze(self) -> "SparseSampleArray":
+        """Makes the arrays read-only (e.g. before sharing the array through a cache), and returns the array."""
+        for array in (self.data, self.positions, self.weights):
+            if array is not None:
+                array.flags.writeable = False
+        return self
+
+    def todense(self) -> NDArray[np.floating]:
+        """Returns all of the samples, zeros included. Zeros follow the values if the array has no positions."""
+        if self.weights is not None:
+            raise ValueError("Weighted samples can't be made dense, as their weights would be lost")
+        dense = np.zeros(self.size, dtype=self.dtype)
+        if self.positions is None:
+            dense[: self.nnz] = self.data
+        else:
+            dense[self.positions] = self.data
+        return dense
+
+    # ///////////////// Summary statistics (without densifying) /////////////////
+
+    def sum(self) -> float:
+        """The sum of the samples, each counted as many times as its weight."""
+        if self.weights is None:
+            return float(np.sum(self.data, dtype=np.float64))
+        return float(np.dot(self.data.astype(np.float64), self.weights))
+
+    def mean(self) -> float:
+        return self.sum() / self.total_weight if self.size else math.nan
+
+    def percentile(self, q: float | ArrayLike) -> float | NDArray[np.float64]:
+        """
+        Returns the q-th percentiles of the samples, zeros included, interpolated like `np.percentile`
+        (or, for weighted samples, like `weighted_percentile_with_zeros`).
+        """
+        if self.weights is not None:
+            percentiles = weighted_percentile_with_zeros(
+                self.data, self.weights, self.num_zeros, np.asarray(q, dtype=np.float64) / 100
+            )
+            return float(percentiles) if np.ndim(q) == 0 else percentiles
+        sorted_values = np.sort(self.data.astype(np.float64))
+        if np.ndim(q) == 0:
+            return percentile_with_zeros(sorted_values, self.num_zeros, float(q) / 100)  # type: ignore[arg-type]
+        quantiles = np.asarray(q, dtype=np.float64) / 100
+        return np.array([percentile_with_zeros(sorted_values, self.num_zeros, quantile) for quantile in quantiles])
+
+    def median(self) -> float:
+        return self.percentile(50)  # type: ignore[return-value]
+
+    # ///////////////// Arithmetic /////////////////
+
+    def _operand(self, other: Any) -> Any:
+        if isinstance(other, SparseSampleArray):
+            if other.size != self.size or other.nnz != self.nnz:
+                raise ValueError(
+                    f"Can't pair the samples of sparse arrays of sizes {self.size} and {other.size}"
+                    f" with {self.nnz} and {other.nnz} stored values"
+                )
+            return other.data
+        return other
+
+    def __add__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self.data + self._operand(other))
+
+    def __radd__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self._operand(other) + self.data)
+
+    def __sub__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self.data - self._operand(other))
+
+    def __rsub__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self._operand(other) - self.data)
+
+    def __mul__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self.data * self._operand(other))
+
+    def __rmul__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self._operand(other) * self.data)
+
+    def __truediv__(self, other: Any) -> "SparseSampleArray":
+        return self.with_data(self.data / self._operand(other))
+
+    def __neg__(self) -> "SparseSampleArray":
+        return self.with_data(-self.data)
+
+    # Keeps numpy from broadcasting over the array as an object when it is the right operand of an ndarray
+    __array_ufunc__ = None
+
+
+def match_sizes(array_1: SparseSampleArray, array_2: SparseSampleArray) -> tuple[SparseSampleArray, SparseSampleArray]:
+    """
+    Resizes the larger of two arrays with the same number of stored values to the size of the other one
+    (see `SparseSampleArray.resized_like`), so that their samples can be paired. Returns them in the given order.
+
+    Arrays of estimates may differ in size because the less likely an intervention is to have an effect,
+    the more zeros its estimate has. If either array is weighted, both are laid out anew instead (see
+    `_match_weighted`), so that the stored values of the rarer one aren't dropped.
+    """
+    if array_1.weights is not None or array_2.weights is not None:
+        return _match_weighted(array_1, array_2)
+    if array_1.size > array_2.size:
+        return array_1.resized_like(array_2), array_2
+    if array_1.size < array_2.size:
+        return array_1, array_2.resized_like(array_1)
+    return array_1, array_2
+
+
+def order_statistic(sorted_values: NDArray[np.float64], zeros: int, k: int) -> float:
+    """Returns the k-th smallest value of the sorted values padded with zeros, without materializing the zeros
+    (which can number in the billions for x-risk interventions)."""
+    num_negative = int(np.searchsorted(sorted_values, 0))
+    if k < num_negative:
+        return sorted_values[k]
+    if k < num_negative + zeros:
+        return 0.0
+    return sorted_values[k - zeros]
+
+
+def percentile_with_zeros(sorted_values: NDArray[np.float64], zeros: int, q: float) -> float:
+    """Interpolates the q-th quantile of the sorted values padded with zeros, like np.percentile does."""
+    rank = q * (len(sorted_values) + zeros - 1)
+    lower = math.floor(rank)
+    lower_value = order_statistic(sorted_values, zeros, lower)
+    if rank == lower:
+        return lower_value
+    return lower_value + (rank - lower) * (order_statistic(sorted_values, zeros, lower + 1) - lower_value)
+
+
+def weighted_percentile_with_zeros(
+    values: NDArray[np.floating],
+    weights: NDArray[np.float64],
+    zeros: float,
+    q: float | ArrayLike,
+) -> NDArray[np.float64]:
+    """
+    Interpolates the q-th quantiles of weighted values padded with zeros (of a weight of one each). As in the
+    t-digests of `ccm.utility.summaries`, each non-zero value is placed at the middle of its weight among the
+    cumulative weights, the extremes at the ends, and zeros span their whole weight.
+    """
+    values = values.astype(np.float64)
+    is_zero = values == 0
+    zeros = zeros + np.sum(weights[is_zero])
+    order = np.argsort(values[~is_zero], kind="stable")
+    values, weights = values[~is_zero][order], weights[~is_zero][order]
+    values, weights = values[weights > 0], weights[weights > 0]
+    num_negative = np.count_nonzero(values < 0)
+    if len(values) == 0:
+        return np.zeros(np.shape(q)) if zeros > 0 else np.full(np.shape(q), math.nan)
+
+    # Zeros sit between the negative and the positive values
+    cumulative_weights = np.cumsum(weights) + np.where(np.arange(len(values)) >= num_negative, zeros, 0)
+    centers = cumulative_weights - weights / 2
+    negative_weight = np.sum(weights[:num_negative])
+    total_weight = np.sum(weights) + zeros
+    zero_ranks = [negative_weight, negative_weight + zeros] if zeros > 0 else []
+    extremes = (min(values[0], 0) if zeros > 0 else values[0], max(values[-1], 0) if zeros > 0 else values[-1])
+    return np.interp(
+        np.asarray(q, dtype=np.float64) * total_weight,
+        np.concatenate(([0], centers[:num_negative], zero_ranks, centers[num_negative:], [total_weight])),
+        np.concatenate(
+            ([extremes[0]], values[:num_negative], [0.0] * len(zero_ranks), values[num_negative:], [extremes[1]])
+        ),
+    )
+
+
+def _match_weighted(
+    array_1: SparseSampleArray,
+    array_2: SparseSampleArray,
+) -> tuple[SparseSampleArray, SparseSampleArray]:
+    """
+    Lays out two arrays with the same number of stored values anew, with the same (weighted) layout, so that
+    their samples can be paired. The arrays are independent, so their simulations fall in four regions: in which
+    both, only the first, only the second or neither have a stored value. The stored values of the result are
+    split evenly between the first three regions (those with any weight), however unlikely they are, and weighted
+    by how likely the region is, and by the weights of the values drawn into it. Simulations in which neither has
+    a stored value are implicit zeros of both.
+    """
+    if array_1.nnz != array_2.nnz:
+        raise ValueError("Both arrays should start with the same number of stored elements")
+    num_values = array_1.nnz
+    total_weight = min(array_1.total_weight, array_2.total_weight)
+    stored_1 = 1 - array_1.num_zeros / array_1.total_weight
+    stored_2 = 1 - array_2.num_zeros / array_2.total_weight
+    region_weights = np.array([stored_1 * stored_2, stored_1 * (1 - stored_2), (1 - stored_1) * stored_2])
+    regions = np.flatnonzero(region_weights > 0)
+    counts = np.zeros(3, dtype=int)
+    counts[regions] = num_values // len(regions)
+    counts[regions[: num_values % len(regions)]] += 1
+
+    # Each stored value is drawn into a single region, at random
+    order_1 = get_rng().permutation(num_values)
+    order_2 = get_rng().permutation(num_values)
+    weights_1, weights_2 = array_1.weights_or_ones(), array_2.weights_or_ones()
+    data_1, data_2, weights = [], [], []
+    start_1 = start_2 = 0
+    for region, count in enumerate(counts):
+        if count == 0:
+            continue
+        has_values_1, has_values_2 = region in (0, 1), region in (0, 2)
+        region_data_1 = np.zeros(count, dtype=array_1.dtype)
+        region_data_2 = np.zeros(count, dtype=array_2.dtype)
+        region_weights_of_values = np.ones(count)
+        if has_values_1:
+            indices = order_1[start_1 : start_1 + count]
+            start_1 += count
+            region_data_1 = array_1.data[indices]
+            region_weights_of_values *= weights_1[indices]
+        if has_values_2:
+            indices = order_2[start_2 : start_2 + count]
+            start_2 += count
+            region_data_2 = array_2.data[indices]
+            region_weights_of_values *= weights_2[indices]
+        data_1.append(region_data_1)
+        data_2.append(region_data_2)
+        weights.append(
+            region_weights_of_values * total_weight * region_weights[region] / np.sum(region_weights_of_values)
+        )
+
+    num_zeros = round(total_weight * (1 - stored_1) * (1 - stored_2))
+    weights_of_both = np.concatenate(weights)
+    return (
+        SparseSampleArray(np.concatenate(data_1), num_zeros, weights=weights_of_both),
+        SparseSampleArray(np.concatenate(data_2), num_zeros, weights=weights_of_both),
+    )
@@ -1,13 +1,48 @@
+from typing import Any
+
+import numpy as np
 import squigglepy as sq
 
+from ccm.contexts import get_rng
+from ccm.simulation_params import get_dtype
+from ccm.utility.low_discrepancy import sample_uniforms
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
 
-def sample(dist: sq.OperableDistribution | None, n: int = 1, **kwargs):
-    kwargs["n"] = n
-    return sq.sample(dist, **kwargs)
 
+class _ContextGenerator(np.random.Generator):
+    """
+    A generator that draws from the generator of the current context (see `ccm.contexts.get_rng`), whichever
+    context it is called in. Squigglepy draws all of its samples from a single process-wide generator, so it is
+    handed this one (through its public `set_seed`, which takes generators as-is): sampling is then seedable per
+    context, and concurrent contexts (e.g. the threads of API requests) draw from their own generators at once,
+    rather than taking turns with squigglepy's.
+    """
+
+    def __init__(self) -> None:
+        # (The bit generator of the base class is never drawn from)
+        super().__init__(np.random.PCG64(0))
+
+    def __getattribute__(self, name: str) -> Any:
+        return getattr(get_rng(), name)
 
-def sample_probabilities(number):
-    return sample(sq.uniform(0, 1), n=number)
 
+_CONTEXT_GENERATOR = _ContextGenerator()
 
-RNG = sq.rng._squigglepy_internal_rng
+
+def sample(dist: sq.OperableDistribution | YearsToExtinctionDistribution | None, n: int = 1, **kwargs):
+    # The model's own distributions are sampled through their inverse CDF
+    if isinstance(dist, YearsToExtinctionDistribution):
+        return dist.sample(n)
+    kwargs["n"] = n
+    # Handed on each call, in case squigglepy was seeded elsewhere (setting the same generator needs no lock)
+    sq.set_seed(_CONTEXT_GENERATOR)
+    samples = sq.sample(dist, **kwargs)
+    # Floating point samples take the precision of the context
+    if isinstance(samples, np.ndarray) and samples.dtype.kind == "f":
+        return samples.astype(get_dtype(), copy=False)
+    return samples
+
+
+def sample_probabilities(number):
+    # Follows the sampling method and precision of the context, like the samples of DistributionSpecs
+    return sample_uniforms(number).astype(get_dtype(), copy=False)
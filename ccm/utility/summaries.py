@@ -0,0 +1,194 @@
+"""
+Mergeable summaries of samples, for estimates too large to keep in memory.
+
+A SampleSummary folds in samples chunk by chunk, keeping only a bounded amount of state: the count, mean and
+variance (merged with Chan et al.'s parallel algorithm), a t-digest of the non-zero samples for quantiles,
+a log-binned histogram and the number of zeros. Summaries of separate chunks, or of separate processes
+(they pickle), can be merged into the summary of all their samples.
+
+Samples can be weighted (e.g. those drawn by stratified sampling, see `ccm.utility.sparse_samples`), in which case
+the count, the zeros and the bins of the histogram are totals of weights rather than numbers of samples.
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+DEFAULT_COMPRESSION = 500
+DEFAULT_BINS_PER_DECADE = 10
+
+
+class SampleSummary:
+    """Bounded-memory summary of a stream of samples, which may be padded with (implicit) zeros."""
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION, bins_per_decade: int = DEFAULT_BINS_PER_DECADE):
+        self.compression = compression
+        self.bins_per_decade = bins_per_decade
+        # Including zeros
+        self.count = 0
+        self.zeros = 0
+        self.mean = 0.0
+        # Sum of squared differences from the mean
+        self._m2 = 0.0
+        # t-digest of the non-zero samples: centroids sorted by mean, and the range of the samples
+        self._centroid_means: NDArray[np.float64] = np.array([])
+        self._centroid_weights: NDArray[np.float64] = np.array([])
+        self._min_non_zero = math.inf
+        self._max_non_zero = -math.inf
+        # Counts of non-zero samples, keyed by (sign, index of the log-spaced bin of the absolute value)
+        self._histogram: Counter[tuple[int, int]] = Counter()
+
+    @classmethod
+    def from_samples(
+        cls,
+        samples: NDArray[np.floating],
+        zeros: int = 0,
+        compression: int = DEFAULT_COMPRESSION,
+        bins_per_decade: int = DEFAULT_BINS_PER_DECADE,
+        weights: NDArray[np.float64] | None = None,
+    ) -> "SampleSummary":
+        summary = cls(compression, bins_per_decade)
+        summary.add(samples, zeros, weights)
+        return summary
+
+    # ///////////////// Updating /////////////////
+
+    def add(self, samples: NDArray[np.floating], zeros: int = 0, weights: NDArray[np.float64] | None = None) -> None:
+        """
+        Folds the samples, padded with the given number of zeros, into the summary. Samples can have weights,
+        while the zeros have a weight of one each.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if weights is None:
+            count = len(samples) + zeros
+            if count == 0:
+                return
+            mean = np.sum(samples) / count
+            m2 = np.sum((samples - mean) ** 2) + zeros * mean**2
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            count = float(np.sum(weights)) + zeros
+            if count == 0:
+                return
+            mean = np.dot(samples, weights) / count
+            m2 = np.dot(weights, (samples - mean) ** 2) + zeros * mean**2
+        self._merge_moments(count, mean, m2)
+
+        is_zero = samples == 0
+        if weights is None:
+            self.zeros += zeros + int(np.count_nonzero(is_zero))
+        else:
+            self.zeros += zeros + float(np.sum(weights[is_zero]))
+        non_zero_samples = samples[~is_zero]
+        if len(non_zero_samples) == 0:
+            return
+        non_zero_weights = np.ones(len(non_zero_samples)) if weights is None else weights[~is_zero]
+        self._min_non_zero = min(self._min_non_zero, np.min(non_zero_samples))
+        self._max_non_zero = max(self._max_non_zero, np.max(non_zero_samples))
+        self._merge_centroids(non_zero_samples, non_zero_weights)
+        self._histogram.update(self._histogram_counts(non_zero_samples, None if weights is None else non_zero_weights))
+
+    def merge(self, other: "SampleSummary") -> None:
+        """Folds the samples summarized by the other summary into this one."""
+        if (other.compression, other.bins_per_decade) != (self.compression, self.bins_per_decade):
+            raise ValueError("Only summaries with the same compression and histogram bins can be merged")
+        if other.count == 0:
+            return
+        self._merge_moments(other.count, other.mean, other._m2)
+        self.zeros += other.zeros
+        self._min_non_zero = min(self._min_non_zero, other._min_non_zero)
+        self._max_non_zero = max(self._max_non_zero, other._max_non_zero)
+        if len(other._centroid_means):
+            self._merge_centroids(other._centroid_means, other._centroid_weights)
+        self._histogram.update(other._histogram)
+
+    def _merge_moments(self, count: float, mean: float, m2: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+
+    def _merge_centroids(self, means: NDArray[np.float64], weights: NDArray[np.float64]) -> None:
+        # A merging t-digest, compressed in a single vectorized pass: every centroid (or sample) is assigned to
+        # a cluster by the integer part of the k1 scale function at its cumulative quantile. Clusters thus span at
+        # most one unit of k, which keeps them small in the tails, where quantiles need the most resolution.
+        means = np.concatenate([self._centroid_means, means])
+        weights = np.concatenate([self._centroid_weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        cumulative_weights = np.cumsum(weights)
+        quantiles = np.clip(cumulative_weights / cumulative_weights[-1], 0, 1)
+        clusters = np.floor(self.compression / (2 * math.pi) * np.arcsin(2 * quantiles - 1))
+        cluster_starts = np.flatnonzero(np.diff(clusters, prepend=-math.inf))
+
+        cluster_weights = np.add.reduceat(weights, cluster_starts)
+        self._centroid_means = np.add.reduceat(means * weights, cluster_starts) / cluster_weights
+        self._centroid_weights = cluster_weights
+
+    def _histogram_counts(
+        self, non_zero_samples: NDArray[np.float64], weights: NDArray[np.float64] | None = None
+    ) -> Counter[tuple[int, int]]:
+        bins = np.floor(np.log10(np.abs(non_zero_samples)) * self.bins_per_decade).astype(int)
+        counts: Counter[tuple[int, int]] = Counter()
+        for sign, is_sign in ((-1, non_zero_samples < 0), (1, non_zero_samples > 0)):
+            if not np.any(is_sign):
+                continue
+            offset = np.min(bins[is_sign])
+            bin_counts = np.bincount(bins[is_sign] - offset, None if weights is None else weights[is_sign])
+            counts.update({(sign, int(bin_) + offset): bin_counts[bin_].item() for bin_ in np.flatnonzero(bin_counts)})
+        return counts
+
+    # ///////////////// Statistics /////////////////
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def min(self) -> float:
+        return min(self._min_non_zero, 0.0) if self.zeros else self._min_non_zero
+
+    @property
+    def max(self) -> float:
+        return max(self._max_non_zero, 0.0) if self.zeros else self._max_non_zero
+
+    def quantile(self, q: ArrayLike) -> NDArray[np.float64]:
+        """Estimates the quantiles q (between 0 and 1) of the summarized samples, zeros included."""
+        ranks = np.asarray(q, dtype=np.float64) * self.count
+        num_negative = np.sum(self._centroid_weights[self._centroid_means < 0])
+        # Zeros sit between the negative and the positive samples, which the t-digest ranks without the zeros
+        in_zeros = (ranks >= num_negative) & (ranks <= num_negative + self.zeros)
+        digest_ranks = np.where(ranks > num_negative + self.zeros, ranks - self.zeros, ranks)
+        return np.where(in_zeros, 0.0, self._digest_quantile(digest_ranks))
+
+    def _digest_quantile(self, ranks: NDArray[np.float64]) -> NDArray[np.float64]:
+        if len(self._centroid_means) == 0:
+            return np.zeros_like(ranks)
+        # Each centroid's mean is placed at the middle of its weight, and the extremes at the ends of the ranks
+        centers = np.cumsum(self._centroid_weights) - self._centroid_weights / 2
+        total_weight = np.sum(self._centroid_weights)
+        return np.interp(
+            ranks,
+            np.concatenate([[0], centers, [total_weight]]),
+            np.concatenate([[self._min_non_zero], self._centroid_means, [self._max_non_zero]]),
+        )
+
+    def histogram(self) -> list[tuple[float, float, float]]:
+        """Returns the (lower edge, upper edge, count) of the non-empty bins of non-zero samples, in increasing
+        order. Bins are spaced logarithmically by absolute value; zeros are counted in `zeros` instead.
+        Counts of weighted samples are their total weights."""
+        bins = []
+        for (sign, bin_), count in self._histogram.items():
+            edges = sorted(
+                (sign * 10 ** (bin_ / self.bins_per_decade), sign * 10 ** ((bin_ + 1) / self.bins_per_decade))
+            )
+            bins.append((edges[0], edges[1], count))
+        return sorted(bins)
@@ -1,19 +1,15 @@
-from typing import cast, Literal
-from copy import deepcopy
+from typing import cast, overload
 
 import numpy as np
 import squigglepy as sq
 from numpy import floating, ndarray
 from numpy.typing import NDArray
-from scipy.sparse import coo_array
 
-import ccm.config as config
 import ccm.utility.squigglepy_wrapper as sqw
-from ccm.utility.squigglepy_wrapper import RNG
+from ccm.simulation_params import get_num_simulations
 
 ONE_BASIS_POINT = 0.0001
 STANDARD_PERCENTILES = [1, 5, 10, 20, 25, 30, 40, 50, 60, 70, 75, 80, 90, 95, 99]
-SIMULATIONS = config.get_simulations()
 
 
 def create_distribution(
@@ -55,7 +51,7 @@ def sample_distribution(
         credibility=credibility,
     )
 
-    return sqw.sample(distribution, n=SIMULATIONS)
+    return sqw.sample(distribution, n=get_num_simulations())
 
 
 def replace_zeros_with_tiny(arr: NDArray[np.float64]) -> NDArray[np.float64]:
@@ -66,10 +62,22 @@ def replace_zeros_with_tiny(arr: NDArray[np.float64]) -> NDArray[np.float64]:
     return arr
 
 
+@overload
 def replace_zero_float_with_tiny(num: floating | float) -> floating:
+    ...
+
+
+@overload
+def replace_zero_float_with_tiny(num: NDArray[np.float64]) -> NDArray[np.float64]:
+    ...
+
+
+def replace_zero_float_with_tiny(num: floating | float | NDArray[np.float64]) -> floating | NDArray[np.float64]:
     """
-    Replaces a single zero float with tiniest positive float.
+    Replaces a single zero float, or the zeros of an array of floats, with tiniest positive float.
     """
+    if isinstance(num, ndarray):
+        return np.where(num == 0, np.finfo(float).tiny, num)
     if num == 0:
         return np.finfo(float).tiny
 
@@ -122,40 +130,3 @@ def cut_x_percent(array, x: float):
     cut_scenarios_higher = [min(x, upper_cut) for x in cut_scenarios_lower]
 
     return np.array(cut_scenarios_higher)
-
-
-def match_coo_axis_lengths(
-    array_1: coo_array,
-    array_2: coo_array,
-    axis: Literal[0, 1] = 1,
-) -> tuple[coo_array, coo_array]:
-    assert array_1.nnz == array_2.nnz, "Both arrays should start with the same number of stored elements!"
-
-    if array_1.shape[axis] > array_2.shape[axis]:
-        array_bigger = array_1
-        array_smaller = array_2
-    elif array_1.shape[axis] < array_2.shape[axis]:
-        array_bigger = array_2
-        array_smaller = array_1
-    else:
-        return array_1, array_2
-
-    # randomly select a subsample of the values in the biggest array, so that its full length matches the length
-    # of the smallest array, without changing the proportion of zeros
-    array_bigger_prop_non_zeros = array_bigger.getnnz(axis) / array_bigger.shape[axis]
-    num_samples_to_keep = int(array_bigger_prop_non_zeros * array_smaller.shape[axis])
-    which_samples_to_keep = RNG.choice(array_bigger.data, size=num_samples_to_keep, replace=False)
-
-    # add explicit zeros until the number of stored values is the same for both arrays
-    num_explicit_zeros = array_smaller.getnnz(axis) - num_samples_to_keep
-    which_samples_to_keep = np.concatenate((which_samples_to_keep, np.zeros(num_explicit_zeros)))
-
-    # copy shape and non-zero positions from the smallest array; then replace the stored values by the (subsampled)
-    # values of the biggest array
-    resized_array = deepcopy(array_smaller)
-    resized_array.data = which_samples_to_keep
-
-    # return the two arrays in the order they were provided
-    if array_1.shape[axis] > array_2.shape[axis]:
-        return resized_array, array_smaller
-    return array_smaller, resized_array
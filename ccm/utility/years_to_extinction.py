@@ -0,0 +1,95 @@
+"""
+The distribution of the number of years until extinction, given eras of constant annual extinction risk.
+
+In each era, humanity goes extinct in each year with the era's annual probability, so the year of extinction
+within an era is geometrically distributed, truncated to the era. The last era always ends in extinction.
+The distribution is sampled through its inverse CDF, which is computed in closed form for all samples at once.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from ccm.simulation_params import get_dtype
+from ccm.utility.low_discrepancy import sample_uniforms
+
+
+class YearsToExtinctionDistribution:
+    """
+    Distribution of the number of years until extinction (starting from 0, for extinction this year), for eras of
+    the given lengths and annual extinction probabilities.
+    """
+
+    def __init__(self, lengths: Sequence[int], annual_risks: Sequence[float]) -> None:
+        if len(lengths) == 0:
+            raise ValueError("At least one era is needed for a distribution of years to extinction")
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.annual_risks = np.asarray(annual_risks, dtype=np.float64)
+        self.starts = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+
+        # Probability of going extinct in an era, if it is reached. log1p and expm1 keep the precision of
+        # small risks over long eras.
+        with np.errstate(divide="ignore"):
+            self._log_survival_per_year = np.log1p(-self.annual_risks)
+        self._era_risks = -np.expm1(self.lengths * self._log_survival_per_year)
+        # Probability of reaching the start of each era, and the end of the last one, which ends in extinction.
+        # Quantiles are computed from these survival probabilities, which keep their precision in the tail.
+        self._reached = np.concatenate((np.cumprod(np.concatenate(([1.0], 1 - self._era_risks[:-1]))), [0.0]))
+        self._era_probabilities = self._reached[:-1] - self._reached[1:]
+
+    def sample(self, n: int) -> NDArray[np.floating]:
+        """Draws `n` samples, using the sampling method and floating point type of the context."""
+        return self.quantile(sample_uniforms(n)).astype(get_dtype(), copy=False)
+
+    def sample_greater_than(self, lower: ArrayLike) -> NDArray[np.floating]:
+        """
+        Draws a sample greater than each of the given numbers of years, i.e. from the distribution conditioned on
+        extinction happening later. Each sample takes a single draw, from the survival probabilities beyond the
+        given years. There must be a chance of going extinct later than all of them.
+        """
+        first_later_years = np.floor(np.asarray(lower, dtype=np.float64)) + 1
+        survival = self.survival(first_later_years)
+        if np.any(survival == 0):
+            raise ValueError("Can't sample years to extinction beyond the end of the last era")
+        uniforms = sample_uniforms(len(survival))
+        # (Rounding could otherwise land a sample at the boundary on the year before)
+        samples = np.maximum(self._quantile_of_survival(survival * (1 - uniforms)), first_later_years)
+        return samples.astype(get_dtype(), copy=False)
+
+    def quantile(self, q: ArrayLike) -> NDArray[np.float64]:
+        """The inverse CDF: maps probabilities in [0, 1) to the number of years until extinction."""
+        return self._quantile_of_survival(1 - np.asarray(q, dtype=np.float64))
+
+    def survival(self, years: ArrayLike) -> NDArray[np.float64]:
+        """The probability of going extinct in the given number of years or later."""
+        years = np.asarray(years, dtype=np.float64)
+        era = np.clip(np.searchsorted(self.starts, years, side="right") - 1, 0, len(self.lengths) - 1)
+        years_in_era = np.clip(years - self.starts[era], 0, self.lengths[era])
+        # Probability that the extinction within the era, if any, happens this many years into the era or later
+        log_survival = self._log_survival_per_year[era]
+        with np.errstate(invalid="ignore"):
+            later_in_era = -np.expm1(log_survival * (self.lengths[era] - years_in_era)) / self._era_risks[era]
+            later_in_era = np.where(log_survival == 0, 1 - years_in_era / self.lengths[era], later_in_era)
+            # (Checking for the start of the era, as certain extinction has a log survival of -inf)
+            later_in_era *= np.exp(np.where(years_in_era == 0, 0, log_survival * years_in_era))
+        later_in_era = np.nan_to_num(later_in_era)
+        return self._reached[era + 1] + self._era_probabilities[era] * later_in_era
+
+    def _quantile_of_survival(self, survival: NDArray[np.float64]) -> NDArray[np.float64]:
+        # Eras are found by the probability of reaching them, which decreases from one era to the next
+        era = np.clip(np.searchsorted(-self._reached, -survival, side="right") - 1, 0, len(self.lengths) - 1)
+        # The (uniform) probability of the year within the era, given that extinction happens in the era
+        with np.errstate(divide="ignore", invalid="ignore"):
+            q_in_era = (self._reached[era] - survival) / self._era_probabilities[era]
+        return self.starts[era] + self._truncated_geometric_quantile(era, np.clip(np.nan_to_num(q_in_era), 0, 1))
+
+    def _truncated_geometric_quantile(self, era: NDArray[np.intp], q: NDArray[np.float64]) -> NDArray[np.float64]:
+        # Year within the era, of a geometric distribution truncated to the era's length
+        lengths = self.lengths[era]
+        log_survival = self._log_survival_per_year[era]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            years = np.floor(np.log1p(-q * self._era_risks[era]) / log_survival)
+        # Without risk, all years of the era are equally likely
+        years = np.where(log_survival == 0, np.floor(q * lengths), years)
+        return np.clip(np.nan_to_num(years), 0, lengths - 1)
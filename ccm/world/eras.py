@@ -4,6 +4,7 @@
 
 from ccm.base_parameters import FrozenDict
 import ccm.config as config
+from ccm.utility.fingerprints import fingerprint
 from ccm.world.risk_types import RiskType
 
 
@@ -34,6 +35,10 @@ def __init__(self, **kwargs):
             self.annual_extinction_risk = sum(self.absolute_risks_by_type.values())
             self.proportional_risks_by_type = self.get_proportional_risks()  # override given proportional_risks_by_type
 
+    def fingerprint(self) -> str:
+        """Structural fingerprint of the era, the same for all equal eras (see ccm.utility.fingerprints)."""
+        return fingerprint(self)
+
     def get_length(self) -> int:
         return self.length
 
@@ -2,17 +2,21 @@
 Premises and calculations about World Population (of humans) over time.
 """
 
+from typing import TYPE_CHECKING
+
 import numpy as np
 from numpy.typing import NDArray
 from squigglepy.numbers import B
 
 import ccm.config as config
-import ccm.utility.squigglepy_wrapper as sqw
 import ccm.world.space as space
-from ccm.contexts import inject_parameters
+from ccm.contexts import inject_parameters, inject_parameters_with_memo
 from ccm.world.longterm_params import LongTermParams
 from ccm.world.space import GALACTIC_RADIUS, SUPERCLUSTER_RADIUS
 
+if TYPE_CHECKING:
+    from ccm.world.simulation import WorldSimulation
+
 
 CUR_YEAR = config.get_current_year()
 WORLD_POPULATION_NOW = 8 * B
@@ -21,22 +25,37 @@
 AVERAGE_LIFE_EXPECTANCY_WORLDWIDE = 72  # world bank
 
 
-def get_total_life_years_until(end_period_array: NDArray[np.float64]) -> NDArray[np.float64]:
+def get_total_life_years_until(
+    end_period_array: NDArray[np.float64],
+    world: "WorldSimulation | None" = None,
+) -> NDArray[np.float64]:
+    """
+    Returns the number of life years lived until each number of years. The populations and the expansion of each
+    world are read from the simulated worlds if given (one per number of years), and sampled otherwise.
+    """
+    if world is not None and world.num_samples != len(end_period_array):
+        raise ValueError(f"Expected a number of years for each of the {world.num_samples} simulated worlds")
     # find samples in which some delay occurs.
     # Focus on these to ease computation time.
-    non_zero_indices = (end_period_array > 0).nonzero()
-    num_non_zero_samples = len(non_zero_indices)
+    non_zero_indices = np.flatnonzero(end_period_array > 0)
 
     # Return early unless valid samples exist
-    if num_non_zero_samples == 0:
+    if len(non_zero_indices) == 0:
         return np.zeros(len(end_period_array))
 
-    non_zero_end_years = end_period_array[non_zero_indices]
+    # Life years can exceed the range of float32 samples, so they are always computed in float64
+    non_zero_end_years = end_period_array[non_zero_indices].astype(np.float64)
 
-    # count terrestrial and extraterrestrial life years separately
-    terrestrial_life_years = _get_terrestrial_life_years_until(non_zero_end_years)
-    extraterrestrial_life_years = _get_extraterrestrial_life_years_until(non_zero_end_years)
-    overall_life_years = terrestrial_life_years + extraterrestrial_life_years
+    if world is None:
+        overall_life_years = _sample_life_years_until(non_zero_end_years)
+    else:
+        overall_life_years = _life_years_until(
+            non_zero_end_years,
+            world.populations_per_star[non_zero_indices],
+            world.expansion_speeds[non_zero_indices],
+            world.galactic_densities[non_zero_indices],
+            world.supercluster_densities[non_zero_indices],
+        )
 
     life_years_until = np.zeros(len(end_period_array))
     life_years_until[non_zero_indices] = overall_life_years
@@ -51,79 +70,106 @@ def calculate_life_years_lost(samples: NDArray[np.float64]) -> NDArray[np.float6
 # ///////////////// Private ////////////////////
 
 
-def _get_terrestrial_life_years_until(years_until_array: NDArray[np.float64]) -> NDArray[np.float64]:
-    """Calculates the number of years lived until each of a given array of years."""
+@inject_parameters
+def _sample_life_years_until(params: LongTermParams, years_until_array: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Calculates the number of life years lived until each of a given array of years, in sampled worlds."""
+    num_samples = len(years_until_array)
+    return _life_years_until(
+        years_until_array,
+        sample_populations_per_star(num_samples),
+        space.sample_expansion_speeds(num_samples),
+        params.galactic_density.sample(num_samples),
+        params.supercluster_density.sample(num_samples),
+    )
+
+
+def _life_years_until(
+    years_until_array: NDArray[np.float64],
+    populations_per_star: NDArray[np.floating],
+    expansion_speeds: NDArray[np.floating],
+    galactic_densities: NDArray[np.floating],
+    supercluster_densities: NDArray[np.floating],
+) -> NDArray[np.float64]:
+    """
+    Calculates the terrestrial and extraterrestrial life years lived until each of a given array of years, in a
+    single array: the extraterrestrial life years are computed into it, and the terrestrial ones added to it.
+    """
+    # The terrestrial population after 3000 is that of a single star, so both share the population per star
+    populations_per_star = populations_per_star.astype(np.float64, copy=False)
+    life_years = _extraterrestrial_life_years(
+        years_until_array, expansion_speeds, populations_per_star, galactic_densities, supercluster_densities
+    )
+    _add_terrestrial_life_years(years_until_array, populations_per_star, out=life_years)
+    return life_years
+
 
-    # The array of years converted from relative to absolute, e.g.  2 => 2025
-    end_year_array = years_until_array + CUR_YEAR
+def _add_terrestrial_life_years(
+    years_until_array: NDArray[np.float64],
+    perpetual_population: NDArray[np.float64],
+    out: NDArray[np.float64],
+) -> None:
+    """Adds the number of life years lived on Earth until each of a given array of years to `out`."""
+    fraction = np.empty(len(years_until_array))
+    value = np.empty(len(years_until_array))
 
     # Calculate the number of life years before 2100
     # The fraction of the way between now and 2100
-    fraction_until_2100 = np.where(end_year_array > 2100, 1, years_until_array / (2100 - CUR_YEAR))
-    # Then nubmer of years until 2100
-    years_until_2100 = fraction_until_2100 * (2100 - CUR_YEAR)
-    value_to_2100 = (
-        # simpliciation: assume constant population growth
-        # Population = average of the population at the start and the population at the last year counted.
-        WORLD_POPULATION_NOW
-        + ((WORLD_POPULATION_2100 - WORLD_POPULATION_NOW) * fraction_until_2100 / 2)
-    ) * years_until_2100
+    np.divide(years_until_array, 2100 - CUR_YEAR, out=fraction)
+    np.minimum(fraction, 1, out=fraction)
+    # simpliciation: assume constant population growth
+    # Population = average of the population at the start and the population at the last year counted,
+    # times the number of years until 2100.
+    np.multiply(fraction, (WORLD_POPULATION_2100 - WORLD_POPULATION_NOW) / 2, out=value)
+    value += WORLD_POPULATION_NOW
+    value *= fraction
+    value *= 2100 - CUR_YEAR
+    out += value
 
     # Calculate the number of life years between 2100 and 3000
-    perpetual_population = _sample_populations_per_star(len(years_until_array))
-    fraction_until_3000 = np.where(end_year_array > 3000, 1, np.maximum((end_year_array - 2100) / (3000 - 2100), 0))
-    years_until_3000 = np.where(fraction_until_3000 > 0, fraction_until_3000 * (3000 - 2100), 0)
-
-    value_to_3000 = (
-        WORLD_POPULATION_2100 + ((perpetual_population - WORLD_POPULATION_2100) * fraction_until_3000) / 2
-    ) * years_until_3000
+    np.add(years_until_array, CUR_YEAR - 2100, out=fraction)
+    fraction /= 3000 - 2100
+    np.clip(fraction, 0, 1, out=fraction)
+    np.subtract(perpetual_population, WORLD_POPULATION_2100, out=value)
+    value *= fraction
+    value /= 2
+    value += WORLD_POPULATION_2100
+    value *= fraction
+    value *= 3000 - 2100
+    out += value
 
     # The population that the Earth will eventually settle in to.
-    value_thereafter = np.where(end_year_array > 3000, (end_year_array - 3000) * perpetual_population, 0)
-
-    return value_to_2100 + value_to_3000 + value_thereafter
+    np.add(years_until_array, CUR_YEAR - 3000, out=value)
+    np.maximum(value, 0, out=value)
+    value *= perpetual_population
+    out += value
 
 
-@inject_parameters
-def _get_extraterrestrial_life_years_until(
-    params: LongTermParams,
+def _extraterrestrial_life_years(
     end_year_array: NDArray[np.float64],
+    expansion_speed_samples: NDArray[np.floating],
+    population_per_star_samples: NDArray[np.floating],
+    galactic_densities: NDArray[np.floating],
+    supercluster_densities: NDArray[np.floating],
 ) -> NDArray[np.float64]:
-    num_samples = len(end_year_array)
-    if num_samples < 1:
-        return np.array([])
-    # Sample parameters and use the samples for galactic and intergalactic speeds
-    expansion_speed_samples = space.sample_expansion_speeds(num_samples)
-    population_per_star_samples = _sample_populations_per_star(num_samples)
-    galactic_densities = sqw.sample(params.galactic_density.get_distribution(), n=num_samples)
-    supercluster_densities = sqw.sample(params.supercluster_density.get_distribution(), n=num_samples)
-
-    summed_inhabited_galactic_volume = space.compute_inhabited_volumes(
-        end_year_array, expansion_speed_samples, GALACTIC_RADIUS
+    # Upcast, as the inhabited volumes overflow float32.
+    # The galactic and the super cluster volumes are computed in a single pass. Note that this is double-counting
+    # space, but the relative density makes this a rounding error.
+    life_years = space.compute_populated_volumes(
+        end_year_array,
+        expansion_speed_samples.astype(np.float64, copy=False),
+        (GALACTIC_RADIUS, SUPERCLUSTER_RADIUS),
+        (galactic_densities.astype(np.float64, copy=False), supercluster_densities.astype(np.float64, copy=False)),
     )
-    galactic_life_years = summed_inhabited_galactic_volume * population_per_star_samples * galactic_densities
+    life_years *= population_per_star_samples
+    return life_years
 
-    # Compute super cluster radius separately. Note that this is double-counting space, but the relative density
-    # makes this a rounding error.
-    summed_inhabited_supercluster_volume = space.compute_inhabited_volumes(
-        end_year_array, expansion_speed_samples, SUPERCLUSTER_RADIUS
-    )
 
-    supercluster_life_years = (
-        summed_inhabited_supercluster_volume * population_per_star_samples * supercluster_densities
-    )
-
-    return galactic_life_years + supercluster_life_years
-
-
-@inject_parameters
-def _sample_populations_per_star(
+# Memoized per stream, so that the terrestrial and extraterrestrial life years of a world share its population
+@inject_parameters_with_memo(per_rng=True)
+def sample_populations_per_star(
     params: LongTermParams,
     num_samples: int,
 ) -> NDArray[np.float64]:
     if num_samples < 1:
         return np.array([])
-    return sqw.sample(
-        params.stellar_population_capacity.get_distribution(),
-        n=num_samples,
-    )
+    return params.stellar_population_capacity.sample(num_samples)
@@ -0,0 +1,167 @@
+"""
+Simulated worlds shared by the estimates of x-risk interventions.
+
+The estimates of all x-risk interventions read the same samples of the world: when humanity would go extinct
+(and, if it survived that, when it would go extinct later), how many people each star would hold, how fast
+humanity would expand into space, how dense the stars are, and how deadly catastrophes are. A WorldSimulation
+carries these samples for a number of worlds, so that they are drawn once, and the estimate of each intervention
+only draws what is specific to it (its persistence, its effect...).
+
+Worlds are memoized by the long-term parameters, the stream of the generator of the context and the number of
+worlds (see `get_world_simulation`), so estimates in the same context (e.g. the interventions of a batch, see
+`ccm.interventions.batch`) model the same worlds, while estimates with another seed model worlds of their own.
+"""
+
+from collections.abc import Callable, Hashable
+from functools import partial
+
+import numpy as np
+from numpy.typing import NDArray
+
+import ccm.utility.risk_calculator as risk_calculator
+import ccm.utility.squigglepy_wrapper as sqw
+import ccm.world.population as population
+import ccm.world.space as space
+from ccm.contexts import (
+    derived_seed,
+    draws_are_memoized,
+    get_rng,
+    inject_parameters,
+    inject_parameters_with_memo,
+    stream_key,
+    using_rng,
+)
+from ccm.simulation_params import get_dtype
+from ccm.utility.low_discrepancy import sample_uniforms
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
+from ccm.world.longterm_params import LongTermParams
+from ccm.world.risk_types import RiskType
+
+
+class WorldSimulation:
+    """
+    Samples of `num_samples` worlds with the given long-term parameters, each drawn from a stream of its own,
+    derived from the given stream (see `ccm.contexts.derived_seed`), so that they don't depend on the order in
+    which they are drawn. All samples are drawn on construction, so that worlds are read-only once they are shared
+    (e.g. between the threads of concurrent requests).
+    """
+
+    def __init__(self, params: LongTermParams, num_samples: int, stream: Hashable) -> None:
+        self.params = params
+        self.num_samples = num_samples
+        self._stream = stream
+
+        distribution = risk_calculator.get_distribution_of_years_to_extinction()
+        self.years_to_extinction = self._sample("years_to_extinction", lambda: sqw.sample(distribution, num_samples))
+        self.years_to_later_extinction = self._sample(
+            "years_to_later_extinction", lambda: self._sample_later_extinctions(distribution)
+        )
+        self.populations_per_star = self._sample(
+            "populations_per_star", lambda: population.sample_populations_per_star(num_samples)
+        )
+        self.expansion_speeds = self._sample("expansion_speeds", lambda: space.sample_expansion_speeds(num_samples))
+        self.galactic_densities = self._sample(
+            "galactic_densities", lambda: params.galactic_density.sample(num_samples)
+        )
+        self.supercluster_densities = self._sample(
+            "supercluster_densities", lambda: params.supercluster_density.sample(num_samples)
+        )
+        self._catastrophe_intensities: dict[RiskType, NDArray[np.floating]] = {}
+        # Uniforms of the intensities with an inverse CDF, which are only computed for the worlds asked for
+        self._catastrophe_uniforms: dict[RiskType, NDArray[np.float64]] = {}
+        for risk_type, intensity in params.catastrophe_intensities.items():
+            name = f"catastrophe_intensities/{risk_type.value}"
+            if intensity.get_quantile_function() is None:
+                self._catastrophe_intensities[risk_type] = self._sample(name, partial(intensity.sample, num_samples))
+            else:
+                self._catastrophe_uniforms[risk_type] = self._sample(name, lambda: sample_uniforms(num_samples))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays())
+
+    def freeze(self) -> None:
+        """Makes the samples read-only, as they are shared by all estimates in the worlds."""
+        for array in self._arrays():
+            array.flags.writeable = False
+
+    def catastrophe_intensities(
+        self,
+        risk_type: RiskType,
+        indices: NDArray[np.intp] | None = None,
+    ) -> NDArray[np.floating]:
+        """
+        The proportion of the population that a catastrophe of the given type would kill, in each world, or in the
+        worlds at the given indices. Intensities with an inverse CDF are computed only for the worlds asked for
+        (e.g. those in which a catastrophe happens), from uniforms drawn for all worlds, so that each world has
+        the same intensity whichever worlds are asked for.
+        """
+        if risk_type in self._catastrophe_intensities:
+            intensities = self._catastrophe_intensities[risk_type]
+            return intensities if indices is None else intensities[indices]
+
+        quantile_function = self.params.catastrophe_intensities[risk_type].get_quantile_function()
+        uniforms = self._catastrophe_uniforms[risk_type]
+        return quantile_function(uniforms if indices is None else uniforms[indices]).astype(get_dtype(), copy=False)
+
+    # ///////////////// Private Methods /////////////////
+
+    def _arrays(self) -> list[NDArray]:
+        return [
+            self.years_to_extinction,
+            self.years_to_later_extinction,
+            self.populations_per_star,
+            self.expansion_speeds,
+            self.galactic_densities,
+            self.supercluster_densities,
+            *self._catastrophe_intensities.values(),
+            *self._catastrophe_uniforms.values(),
+        ]
+
+    def _sample(self, name: str, sample_world: Callable[[], NDArray]) -> NDArray:
+        with using_rng(derived_seed(self._stream, f"world/{name}")):
+            return np.asarray(sample_world())
+
+    def _sample_later_extinctions(self, distribution: YearsToExtinctionDistribution) -> NDArray[np.floating]:
+        # Worlds that go extinct at the end of the last era can't go extinct later, and keep their year of extinction
+        can_go_extinct_later = distribution.survival(np.floor(self.years_to_extinction) + 1) > 0
+        later = self.years_to_extinction.copy()
+        later[can_go_extinct_later] = distribution.sample_greater_than(self.years_to_extinction[can_go_extinct_later])
+        return later
+
+
+@inject_parameters_with_memo(per_rng=True)
+def get_world_simulation(params: LongTermParams, num_samples: int) -> WorldSimulation:
+    """
+    Returns `num_samples` simulated worlds with the long-term parameters of the context, memoized per stream of the
+    generator (or per world stream, where world draws are shared), so that all estimates in the context share them.
+    """
+    stream = stream_key(get_rng())
+    if stream is None:
+        # (For generators without a stream, such as the process-wide generator, which aren't memoized)
+        stream = (int(get_rng().integers(2**63)), ())
+    return WorldSimulation(params, num_samples, stream)
+
+
+@inject_parameters
+def sample_catastrophe_intensities(
+    params: LongTermParams,
+    risk_type: RiskType,
+    num_samples: int,
+    indices: NDArray[np.intp] | None = None,
+) -> NDArray[np.floating]:
+    """
+    Returns the intensities of catastrophes of the given type in `num_samples` simulated worlds (see
+    `WorldSimulation.catastrophe_intensities`), or in the worlds at the given indices. Where worlds aren't memoized
+    (e.g. with the process-wide generator, which draws them anew on each call), only the intensities asked for are
+    drawn, rather than whole worlds.
+    """
+    if draws_are_memoized():
+        return get_world_simulation(num_samples).catastrophe_intensities(risk_type, indices)
+
+    intensity = params.catastrophe_intensities[risk_type]
+    num_drawn = num_samples if indices is None else len(indices)
+    quantile_function = intensity.get_quantile_function()
+    if quantile_function is None:
+        return np.asarray(intensity.sample(num_drawn))
+    return quantile_function(sample_uniforms(num_drawn)).astype(get_dtype(), copy=False)
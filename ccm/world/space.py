@@ -1,11 +1,11 @@
 import math
+from collections.abc import Sequence
 
 import numpy as np
 from squigglepy import T
 from numpy.typing import NDArray
 
-import ccm.utility.squigglepy_wrapper as sqw
-from ccm.contexts import inject_parameters
+from ccm.contexts import inject_parameters_with_memo
 from ccm.world.longterm_params import LongTermParams
 
 # radius of MilkyWay galaxy, in light years
@@ -16,28 +16,45 @@
 PI = math.pi
 
 
-def compute_inhabited_volumes(
-    end_year_samples: NDArray[np.float64], speed: NDArray[np.float64], radius: int
+def compute_populated_volumes(
+    end_year_samples: NDArray[np.float64],
+    speed: NDArray[np.float64],
+    radii: Sequence[int],
+    densities: Sequence[NDArray[np.float64]],
+    out: NDArray[np.float64] | None = None,
 ) -> NDArray[np.float64]:
     """
-    Compute amount of volume from sphere with given radius humanity will populate, starting from 0 with speed.
-    Stops expanding upon hitting size determined by radius.
+    Computes the sum of the volumes of spheres with the given radii that humanity will populate, starting from 0 with
+    speed, each multiplied by the density of stars in it. Expansion stops upon hitting the size of each sphere.
     Note, this is a 4-dimensional measure, since it is the total history of volume, not the volume at any single time.
+
+    The radii are computed in a single pass: the terms they share are computed once, and the work is done in two
+    buffers rather than in temporary arrays. The result is written to `out` (added to what it holds) if given.
     """
-    time_expansion_finished = np.where(speed > 0, np.divide(radius, speed, where=speed > 0), TIME_WHEN_STARS_BURN_OUT)
-    time_during_expansion = np.where(
-        end_year_samples > time_expansion_finished, time_expansion_finished, end_year_samples
-    )
-    time_after_expansion = end_year_samples - time_during_expansion
-    time_after_expansion[time_after_expansion < 0] = 0
-    expansion_period_volume = (time_during_expansion**4 * PI * speed**3) / 3
-    post_expansion_period_volume = time_after_expansion * 4 / 3 * PI * (radius**3)
-    return expansion_period_volume + post_expansion_period_volume
-
-
-@inject_parameters
-def sample_expansion_speeds(params: LongTermParams, num_samples: int):
-    return sqw.sample(
-        params.expansion_speed.get_distribution(),
-        n=num_samples,
-    )
+    if out is None:
+        out = np.zeros(len(end_year_samples))
+    # (pi * speed**3 / 3), shared by the expansion periods of all radii
+    expansion_factor = np.power(speed, 3)
+    expansion_factor *= PI / 3
+    time_during_expansion = np.empty(len(end_year_samples))
+    time_after_expansion = np.empty(len(end_year_samples))
+    for radius, density in zip(radii, densities):
+        time_during_expansion.fill(TIME_WHEN_STARS_BURN_OUT)
+        np.divide(radius, speed, out=time_during_expansion, where=speed > 0)
+        np.subtract(end_year_samples, time_during_expansion, out=time_after_expansion)
+        np.maximum(time_after_expansion, 0, out=time_after_expansion)
+        np.minimum(end_year_samples, time_during_expansion, out=time_during_expansion)
+
+        np.power(time_during_expansion, 4, out=time_during_expansion)
+        time_during_expansion *= expansion_factor
+        time_after_expansion *= 4 / 3 * PI * float(radius) ** 3
+        time_during_expansion += time_after_expansion
+        time_during_expansion *= density
+        out += time_during_expansion
+    return out
+
+
+# Memoized per stream, so that all life years computed in a context share the expansion speeds of its worlds
+@inject_parameters_with_memo(per_rng=True)
+def sample_expansion_speeds(params: LongTermParams, num_samples: int) -> NDArray[np.floating]:
+    return params.expansion_speed.sample(num_samples)
@@ -1,5 +1,7 @@
 import logging
 import os
+import threading
+import time
 from typing import Annotated, Literal
 
 import sentry_sdk
@@ -14,10 +16,13 @@
 from pydantic import BaseModel, Field
 from starlette.responses import RedirectResponse
 
+import ccm.adaptive as adaptive
+import ccm.config as config
 import ccm.interventions.intervention_definitions.all_interventions as interventions
-from ccm.contexts import using_parameters
+from ccm.contexts import get_parameters, recording_reads, using_parameters, using_rng
 from ccm.interventions.animal.animal_intervention_params import AnimalInterventionParams
 from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.batch import estimate_batch
 from ccm.interventions.ghd.ghd_intervention_params import GhdInterventionParams
 from ccm.interventions.ghd.ghd_interventions import GhdIntervention
 from ccm.interventions.xrisk.impact.impact_method_params import ImpactMethodParams
@@ -27,14 +32,17 @@
 from ccm.research_projects.projects.project_definitions.animal_welfare_projects import get_animal_projects
 from ccm.research_projects.projects.project_definitions.ghd_projects import get_ghd_projects
 from ccm.research_projects.projects.project_definitions.xrisk_projects import get_xrisk_projects
+from ccm.research_projects.projects.research_project import ResearchProject
+from ccm.simulation_params import SimulationParams, get_sampling_method
+from ccm.snapshot import ResultsSnapshot, build_snapshot
 from ccm.world.longterm_params import LongTermParams
 from ccm.world.moral_weight_params import MoralWeightsParams
 from ccm_api.models import (
     AttributeModel,
+    InterventionEstimateModel,
     ProjectAssessmentModel,
     ResearchProjectAttributesModel,
     ResearchProjectModel,
-    SparseSamples,
 )
 
 FRONT_END_URL = os.getenv("FRONT_END_URL", "")
@@ -77,6 +85,52 @@ def generate_unique_id(route: APIRoute):
 @app.on_event("startup")
 def startup():
     FastAPICache.init(backend=InMemoryBackend())
+    # Requests with the default parameters and no seed are served from the snapshot, if it is up to date
+    app.state.default_results = ResultsSnapshot.load(config.DEFAULT_RESULTS_SNAPSHOT)
+    if app.state.default_results is None and os.getenv("REFRESH_RESULTS_SNAPSHOT"):
+        # In the background, so that requests are computed meanwhile
+        threading.Thread(target=refresh_default_results, daemon=True).start()
+    if os.getenv("WARM_UP_CATALOGUE"):
+        # In the background, so that requests are served meanwhile
+        threading.Thread(target=warm_up_catalogue, daemon=True).start()
+
+
+def refresh_default_results() -> None:
+    # Builds the snapshot of the default results in place of the missing or stale one, estimating the catalogue in a
+    # pool of processes (see ccm.catalogue), then serves the requests with the default parameters from it
+    start = time.perf_counter()
+    build_snapshot(config.DEFAULT_RESULTS_SNAPSHOT, max_workers=None)
+    app.state.default_results = ResultsSnapshot.load(config.DEFAULT_RESULTS_SNAPSHOT)
+    logging.info(f"Built the snapshot of the default results in {time.perf_counter() - start:.2f}s")
+
+
+def warm_up_catalogue() -> None:
+    # Estimates the catalogue in this process, to fill the caches that don't depend on the seed of a request (e.g.
+    # the distribution of years to extinction for the default eras). The samples are drawn from the process-wide
+    # generator, which isn't memoized or cached per stream: requests without a seed draw from streams of their own,
+    # and those with a seed from the streams of that seed, neither of which a warm-up could fill in advance
+    unscaled_interventions = interventions.get_unscaled_interventions()
+    start = time.perf_counter()
+    with using_parameters(parameters_for_tier(Parameters(), "fast")):
+        for intervention in unscaled_interventions:
+            intervention.estimate_dalys_per_1000()
+    seconds = time.perf_counter() - start
+    logging.info(f"Warmed up with {len(unscaled_interventions)} interventions in {seconds:.2f}s")
+
+
+# Number of simulations used by each precision tier; the "default" tier uses the given parameters as-is
+SIMULATION_TIERS: dict[str, int] = {
+    "fast": 5_000,
+    "precise": 1_000_000,
+}
+SimulationTier = Literal["default", "fast", "precise"]
+
+
+def parameters_for_tier(parameters: Parameters, tier: SimulationTier) -> Parameters:
+    if tier == "default":
+        return parameters
+    simulation_params = parameters.simulation_params.model_copy(update={"simulations": SIMULATION_TIERS[tier]})
+    return parameters.model_copy(update={"simulation_params": simulation_params})
 
 
 ANIMAL_PROJECTS = get_animal_projects()
@@ -145,14 +199,43 @@ async def get_projects_by_group(
 
 
 @app.post("/projects/{project_id}/assess")
-async def assess_project_with_params(project_id: str, parameters: Parameters) -> ProjectAssessmentModel:
+async def assess_project_with_params(
+    project_id: str,
+    parameters: Parameters,
+    tier: SimulationTier = "default",
+    seed: int | None = None,
+) -> ProjectAssessmentModel:
+    parameters = parameters_for_tier(parameters, tier)
     # Get project by ID
-    with using_parameters(parameters):
+    with using_parameters(parameters), using_rng(seed):
         try:
             project = next(filter(lambda proj: proj.short_name == project_id, ALL_PROJECTS))
         except StopIteration as e:
             raise HTTPException(status_code=404, detail="Project not found") from e
-        return ProjectAssessmentModel.from_project_assessment(project.assess_project())
+        snapshot = _default_results(seed)
+        adaptive_assessment = snapshot.assessment(project, parameters) if snapshot else None
+        if adaptive_assessment is not None:
+            return ProjectAssessmentModel.from_project_assessment(
+                adaptive_assessment.result,
+                relative_error=adaptive_assessment.relative_error,
+                batches=adaptive_assessment.batches,
+            )
+        return _assess_project_adaptively(project)
+
+
+def _default_results(seed: int | None) -> ResultsSnapshot | None:
+    # The snapshot was drawn with a seed of its own, so requests for a given seed are computed
+    return getattr(app.state, "default_results", None) if seed is None else None
+
+
+def _assess_project_adaptively(project: ResearchProject) -> ProjectAssessmentModel:
+    # Draws a single batch of simulations unless the parameters set a tolerance
+    adaptive_assessment = adaptive.assess_project(project)
+    return ProjectAssessmentModel.from_project_assessment(
+        adaptive_assessment.result,
+        relative_error=adaptive_assessment.relative_error,
+        batches=adaptive_assessment.batches,
+    )
 
 
 # (Multiple arguments necessitates a model for OpenAPI codegen)
@@ -164,13 +247,14 @@ class AssessCustomProjectParams(BaseModel):
 @app.post("/custom-projects/assess")
 def assess_custom_project_with_params(
     params: AssessCustomProjectParams,
+    seed: int | None = None,
 ) -> ProjectAssessmentModel:
     # Construct ResearchProject from ResearchProjectModel
     project = params.project.to_project()
 
     # Run assessment on the ResearchProject
-    with using_parameters(params.parameters):
-        return ProjectAssessmentModel.from_project_assessment(project.assess_project())
+    with using_parameters(params.parameters), using_rng(seed):
+        return _assess_project_adaptively(project)
 
 
 @app.get("/projects/attributes")
@@ -199,6 +283,7 @@ def get_parameter_attributes() -> dict[str, AttributeModel]:
         AnimalInterventionParams,
         LongTermParams,
         ImpactMethodParams,
+        SimulationParams,
         GhdIntervention,
         AnimalIntervention,
         XRiskIntervention,
@@ -224,6 +309,24 @@ def get_interventions() -> list[interventions.SomeIntervention]:
         return interventions.get_unscaled_interventions()
 
 
+@app.get("/debug/interventions/dependencies")
+def get_intervention_dependencies(seed: int = 0) -> dict[str, list[str]]:
+    """
+    Lists the parameters that each intervention's estimate reads with the default parameters,
+    as dotted paths (e.g. "longterm_params.risk_eras"). Estimates only depend on these parameters,
+    so results can be cached by them. The reads of an estimate depend on the values it reads,
+    so other parameters may have other dependencies.
+    """
+    parameters = parameters_for_tier(Parameters(), "fast")
+    dependencies = {}
+    with using_parameters(parameters), using_rng(seed):
+        for intervention in interventions.get_unscaled_interventions():
+            with recording_reads() as reads:
+                intervention.estimate_dalys_per_1000()
+            dependencies[intervention.name] = reads.dependencies(parameters)
+    return dependencies
+
+
 class EstimateInterventionDALYsParams(BaseModel):
     intervention: interventions.SomeIntervention
     parameters: Parameters
@@ -233,10 +336,56 @@ class EstimateInterventionDALYsParams(BaseModel):
 def estimate_intervention_dalys(
     intervention_id: str,
     params: EstimateInterventionDALYsParams,
-) -> SparseSamples:
-    with using_parameters(params.parameters):
-        samples, zeros = params.intervention.estimate_dalys_per_1000()
-        return SparseSamples(samples=samples.tolist(), num_zeros=zeros)
+    tier: SimulationTier = "default",
+    seed: int | None = None,
+) -> InterventionEstimateModel:
+    parameters = parameters_for_tier(params.parameters, tier)
+    with using_parameters(parameters), using_rng(seed):
+        snapshot = _default_results(seed)
+        estimate = snapshot.estimate(params.intervention, parameters) if snapshot else None
+        if estimate is None:
+            # Draws a single batch of simulations unless the parameters set a tolerance
+            estimate = adaptive.estimate_dalys_per_1000(params.intervention)
+        return InterventionEstimateModel(
+            samples=estimate.result.data.tolist(),
+            num_zeros=estimate.result.num_zeros,
+            weights=None if estimate.result.weights is None else estimate.result.weights.tolist(),
+            sampling_method=get_sampling_method(),
+            relative_error=estimate.relative_error,
+            batches=estimate.batches,
+        )
+
+
+class EstimateInterventionsBatchParams(BaseModel):
+    interventions: list[interventions.SomeIntervention]
+    parameters: Parameters
+
+
+@app.post("/interventions/estimate-batch")
+def estimate_interventions_batch(
+    params: EstimateInterventionsBatchParams,
+    tier: SimulationTier = "default",
+    seed: int | None = None,
+) -> list[InterventionEstimateModel]:
+    """
+    Estimates the DALYs per $1000 of each intervention in the same simulated worlds, drawn once for the request.
+    Each intervention gets a single batch of simulations, whatever the tolerance of the parameters.
+    """
+    with using_parameters(parameters_for_tier(params.parameters, tier)), using_rng(seed):
+        estimates = estimate_batch(params.interventions)
+        tolerance_percentiles = get_parameters(SimulationParams).tolerance_percentiles
+        return [
+            InterventionEstimateModel(
+                samples=estimate.data.tolist(),
+                num_zeros=estimate.num_zeros,
+                weights=None if estimate.weights is None else estimate.weights.tolist(),
+                sampling_method=get_sampling_method(),
+                relative_error=adaptive.relative_standard_error(
+                    estimate.data, estimate.num_zeros, tolerance_percentiles, estimate.weights
+                ),
+            )
+            for estimate in estimates
+        ]
 
 
 @app.get("/params/default")
@@ -1,14 +1,16 @@
-from typing import TYPE_CHECKING, TypeAlias
+import math
+from typing import TYPE_CHECKING, Annotated, TypeAlias
 
-from pydantic import BaseModel, Field
-from scipy.sparse import coo_array
+from pydantic import AfterValidator, BaseModel, Field
 
 from ccm.interventions.intervention_definitions.all_interventions import ALL_INTERVENTIONS, SomeIntervention
 from ccm.research_projects.funding_pools.specified_intervention_fp import SpecifiedInterventionFundingPool
 from ccm.research_projects.projects.funding_profile import FundingProfile
 from ccm.research_projects.projects.project_assessment import ProjectAssessment
 from ccm.research_projects.projects.research_project import ResearchProject
+from ccm.simulation_params import SamplingMethod, get_sampling_method
 from ccm.utility.models import DistributionSpec, SomeDistribution
+from ccm.utility.sparse_samples import SparseSampleArray
 
 if TYPE_CHECKING:
     from ccm.research_projects.funding_pools.funding_pool import FundingPool
@@ -143,16 +145,35 @@ def to_project(self) -> ResearchProject:
         )
 
 
+# JSON has no infinity, so an error that couldn't be bounded (e.g. of an estimate of zero) is reported as null
+RelativeError: TypeAlias = Annotated[
+    float | None, AfterValidator(lambda error: error if error is None or math.isfinite(error) else None)
+]
+
+
 class SparseSamples(BaseModel):
     samples: list[float]
     num_zeros: int
+    # The number of simulations that each sample stands for, if they were drawn by stratified sampling
+    weights: list[float] | None = None
 
     @classmethod
-    def from_coo_array(cls, coo_array: coo_array):
-        stored_samples = coo_array.data.tolist()
-        size_with_zeros = coo_array.shape[0] * coo_array.shape[1]
-        zeros = size_with_zeros - coo_array.nnz
-        return SparseSamples(samples=stored_samples, num_zeros=zeros)
+    def from_sparse_array(cls, samples: SparseSampleArray):
+        # The positions of the samples aren't sent, as clients only summarize them
+        return SparseSamples(
+            samples=samples.data.tolist(),
+            num_zeros=samples.num_zeros,
+            weights=None if samples.weights is None else samples.weights.tolist(),
+        )
+
+
+class InterventionEstimateModel(SparseSamples):
+    # Reported so that clients know how the samples were drawn
+    sampling_method: SamplingMethod
+    # Largest standard error of the mean and the tolerance percentiles, relative to their estimates
+    relative_error: RelativeError = None
+    # Number of batches of simulations that were drawn to meet the tolerance
+    batches: int = 1
 
 
 class ProjectAssessmentModel(BaseModel):
@@ -162,14 +183,26 @@ class ProjectAssessmentModel(BaseModel):
     gross_impact: SparseSamples
     net_impact: SparseSamples
     net_dalys_per_staff_year: SparseSamples
+    sampling_method: SamplingMethod
+    relative_error: RelativeError = None
+    batches: int = 1
 
     @classmethod
-    def from_project_assessment(cls, project_asmnt: ProjectAssessment):
+    def from_project_assessment(
+        cls,
+        project_asmnt: ProjectAssessment,
+        relative_error: float | None = None,
+        batches: int = 1,
+    ):
         return cls(
             id=project_asmnt.short_name,
             cost=project_asmnt.cost.tolist(),
             years_credit=project_asmnt.years_credit.tolist(),
-            gross_impact=SparseSamples.from_coo_array(project_asmnt.gross_impact_DALYs),
-            net_impact=SparseSamples.from_coo_array(project_asmnt.net_impact_DALYs),
-            net_dalys_per_staff_year=SparseSamples.from_coo_array(project_asmnt.net_DALYs_per_staff_year),
+            gross_impact=SparseSamples.from_sparse_array(project_asmnt.gross_impact_DALYs),
+            net_impact=SparseSamples.from_sparse_array(project_asmnt.net_impact_DALYs),
+            net_dalys_per_staff_year=SparseSamples.from_sparse_array(project_asmnt.net_DALYs_per_staff_year),
+            # The assessment is converted in the context it was made in
+            sampling_method=get_sampling_method(),
+            relative_error=relative_error,
+            batches=batches,
         )
@@ -3,7 +3,7 @@
 
 import pytest
 
-from ccm.contexts import get_parameters, using_parameters
+from ccm.contexts import get_parameters, using_parameters, using_rng
 from ccm.parameters import Parameters
 
 
@@ -13,6 +13,7 @@ def model_parameters() -> Generator[Parameters, Any, None]:
     Provides a default set of parameters for all tests in this module.
 
     Doesn't need to be used explicitly in tests, but can be if access to the parameters is needed.
+    Samples are drawn from a seeded generator, so that each module's results are reproducible.
     """
-    with using_parameters(Parameters()):
+    with using_parameters(Parameters()), using_rng(0):
         yield get_parameters()
@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+import pytest
+from scipy import stats
+
+import ccm.adaptive as adaptive
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SimulationParams
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+from ccm_api.models import InterventionEstimateModel, ProjectAssessmentModel
+
+BATCH_SIZE = 2_000
+
+
+def adaptive_params(tolerance: float | None, max_simulations: int = 20 * BATCH_SIZE) -> Parameters:
+    return Parameters(
+        simulation_params=SimulationParams(
+            simulations=BATCH_SIZE,
+            tolerance=tolerance,
+            max_simulations=max_simulations,
+        )
+    )
+
+
+def test_relative_standard_error_of_normal_samples():
+    samples = np.random.default_rng(42).normal(10, 1, size=100_000)
+    # The standard error of the 5th percentile is the largest relative to its estimate
+    q = 0.05
+    percentile = stats.norm.ppf(q, 10, 1)
+    percentile_error = math.sqrt(q * (1 - q) / len(samples)) / stats.norm.pdf(percentile, 10, 1)
+    relative_error = adaptive.relative_standard_error(samples, 0, (5, 50, 95))
+    assert relative_error == pytest.approx(percentile_error / percentile, rel=0.2)
+
+
+def test_relative_standard_error_with_zeros():
+    samples = np.random.default_rng(42).lognormal(0, 1, size=10_000)
+    zeros = 30_000
+    padded = np.concatenate([samples, np.zeros(zeros)])
+    expected = adaptive.relative_standard_error(padded, 0, (80, 95))
+    assert adaptive.relative_standard_error(samples, zeros, (80, 95)) == pytest.approx(expected)
+    # Percentiles that fall in the zeros have no error
+    assert adaptive.relative_standard_error(samples, zeros, (10, 50)) == adaptive.relative_standard_error(
+        samples, zeros, ()
+    )
+
+
+def test_relative_standard_error_with_negative_samples():
+    samples = np.random.default_rng(42).normal(1, 1, size=10_000)
+    padded = np.concatenate([samples, np.zeros(5_000)])
+    assert adaptive.relative_standard_error(samples, 5_000, (5, 50, 95)) == pytest.approx(
+        adaptive.relative_standard_error(padded, 0, (5, 50, 95))
+    )
+
+
+def test_relative_standard_error_of_weighted_samples():
+    samples = np.random.default_rng(42).lognormal(0, 1, size=10_000)
+    unweighted = adaptive.relative_standard_error(samples, 30_000, (80, 95))
+    assert adaptive.relative_standard_error(samples, 30_000, (80, 95), np.ones(10_000)) == pytest.approx(
+        unweighted, rel=0.1
+    )
+    # Samples that stand for more simulations each are as precise as fewer samples
+    half = adaptive.relative_standard_error(samples[:5_000], 15_000, (80, 95))
+    assert adaptive.relative_standard_error(samples[:5_000], 30_000, (80, 95), np.full(5_000, 2.0)) > unweighted
+    assert adaptive.relative_standard_error(samples[:5_000], 30_000, (80, 95), np.full(5_000, 2.0)) == pytest.approx(
+        half, rel=0.2
+    )
+
+
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+    ],
+)
+def test_single_batch_without_tolerance(intervention):
+    with using_parameters(adaptive_params(tolerance=None)):
+        with using_rng(42):
+            estimate = intervention.estimate_dalys_per_1000()
+            expected_samples, expected_zeros = estimate.data, estimate.num_zeros
+        with using_rng(42):
+            estimate = adaptive.estimate_dalys_per_1000(intervention)
+    samples, zeros = estimate.result.data, estimate.result.num_zeros
+    assert estimate.batches == 1
+    np.testing.assert_array_equal(samples, expected_samples)
+    assert zeros == expected_zeros
+
+
+def test_batches_until_tolerance_is_met():
+    intervention = AnimalIntervention(animal=Animal.CHICKEN)
+    with using_parameters(adaptive_params(tolerance=0.02, max_simulations=40 * BATCH_SIZE)), using_rng(42):
+        estimate = adaptive.estimate_dalys_per_1000(intervention)
+    samples, zeros = estimate.result.data, estimate.result.num_zeros
+    # The seeded run meets the tolerance after 33 batches (with a margin for platform differences in sampling)
+    assert 31 <= estimate.batches <= 35
+    assert estimate.relative_error <= 0.02
+    assert len(samples) + zeros == estimate.batches * BATCH_SIZE
+    # Each batch is drawn from a separate stream
+    assert not np.array_equal(samples[:BATCH_SIZE], samples[BATCH_SIZE : 2 * BATCH_SIZE])
+
+
+def test_batches_are_capped():
+    intervention = XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT)
+    with using_parameters(adaptive_params(tolerance=1e-6, max_simulations=5 * BATCH_SIZE)):
+        estimate = adaptive.estimate_dalys_per_1000(intervention)
+    assert estimate.batches == 5
+    assert estimate.relative_error > 1e-6
+
+
+def test_adaptive_estimate_is_deterministic_given_seed():
+    intervention = GhdIntervention(name="test")
+    with using_parameters(adaptive_params(tolerance=0.01)):
+        with using_rng(42):
+            first = adaptive.estimate_dalys_per_1000(intervention)
+        with using_rng(42):
+            second = adaptive.estimate_dalys_per_1000(intervention)
+    np.testing.assert_array_equal(first.result.data, second.result.data)
+    assert first.batches == second.batches
+
+
+def test_adaptive_assessment():
+    project = get_all_projects(equal_money_for_causes=False)[0]
+    with using_parameters(adaptive_params(tolerance=1e-6, max_simulations=3 * BATCH_SIZE)):
+        adaptive_assessment = adaptive.assess_project(project)
+        model = ProjectAssessmentModel.from_project_assessment(
+            adaptive_assessment.result,
+            relative_error=adaptive_assessment.relative_error,
+            batches=adaptive_assessment.batches,
+        )
+    assessment = adaptive_assessment.result
+    assert adaptive_assessment.batches == 3
+    assert len(assessment.cost) == 3 * BATCH_SIZE
+    assert assessment.net_impact_DALYs.size == assessment.gross_impact_DALYs.size
+    for bottom_line in assessment.bottom_lines.values():
+        assert bottom_line.roi.size == assessment.net_impact_DALYs.size
+        assert np.isfinite(bottom_line.average_roi)
+    assert model.batches == 3
+    assert model.relative_error == adaptive_assessment.relative_error
+
+
+def test_unbounded_error_is_serialized_as_null():
+    model = InterventionEstimateModel(
+        samples=[], num_zeros=10, sampling_method="monte carlo", relative_error=math.inf, batches=1
+    )
+    assert model.relative_error is None
+    assert '"relative_error":null' in model.model_dump_json()
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import ccm.config as config
+import ccm.interventions.intervention_definitions.all_interventions as all_interventions
+import ccm.snapshot as snapshot
+from ccm.contexts import sharing_world_draws, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.batch import estimate_batch
+from ccm.interventions.estimate_cache import ESTIMATE_CACHE
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.utility.moral_weight_adapter import moral_weight_adjustor
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+from ccm.world.simulation import get_world_simulation
+from ccm.world.space import sample_expansion_speeds
+from ccm_api.main import (
+    app,
+    EstimateInterventionsBatchParams,
+    estimate_interventions_batch,
+    parameters_for_tier,
+    refresh_default_results,
+    warm_up_catalogue,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_estimate_cache():
+    ESTIMATE_CACHE.cache_clear()
+
+
+def _interventions():
+    return [
+        AnimalIntervention(name="chickens", animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+        GhdIntervention(name="test"),
+        AnimalIntervention(name="more chickens", animal=Animal.CHICKEN),
+    ]
+
+
+def test_world_draws_are_shared_between_generators():
+    with sharing_world_draws(0):
+        with using_rng(1):
+            speeds = sample_expansion_speeds(100)
+            chicken_weights = moral_weight_adjustor(Animal.CHICKEN)
+            shrimp_weights = moral_weight_adjustor(Animal.SHRIMP)
+        with using_rng(2):
+            assert sample_expansion_speeds(100) is speeds
+            assert moral_weight_adjustor(Animal.CHICKEN) is chicken_weights
+    with sharing_world_draws(1):
+        assert not np.array_equal(moral_weight_adjustor(Animal.CHICKEN), chicken_weights)
+    # Each function and arguments has a stream of its own
+    assert not np.array_equal(chicken_weights, shrimp_weights)
+
+
+def test_world_draws_are_not_shared_outside_the_context():
+    with using_rng(1):
+        speeds = sample_expansion_speeds(100)
+    with using_rng(2):
+        assert not np.array_equal(sample_expansion_speeds(100), speeds)
+
+
+def test_estimate_batch_keeps_the_order_of_the_interventions():
+    interventions = _interventions()
+    with using_rng(7):
+        estimates = estimate_batch(interventions)
+    assert len(estimates) == len(interventions)
+    for intervention, estimate in zip(interventions, estimates):
+        with using_rng(7), sharing_world_draws():
+            # Cached, and the same as if estimated alone in the same world
+            assert intervention.estimate_dalys_per_1000().data is estimate.data
+    assert ESTIMATE_CACHE.cache_info().misses == len(interventions)
+
+
+def test_estimate_batch_is_deterministic():
+    with using_rng(7):
+        estimates = estimate_batch(_interventions())
+    ESTIMATE_CACHE.cache_clear()
+    with using_rng(7):
+        same_estimates = estimate_batch(list(reversed(_interventions())))[::-1]
+    for estimate, same_estimate in zip(estimates, same_estimates):
+        np.testing.assert_array_equal(estimate.data, same_estimate.data)
+
+
+def test_batch_estimates_are_cached_apart_from_single_estimates():
+    intervention = AnimalIntervention(animal=Animal.CHICKEN)
+    with using_rng(7):
+        (batch_estimate,) = estimate_batch([intervention])
+        single_estimate = intervention.estimate_dalys_per_1000()
+    assert ESTIMATE_CACHE.cache_info().misses == 2
+    assert not np.array_equal(batch_estimate.data, single_estimate.data)
+
+
+@pytest.mark.parametrize("tiers", [("default", "fast"), ("fast", "default")])
+def test_estimate_batch_with_the_same_seed_at_different_tiers(tiers):
+    params = EstimateInterventionsBatchParams(interventions=_interventions(), parameters=Parameters())
+    for tier in tiers:
+        simulations = parameters_for_tier(Parameters(), tier).simulation_params.simulations
+        for estimate in estimate_interventions_batch(params, tier=tier, seed=1):
+            assert len(estimate.samples) == simulations
+
+
+def test_warm_up_fills_no_caches_of_streams(monkeypatch):
+    monkeypatch.setattr(all_interventions, "get_unscaled_interventions", _interventions)
+    world_memo_entries = get_world_simulation.cache_info().entries
+    # In a thread, as on startup, which doesn't inherit the seeded generator of the tests
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(warm_up_catalogue).result()
+    assert ESTIMATE_CACHE.cache_info().entries == 0
+    assert get_world_simulation.cache_info().entries == world_memo_entries
+
+
+def test_missing_snapshots_are_built_and_served(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "DEFAULT_RESULTS_SNAPSHOT", tmp_path / "default_results.npz")
+    monkeypatch.setattr(snapshot, "get_unscaled_interventions", lambda: _interventions()[:1])
+    monkeypatch.setattr(snapshot, "get_all_projects", lambda _: [])
+    monkeypatch.setattr(app.state, "default_results", None, raising=False)
+    refresh_default_results()
+    assert app.state.default_results.estimate(_interventions()[0], Parameters()) is not None
@@ -0,0 +1,43 @@
+import pytest
+
+from ccm.catalogue import format_table, run_catalogue
+from ccm.contexts import updated_parameters, using_rng
+from ccm.interventions.intervention_definitions.all_interventions import get_unscaled_interventions
+from ccm.simulation_params import SimulationParams
+
+
+@pytest.fixture(scope="module")
+def interventions():
+    # A few of each kind of intervention
+    by_type = {}
+    for intervention in get_unscaled_interventions():
+        by_type.setdefault(intervention.type, []).append(intervention)
+    return [intervention for of_type in by_type.values() for intervention in of_type[:2]]
+
+
+def _run(interventions, max_workers):
+    with updated_parameters({"simulations": 2000}, SimulationParams), using_rng(3):
+        return run_catalogue(interventions, max_workers=max_workers)
+
+
+def test_results_do_not_depend_on_the_workers(interventions):
+    in_process = _run(interventions, max_workers=0)
+    in_pool = _run(interventions, max_workers=2)
+    assert [result.name for result in in_pool] == [intervention.name for intervention in interventions]
+    for result, pooled_result in zip(in_process, in_pool):
+        assert pooled_result.summary.count == result.summary.count
+        assert pooled_result.summary.mean == pytest.approx(result.summary.mean)
+        assert pooled_result.seconds > 0
+
+
+def test_interventions_get_streams_of_their_own(interventions):
+    same_intervention_twice = [interventions[0], interventions[0]]
+    first, second = _run(same_intervention_twice, max_workers=0)
+    assert first.summary.mean != second.summary.mean
+
+
+def test_format_table(interventions):
+    results = _run(interventions[:2], max_workers=0)
+    lines = format_table(results).splitlines()
+    assert lines[0].split() == ["name", "mean", "p5", "p50", "p95", "seconds"]
+    assert len(lines) == len(results) + 2
@@ -1,7 +1,30 @@
+import numpy as np
 import pytest
 from squigglepy import DiscreteDistribution
 
-from ccm.utility.models import CategoricalDistributionSpec
+import ccm.utility.squigglepy_wrapper as sqw
+from ccm.contexts import using_rng
+from ccm.utility.models import (
+    BetaDistributionSpec,
+    CategoricalDistributionSpec,
+    ConfidenceDistributionSpec,
+    ConstantDistributionSpec,
+    GammaDistributionSpec,
+    UniformDistributionSpec,
+)
+
+SPECS = [
+    ConfidenceDistributionSpec.norm(1, 10),
+    ConfidenceDistributionSpec.norm(-5, 5, credibility=50, lclip=-1, rclip=2),
+    ConfidenceDistributionSpec.lognorm(1, 100, credibility=80, rclip=50),
+    ConfidenceDistributionSpec(type="confidence", distribution=None, range=(-1, 1)),
+    ConfidenceDistributionSpec(type="confidence", distribution=None, range=(1, 2)),
+    BetaDistributionSpec.create(2, 5),
+    GammaDistributionSpec(type="gamma", distribution="gamma", shape=2, scale=3, clip=(1, 10)),
+    UniformDistributionSpec(type="uniform", distribution="uniform", range=(-3, 7)),
+    ConstantDistributionSpec(type="constant", distribution="constant", value=4.2),
+    CategoricalDistributionSpec(type="categorical", distribution="categorical", items=[(0.1, 1), (0.2, 2), (0.7, 3)]),
+]
 
 
 def test_categorical_dist():
@@ -29,3 +52,38 @@ def test_categorical_dist():
             ],
         )
     assert CategoricalDistributionSpec.from_distribution(x_dist).items == x_spec.items
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_compiled_sampler_matches_squigglepy(spec):
+    # Given the same generator, the compiled sampler should draw exactly what squigglepy would
+    with using_rng(42):
+        compiled_samples = spec.sample(1000)
+    with using_rng(42):
+        squigglepy_samples = sqw.sample(spec.get_distribution(), n=1000)
+    np.testing.assert_array_equal(compiled_samples, squigglepy_samples)
+
+
+@pytest.mark.parametrize("spec", SPECS)
+def test_compiled_sampler_returns_array(spec):
+    samples = spec.sample(1)
+    assert isinstance(samples, np.ndarray)
+    assert samples.shape == (1,)
+
+
+def test_compiled_sampler_is_cached():
+    spec = ConfidenceDistributionSpec.lognorm(1, 10)
+    assert spec.get_sampler() is spec.get_sampler()
+    # Equal specs don't share samplers, but sample the same way
+    other_spec = ConfidenceDistributionSpec.lognorm(1, 10)
+    assert other_spec == spec
+    with using_rng(1):
+        samples = spec.sample(10)
+    with using_rng(1):
+        np.testing.assert_array_equal(other_spec.sample(10), samples)
+
+
+def test_compiled_sampler_respects_clip():
+    samples = ConfidenceDistributionSpec.norm(0, 10, lclip=2, rclip=8).sample(10_000)
+    assert samples.min() == 2
+    assert samples.max() == 8
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from pydantic import TypeAdapter
+
+from ccm.contexts import recording_reads, updated_parameters, using_parameters, using_rng
+from ccm.interventions.estimate_cache import ESTIMATE_CACHE, EstimateCache
+from ccm.interventions.ghd.ghd_intervention_params import GhdInterventionParams
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.intervention import ResultIntervention
+from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention
+from ccm.interventions.xrisk.impact.impact_method_params import ImpactMethodParams
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.models import ConfidenceDistributionSpec
+
+
+@pytest.fixture(autouse=True)
+def _clear_estimate_cache():
+    ESTIMATE_CACHE.cache_clear()
+
+
+def _result_intervention(name: str = "test") -> ResultIntervention:
+    return ResultIntervention(
+        type="result", name=name, area="ghd", result_distribution=ConfidenceDistributionSpec.norm(1, 10)
+    )
+
+
+def test_equal_interventions_and_parameters_share_estimates():
+    intervention = GhdIntervention(name="test")
+    # As sent in separate API requests
+    same_intervention = TypeAdapter(SomeIntervention).validate_json(intervention.model_dump_json())
+    with using_parameters(Parameters()), using_rng(42):
+        estimate = intervention.estimate_dalys_per_1000()
+        samples, zeros = estimate.data, estimate.num_zeros
+    with using_parameters(Parameters.model_validate_json(Parameters().model_dump_json())), using_rng(42):
+        estimate = same_intervention.estimate_dalys_per_1000()
+        same_samples, same_zeros = estimate.data, estimate.num_zeros
+    assert same_samples is samples
+    assert same_zeros == zeros
+    assert ESTIMATE_CACHE.cache_info().hits == 1
+    assert ESTIMATE_CACHE.cache_info().misses == 1
+    assert not samples.flags.writeable
+
+
+def test_estimates_are_keyed_by_seed_and_number_of_simulations():
+    intervention = GhdIntervention(name="test")
+    with using_rng(1):
+        first = intervention.estimate_dalys_per_1000().data
+    with using_rng(2):
+        other_seed = intervention.estimate_dalys_per_1000().data
+    with updated_parameters({"simulations": 1234}, SimulationParams), using_rng(1):
+        other_simulations = intervention.estimate_dalys_per_1000().data
+    assert not np.array_equal(first, other_seed)
+    assert len(other_simulations) == 1234
+    assert ESTIMATE_CACHE.cache_info().misses == 3
+
+
+def test_estimates_are_keyed_by_the_parameters_they_read():
+    intervention = GhdIntervention(name="test")
+    with using_rng(1):
+        samples = intervention.estimate_dalys_per_1000().data
+        # Parameters that GHD estimates don't read
+        with updated_parameters({"impact_method": "time of perils"}, ImpactMethodParams):
+            assert intervention.estimate_dalys_per_1000().data is samples
+        with updated_parameters({"adjust_for_xrisk": True}, GhdInterventionParams):
+            adjusted = intervention.estimate_dalys_per_1000().data
+    assert not np.array_equal(samples, adjusted)
+    assert ESTIMATE_CACHE.cache_info().hits == 1
+
+
+def test_cached_estimates_replay_their_reads():
+    intervention = GhdIntervention(name="test")
+    params = Parameters()
+    with using_parameters(params), using_rng(1):
+        with recording_reads() as computed_reads:
+            intervention.estimate_dalys_per_1000()
+        with recording_reads() as cached_reads:
+            intervention.estimate_dalys_per_1000()
+    assert ESTIMATE_CACHE.cache_info().hits == 1
+    assert cached_reads.dependencies(params) == computed_reads.dependencies(params)
+    assert "ghd_intervention_params.adjust_for_xrisk" in cached_reads.dependencies(params)
+
+
+def test_estimates_do_not_depend_on_what_was_drawn_before():
+    first, second = _result_intervention("first"), _result_intervention("second")
+    with using_rng(1):
+        first_samples = first.estimate_dalys_per_1000().data
+        second_samples = second.estimate_dalys_per_1000().data
+    cache = EstimateCache()
+    with using_rng(1):
+        assert np.array_equal(cache.get(second, "dalys_per_1000", second._estimate_dalys_per_1000).data, second_samples)
+        assert np.array_equal(cache.get(first, "dalys_per_1000", first._estimate_dalys_per_1000).data, first_samples)
+
+
+def test_estimate_cache_is_bounded_by_memory():
+    intervention = _result_intervention()
+    with updated_parameters({"simulations": 1000}, SimulationParams):
+        # Room for the samples of two estimates, and their numbers of zeros
+        cache = EstimateCache(max_bytes=2 * 1000 * np.dtype(np.float64).itemsize + 100)
+        for seed in range(3):
+            with using_rng(seed):
+                cache.get(intervention, "dalys_per_1000", intervention._estimate_dalys_per_1000)
+        info = cache.cache_info()
+        assert info.entries == 2
+        assert info.evictions == 1
+        with using_rng(0):
+            cache.get(intervention, "dalys_per_1000", intervention._estimate_dalys_per_1000)
+        assert cache.cache_info().misses == 4
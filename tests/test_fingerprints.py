@@ -0,0 +1,101 @@
+import gc
+
+import pytest
+import squigglepy as sq
+from pydantic import TypeAdapter
+
+import ccm.utility.fingerprints as fingerprints
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.intervention_definitions.all_interventions import SomeIntervention, get_all_interventions
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.models import CategoricalDistributionSpec, ConfidenceDistributionSpec
+from ccm.world.animals import Animal
+from ccm.world.eras import Era
+from ccm.world.longterm_params import DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK
+from ccm.world.risk_types import RiskTypeAI
+
+
+def test_equal_parameters_share_fingerprint():
+    params = Parameters(simulation_params=SimulationParams(simulations=1234))
+    # As parameters arrive in API requests
+    same_params = Parameters.model_validate_json(
+        Parameters(simulation_params=SimulationParams(simulations=1234)).model_dump_json()
+    )
+    assert params is not same_params
+    assert params.simulation_params.fingerprint() == same_params.simulation_params.fingerprint()
+    assert params.ghd_intervention_params.fingerprint() == same_params.ghd_intervention_params.fingerprint()
+
+
+def test_different_parameters_have_different_fingerprints():
+    params = Parameters()
+    assert params.fingerprint() != Parameters(simulation_params=SimulationParams(simulations=1234)).fingerprint()
+    assert params.fingerprint() != params.simulation_params.fingerprint()
+
+
+def test_fingerprint_of_specs():
+    spec = ConfidenceDistributionSpec.norm(1, 10)
+    assert spec.fingerprint() == ConfidenceDistributionSpec.norm(1, 10).fingerprint()
+    assert spec.fingerprint() != ConfidenceDistributionSpec.norm(1, 11).fingerprint()
+    assert spec.fingerprint() != ConfidenceDistributionSpec.lognorm(1, 10).fingerprint()
+    # Specs that can't be hashed can still be fingerprinted
+    items = [(0.1, 1), (0.9, 2)]
+    categorical = CategoricalDistributionSpec(type="categorical", distribution="categorical", items=items)
+    assert categorical.fingerprint() == categorical.model_copy(deep=True).fingerprint()
+
+
+def test_fingerprint_of_eras():
+    era = Era(
+        length=5, annual_extinction_risk=0.01, proportional_risks_by_type=DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK
+    )
+    same_era = Era(
+        length=5, annual_extinction_risk=0.01, proportional_risks_by_type=DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK
+    )
+    longer_era = Era(
+        length=6, annual_extinction_risk=0.01, proportional_risks_by_type=DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK
+    )
+    assert era.fingerprint() == same_era.fingerprint()
+    assert era.fingerprint() != longer_era.fingerprint()
+
+
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+    ],
+)
+def test_equal_interventions_share_fingerprint(intervention):
+    same_intervention = TypeAdapter(SomeIntervention).validate_json(intervention.model_dump_json())
+    assert same_intervention is not intervention
+    assert same_intervention.fingerprint() == intervention.fingerprint()
+
+
+def test_interventions_have_distinct_fingerprints():
+    interventions = get_all_interventions()
+    assert len({intervention.fingerprint() for intervention in interventions}) == len(interventions)
+
+
+def test_scale_distributions_are_fingerprinted_by_their_exact_parameters():
+    scaled, same_scaled, closely_scaled = (
+        GhdIntervention(name="scaled", _scale_dist=1 - sq.lognorm(0.05, y, lclip=0, rclip=1))
+        for y in (0.25, 0.25, 0.2501)
+    )
+    assert closely_scaled._scale_dist is not None
+    # Squigglepy describes both distributions alike, as it rounds their parameters
+    assert str(scaled._scale_dist) == str(closely_scaled._scale_dist)
+    assert scaled.fingerprint() == same_scaled.fingerprint()
+    assert scaled.fingerprint() != closely_scaled.fingerprint()
+
+
+def test_fingerprints_are_memoized_and_released():
+    params = Parameters(simulation_params=SimulationParams(simulations=4321))
+    fingerprint = params.fingerprint()
+    assert fingerprints._FINGERPRINTS[id(params)] == fingerprint
+    params_id = id(params)
+    del params
+    gc.collect()
+    assert params_id not in fingerprints._FINGERPRINTS
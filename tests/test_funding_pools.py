@@ -16,7 +16,8 @@ def test_funding_pool_sample_shuffle_and_caching() -> None:
     intervention = interventions.construct_cause_benchmark_intervention("GHD", "")
     funding_pool = SpecifiedInterventionFundingPool(intervention, "Test Funding Pool")
 
-    original_samples, original_zeros = intervention.estimate_dalys_per_1000()
+    estimate = intervention.estimate_dalys_per_1000()
+    original_samples = estimate.data
     funding_pool_samples_1 = funding_pool.convert_dollars_to_dalys(np.array([1000] * SIMULATIONS))
     funding_pool_samples_2 = funding_pool.convert_dollars_to_dalys(np.array([1000] * SIMULATIONS))
 
@@ -26,4 +27,4 @@ def test_funding_pool_sample_shuffle_and_caching() -> None:
 
     # Check that funding_pool samples have been cached
     assert np.array_equal(funding_pool_samples_1.data, funding_pool_samples_2.data)
-    assert funding_pool_samples_1.shape == funding_pool_samples_2.shape
+    assert funding_pool_samples_1.size == funding_pool_samples_2.size
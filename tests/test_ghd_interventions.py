@@ -1,7 +1,8 @@
 import numpy as np
 import squigglepy as sq
 
-from ccm.contexts import using_parameters
+from ccm.contexts import recording_reads, using_parameters
+from ccm.interventions.animal.animal_intervention_params import AnimalInterventionParams
 from ccm.interventions.ghd.ghd_intervention_params import GhdInterventionParams
 from ccm.interventions.ghd.ghd_interventions import GhdIntervention
 from ccm.parameters import Parameters
@@ -111,3 +112,17 @@ def test_get_p_survival():
     assert np.mean(p_survival_short_wait) > np.mean(
         p_survival_long_wait
     ), "P(survival) with a short wait should be higher on average than P(survival) with a long wait"
+
+
+def test_ghd_dependencies():
+    params = Parameters(ghd_intervention_params=GhdInterventionParams(adjust_for_xrisk=True))
+    with using_parameters(params), recording_reads() as reads:
+        GhdIntervention(name="test").estimate_dalys_per_1000()
+    dependencies = reads.dependencies(params)
+    assert "ghd_intervention_params.adjust_for_xrisk" in dependencies
+    assert "longterm_params.risk_eras" in dependencies
+    assert not any(dependency.startswith("animal_intervention_params") for dependency in dependencies)
+    # Results only change with the parameters read
+    other_moral_weights = params.model_copy(update={"animal_intervention_params": AnimalInterventionParams()})
+    assert reads.fingerprint(params) == reads.fingerprint(other_moral_weights)
+    assert reads.fingerprint(params) != reads.fingerprint(Parameters())
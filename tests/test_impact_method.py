@@ -426,7 +426,7 @@ def test_sample_life_years_changed_catastrophe_produces_expected_results():
             RiskTypeAI.MISALIGNMENT,
             smidge_off,
             np.array(SIMULATIONS * [30]),
-        )
+        ).todense()
     non_zero_differences = life_years_samples[life_years_samples != 0]
     # Number where first xrisk is in range, where the absolute change is enough to make a difference
     expected_number = (1 - ((0.9) ** 30)) * (0.03) * SIMULATIONS
@@ -436,6 +436,23 @@ def test_sample_life_years_changed_catastrophe_produces_expected_results():
     assert np.mean(life_years_samples[life_years_samples > 0]) > 100 * M
 
 
+def test_sample_life_years_changed_catastrophe_only_stores_catastrophes():
+    proportion_changed = np.where(np.arange(SIMULATIONS) % 2 == 0, 0.5, -0.5)
+    with using_parameters(Parameters(longterm_params=LongTermParams())):
+        life_years_samples = BasicImpactMethod("", "")._sample_life_years_changed_catastrophe(
+            RiskTypeGLT.NUKES,
+            proportion_changed,
+            np.array(SIMULATIONS * [100]),
+        )
+    assert life_years_samples.size == SIMULATIONS
+    assert 0 < life_years_samples.nnz < SIMULATIONS / 2
+    assert np.all(life_years_samples.data != 0)
+    # Catastrophes are averted where the risk is reduced, and caused where it is increased
+    np.testing.assert_array_equal(
+        np.sign(life_years_samples.data), np.sign(proportion_changed[life_years_samples.positions])
+    )
+
+
 @pytest.mark.parametrize(
     argnames=("risk_type", "world_pop", "expected_avg_min", "expected_avg_max"),
     argvalues=[
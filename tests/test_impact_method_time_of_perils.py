@@ -17,7 +17,7 @@
 
 def test_time_of_perils_delivers_plausible_values(monkeypatch) -> None:
     monkeypatch.setattr(space, "sample_expansion_speeds", lambda n: np.ones(n) * 0.003)
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
     half_off = np.ones(SIMULATIONS) * 0.5
     nothing = np.zeros(SIMULATIONS)
 
@@ -35,7 +35,7 @@ def test_time_of_perils_delivers_plausible_values(monkeypatch) -> None:
 
 def test_time_of_perils_delivers_changes_based_on_intervention_length(monkeypatch):
     monkeypatch.setattr(space, "sample_expansion_speeds", lambda n: np.ones(n) * 0.003)
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
     half_off = np.ones(SIMULATIONS) * 0.5
     nothing = np.zeros(SIMULATIONS)
     model = TimeOfPerils()
@@ -62,7 +62,7 @@ def test_time_of_perils_delivers_changes_based_on_intervention_length(monkeypatc
 
 def test_time_of_perils_delivers_changes_based_on_risk_amount(monkeypatch) -> None:
     monkeypatch.setattr(space, "sample_expansion_speeds", lambda n: np.ones(n) * 0.003)
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
     half_off = np.ones(SIMULATIONS) * 0.5
     tenth_off = np.ones(SIMULATIONS) * 0.1
     nothing = np.zeros(SIMULATIONS)
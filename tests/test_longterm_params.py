@@ -80,12 +80,21 @@ def test_impact_given_risk_reduction_is_sensitive_to_annual_risks(impact_method,
         )
 
     if risk_multiplier > 1:
-        assert np.mean(base_impact_modified_risk) > np.mean(
+        # Extinction is more likely while the intervention is effective, but averting it gains fewer years,
+        # as extinction comes sooner afterwards too (see test_higher_risks_bring_extinction_sooner). So the impact
+        # is more likely, but smaller in the worlds in which it is had.
+        assert np.count_nonzero(base_impact_modified_risk) > np.count_nonzero(
             base_impact_default_risk
-        ), "Under increased risks, an x-risk mitigation intervention should have a bigger impact, not smaller!"
-        assert np.mean(impact_given_risk_reduction_modified_risk) > np.mean(
+        ), "Under increased risks, an x-risk mitigation intervention should be more likely to have an impact!"
+        assert np.count_nonzero(impact_given_risk_reduction_modified_risk) > np.count_nonzero(
             impact_given_risk_reduction_default_risk,
-        ), "Under increased risks, the same proportional x-risk mitigation should have a more impact, not less!"
+        ), "Under increased risks, the same proportional x-risk mitigation should be more likely to have an impact!"
+        assert _mean_of_impacts(base_impact_modified_risk) < _mean_of_impacts(
+            base_impact_default_risk
+        ), "Under increased risks, averting extinction should gain fewer years, as extinction comes sooner after!"
+        assert _mean_of_impacts(impact_given_risk_reduction_modified_risk) < _mean_of_impacts(
+            impact_given_risk_reduction_default_risk
+        ), "Under increased risks, averting extinction should gain fewer years, as extinction comes sooner after!"
 
     if risk_multiplier < 1:
         assert np.mean(base_impact_modified_risk) < np.mean(
@@ -128,10 +137,8 @@ def test_effectiveness_is_sensitive_to_annual_risks(risk_type, impact_method):
             effect_on_catastrophic_risk=effect_on_catastrophic_risk,
             persistence=persistence,
         )
-        (
-            healthy_years_saved_low_risk,
-            explicit_zeros_low_risk,
-        ) = intervention_under_low_risk.glt_dalys_per_1000_estimator()
+        estimate = intervention_under_low_risk.glt_dalys_per_1000_estimator()
+        healthy_years_saved_low_risk, explicit_zeros_low_risk = estimate.data, estimate.num_zeros
         avg_years_saved_low_risk = np.sum(healthy_years_saved_low_risk) / (
             len(healthy_years_saved_low_risk) + explicit_zeros_low_risk
         )
@@ -150,10 +157,8 @@ def test_effectiveness_is_sensitive_to_annual_risks(risk_type, impact_method):
             effect_on_catastrophic_risk=effect_on_catastrophic_risk,
             persistence=persistence,
         )
-        (
-            healthy_years_saved_high_risk,
-            explicit_zeros_high_risk,
-        ) = intervention_under_high_risk.glt_dalys_per_1000_estimator()
+        estimate = intervention_under_high_risk.glt_dalys_per_1000_estimator()
+        healthy_years_saved_high_risk, explicit_zeros_high_risk = estimate.data, estimate.num_zeros
         avg_years_saved_high_risk = np.sum(healthy_years_saved_high_risk) / (
             len(healthy_years_saved_high_risk) + explicit_zeros_high_risk
         )
@@ -215,10 +220,8 @@ def test_effectiveness_is_sensitive_to_proportional_risks(target_risk_type, impa
             effect_on_catastrophic_risk=effect_on_catastrophic_risk,
             persistence=persistence,
         )
-        (
-            healthy_years_saved_low_risk,
-            explicit_zeros_low_risk,
-        ) = intervention_under_low_risk.glt_dalys_per_1000_estimator()
+        estimate = intervention_under_low_risk.glt_dalys_per_1000_estimator()
+        healthy_years_saved_low_risk, explicit_zeros_low_risk = estimate.data, estimate.num_zeros
         avg_years_saved_low_risk = np.sum(healthy_years_saved_low_risk) / (
             len(healthy_years_saved_low_risk) + explicit_zeros_low_risk
         )
@@ -237,10 +240,8 @@ def test_effectiveness_is_sensitive_to_proportional_risks(target_risk_type, impa
             effect_on_catastrophic_risk=ConstantDistributionSpec(type="constant", distribution="constant", value=0.05),
             persistence=persistence,
         )
-        (
-            healthy_years_saved_high_risk,
-            explicit_zeros_high_risk,
-        ) = intervention_under_high_risk.glt_dalys_per_1000_estimator()
+        estimate = intervention_under_high_risk.glt_dalys_per_1000_estimator()
+        healthy_years_saved_high_risk, explicit_zeros_high_risk = estimate.data, estimate.num_zeros
         avg_years_saved_high_risk = np.sum(healthy_years_saved_high_risk) / (
             len(healthy_years_saved_high_risk) + explicit_zeros_high_risk
         )
@@ -254,3 +255,9 @@ def test_effectiveness_is_sensitive_to_proportional_risks(target_risk_type, impa
     assert (
         prop_zeros_low_risk > prop_zeros_high_risk
     ), "If a risk gets proportionally higher, should be zero less often!"
+
+
+def _mean_of_impacts(impacts) -> float:
+    # The mean impact in the worlds in which there is one
+    impacts = np.asarray(impacts)
+    return np.mean(impacts[impacts != 0])
@@ -4,9 +4,10 @@
 import ccm.config as config
 import ccm.utility.moral_weight_adapter as mw
 from ccm.base_parameters import FrozenDict
-from ccm.contexts import using_parameters
+from ccm.contexts import using_parameters, using_rng
 from ccm.interventions.animal.animal_intervention_params import AnimalInterventionParams
 from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
 from ccm.utility.models import ConstantDistributionSpec
 from ccm.world.animals import Animal, get_animal_by_name
 from ccm.world.moral_weight_params import MoralWeightsParams
@@ -224,3 +225,9 @@ def mock_moral_weight_adjustor(arg):
     assert result[chicken][carp][1] == 1
     assert result[chicken][bsf][1] == 1
     assert result[chicken][bsf][1] == 1
+
+
+def test_moral_weight_adjustor_with_the_same_seed_at_different_numbers_of_simulations():
+    for simulations in (1_000, 5_000, 1_000):
+        with using_parameters(Parameters(simulation_params=SimulationParams(simulations=simulations))), using_rng(1):
+            assert len(mw.moral_weight_adjustor(Animal.CHICKEN)) == simulations
@@ -2,17 +2,25 @@
 from inspect import get_annotations, signature
 from random import randrange
 
+import numpy as np
 import pytest
 from pydantic import ValidationError
 
 from ccm.base_parameters import BaseParameters, FrozenDict
 from ccm.contexts import (
+    _submodel_field_names,
     get_parameters,
+    get_rng,
     inject_parameters,
     inject_parameters_with_cache,
     inject_parameters_with_lru_cache,
+    inject_parameters_with_memo,
+    recording_reads,
+    spawn_rngs,
+    sweep_parameters,
     updated_parameters,
     using_parameters,
+    using_rng,
 )
 from ccm.parameters import Parameters as ModelParameters
 
@@ -119,6 +127,38 @@ def test_specific_injection_with_no_context():
         example_mw(3)
 
 
+class MockDerivedSpecificParameters(MockSpecificParameters, frozen=True):
+    pass
+
+
+class MockParametersWithDerivedSubmodel(ModelParameters, frozen=True):
+    derived: MockDerivedSpecificParameters = MockDerivedSpecificParameters(other_number=7)
+
+
+def test_submodels_are_indexed_by_type():
+    assert _submodel_field_names(MockParameters)[MockSpecificParameters] == "mw"
+    # The index is built once per class
+    assert _submodel_field_names(MockParameters) is _submodel_field_names(MockParameters)
+
+
+def test_injection_of_submodel_base_class():
+    # Falls back to a scan when the requested model is a base class of the submodel's field type
+    with using_parameters(MockParametersWithDerivedSubmodel()):
+        assert example_mw(3) == 10
+
+
+def test_injection_of_missing_submodel():
+    class MockMissingParameters(BaseParameters, frozen=True):
+        pass
+
+    @inject_parameters
+    def example_missing(params: MockMissingParameters) -> None:
+        pass
+
+    with pytest.raises(LookupError), using_parameters(MockParameters()):
+        example_missing()
+
+
 def test_update():
     params = MockParameters()
     with using_parameters(params):
@@ -343,3 +383,181 @@ def _get_injected_lru_cached_value(params: ModelParameters) -> int:
 @inject_parameters_with_lru_cache(maxsize=2)
 def _get_injected_lru_cached_value_with_additional_args(params: ModelParameters, func_param: int) -> tuple[int, int]:
     return (randrange(100_000_000), func_param)
+
+
+@inject_parameters_with_memo(max_bytes=3 * 8_000)
+def _get_memoized_array(params: MockSpecificParameters, length: int) -> np.ndarray:
+    return np.full(length, float(params.other_number))
+
+
+@inject_parameters_with_memo(per_rng=True)
+def _get_memoized_samples(params: MockSpecificParameters) -> np.ndarray:
+    return get_rng().random(params.other_number)
+
+
+def test_memo_keys_on_submodel_fingerprint():
+    _get_memoized_array.cache_clear()
+    with using_parameters(MockParameters(mw=MockSpecificParameters(other_number=3))):
+        first = _get_memoized_array(1_000)
+    # Equal submodels of other (and different) Parameters objects share the entry
+    with using_parameters(MockParameters(number=5, mw=MockSpecificParameters(other_number=3))):
+        assert _get_memoized_array(1_000) is first
+        assert _get_memoized_array(length=1_000) is not first  # Keyword arguments are keyed separately
+    with using_parameters(MockParameters(mw=MockSpecificParameters(other_number=4))):
+        assert _get_memoized_array(1_000)[0] == 4
+    assert _get_memoized_array.cache_info()[:4] == (1, 3, 0, 3)
+
+
+def test_memo_evicts_by_bytes():
+    _get_memoized_array.cache_clear()
+    with using_parameters(MockParameters()):
+        first = _get_memoized_array(1_000)
+        _get_memoized_array(1_000)
+        _get_memoized_array(2_000)  # 24 kB in total, which fills the memo
+        assert _get_memoized_array.cache_info().evictions == 0
+        _get_memoized_array(10)  # Evicts the least recently used array
+        info = _get_memoized_array.cache_info()
+        assert (info.evictions, info.entries, info.nbytes) == (1, 2, 8 * 2_010)
+        assert _get_memoized_array(1_000) is not first
+        # Values larger than the budget aren't memoized
+        _get_memoized_array(5_000)
+        assert _get_memoized_array.cache_info().nbytes <= 3 * 8_000
+
+
+def test_memoized_arrays_are_read_only():
+    with using_parameters(MockParameters()):
+        array = _get_memoized_array(10)
+    with pytest.raises(ValueError, match="read-only"):
+        array[0] = 1
+
+
+def test_memo_per_rng():
+    with using_parameters(MockParameters()):
+        with using_rng(1):
+            samples = _get_memoized_samples()
+            assert _get_memoized_samples() is samples
+        # Samples are keyed by the stream of the seed, whatever was drawn from it before
+        with using_rng(1) as rng:
+            rng.random(10)
+            assert _get_memoized_samples() is samples
+        with using_rng(2) as rng:
+            state = rng.bit_generator.state
+            assert not np.array_equal(_get_memoized_samples(), samples)
+            # They are drawn from a stream derived from the seed, rather than from the generator
+            assert rng.bit_generator.state == state
+
+
+def test_memo_per_rng_of_unseeded_generators():
+    _get_memoized_samples.cache_clear()
+    with using_parameters(MockParameters()):
+        # The process-wide generator draws new samples on each call
+        assert not np.array_equal(_get_memoized_samples(), _get_memoized_samples())
+        with using_rng():
+            samples = _get_memoized_samples()
+            assert _get_memoized_samples() is samples
+            # Also in contexts derived from it
+            with using_rng(spawn_rngs(1)[0]):
+                child_samples = _get_memoized_samples()
+                assert _get_memoized_samples() is child_samples
+        with using_rng():
+            assert not np.array_equal(_get_memoized_samples(), samples)
+    # Samples drawn from fresh entropy are kept for their context alone
+    assert _get_memoized_samples.cache_info().entries == 0
+
+
+@inject_parameters
+def _read_number(params: MockParameters) -> int:
+    return params.number
+
+
+@inject_parameters
+def _read_other_number(params: MockSpecificParameters) -> int:
+    return params.other_number
+
+
+@inject_parameters_with_memo()
+def _read_numbers_memoized(params: MockParameters) -> int:
+    return params.number + params.mw.other_number
+
+
+def test_recording_reads():
+    params = MockParameters()
+    with using_parameters(params):
+        _read_number()  # Not recorded
+        with recording_reads() as reads:
+            _read_other_number()
+            with recording_reads() as nested_reads:
+                _read_number()
+            # Copying and hashing the parameters isn't a read of them
+            with updated_parameters({"other_number": 5}, MockSpecificParameters):
+                hash(get_parameters())
+    assert nested_reads.dependencies(params) == ["number"]
+    # Nested reads are also recorded by the enclosing context
+    assert reads.dependencies(params) == ["mw.other_number", "number"]
+    assert reads.submodels == {MockParameters, MockSpecificParameters}
+
+
+class MockMethodParameters(BaseParameters, frozen=True):
+    number: int = 3
+    other_number: int = 4
+
+    def doubled_number(self) -> int:
+        return 2 * self.number
+
+
+def test_recording_reads_leaves_parameters_alone():
+    params = MockMethodParameters()
+    with using_parameters(params):
+        # Outside of recording, the parameters are handed out as they are
+        assert get_parameters() is params
+        assert "__getattribute__" not in vars(BaseParameters)
+        with recording_reads() as reads:
+            viewed_params = get_parameters()
+            assert isinstance(viewed_params, MockMethodParameters)
+            assert viewed_params == params
+            assert hash(viewed_params) == hash(params)
+            viewed_params.fingerprint()
+            assert viewed_params.doubled_number() == 6
+    # The fields read by methods are recorded, and fingerprinting isn't a read
+    assert reads.dependencies(params) == ["number"]
+
+
+def test_read_set_fingerprint():
+    with using_parameters(MockParameters()), recording_reads() as reads:
+        _read_other_number()
+    fingerprint = reads.fingerprint(MockParameters())
+    assert reads.fingerprint(MockParameters(number=5)) == fingerprint
+    assert reads.fingerprint(MockParameters(mw=MockSpecificParameters(other_number=5))) != fingerprint
+
+
+def test_memo_replays_reads():
+    params = MockParameters(number=11)
+    with using_parameters(params):
+        with recording_reads() as reads:
+            _read_numbers_memoized()
+        with recording_reads() as replayed_reads:
+            _read_numbers_memoized()
+    assert _read_numbers_memoized.cache_info().hits == 1
+    assert replayed_reads.dependencies(params) == reads.dependencies(params) == ["mw.other_number", "number"]
+
+
+def test_sweep_parameters():
+    params = MockParameters()
+    with using_parameters(params):
+        swept_params = list(sweep_parameters("other_number", [3, "4", 5], MockSpecificParameters))
+    assert [swept.mw.other_number for swept in swept_params] == [3, 4, 5]
+    for swept in swept_params:
+        # Unchanged parameters are shared
+        assert swept.ghd_intervention_params is params.ghd_intervention_params
+        # Fingerprinted incrementally, as if fingerprinted from scratch
+        assert swept.fingerprint() == MockParameters(mw=swept.mw).fingerprint()
+    assert len({swept.fingerprint() for swept in swept_params}) == 3
+
+
+def test_sweep_validates_values_up_front():
+    with using_parameters(MockParameters()):
+        sweep = sweep_parameters("other_number", [3, "not a number"], MockSpecificParameters)
+        with pytest.raises(ValidationError, match="valid integer"):
+            next(sweep)
+        with pytest.raises(ValidationError, match="Extra inputs are not permitted"):
+            next(sweep_parameters("random_attribute", [3]))
@@ -5,6 +5,8 @@
 from squigglepy import B, M
 import ccm.world.population as population
 import ccm.world.space as space
+from ccm.contexts import get_parameters
+from ccm.world.longterm_params import LongTermParams
 
 
 def test_total_life_years_until():
@@ -21,7 +23,7 @@ def test_total_life_years_until_with_terrestrial_pops(monkeypatch):
     current_pop = 8 * B
     century_pop = 11 * B
 
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
     years = np.array([1, 5, 100, 120, 1000, 10_000])
     life_years = population.get_total_life_years_until(years)
     assert math.isclose(life_years[0], current_pop, rel_tol=0.1)
@@ -38,7 +40,7 @@ def test_total_life_years_until_with_high_terrestrial_pops(monkeypatch):
     current_pop = 8 * B
     century_pop = 11 * B
 
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
     years = np.array([1, 5, 100, 120, 1000, 10_000])
     life_years = population.get_total_life_years_until(years)
     assert math.isclose(life_years[0], current_pop, rel_tol=0.1)
@@ -55,7 +57,7 @@ def test_total_life_years_until_with_lower_terrestrial_pops(monkeypatch):
     current_pop = 8 * B
     century_pop = 11 * B
 
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * perpetual_pop)
     years = np.array([1, 5, 100, 120, 1000, 1_000_000])
     life_years = population.get_total_life_years_until(years)
     assert math.isclose(life_years[0], current_pop, rel_tol=0.1)
@@ -68,7 +70,7 @@ def test_total_life_years_until_with_lower_terrestrial_pops(monkeypatch):
 
 def test_total_life_years_until_grows_non_linearly(monkeypatch):
     monkeypatch.setattr(space, "sample_expansion_speeds", lambda n,: np.ones(n) * 0.003)
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
+    monkeypatch.setattr(population, "sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
     years = np.array([1, 10_000, 100_000, 10_000_000_000])
     life_years = population.get_total_life_years_until(years)
     assert math.isclose(life_years[0], life_years[1] / years[1], abs_tol=20 * B)
@@ -88,15 +90,20 @@ def test_total_life_years_handles_large_numbers():
     assert execution_time < 0.2, f"Execution time was: {execution_time}s"
 
 
-def test_population_helpers(monkeypatch):
-    monkeypatch.setattr(space, "sample_expansion_speeds", lambda n: np.ones(n) * 0.003)
-    monkeypatch.setattr(population, "_sample_populations_per_star", lambda n: np.ones(n) * 10 * B)
-    years = np.array([1, 7, 10_000, 100_000])
+def test_population_helpers():
+    years = np.array([1.0, 7.0, 10_000.0, 100_000.0])
+    populations_per_star = np.full(len(years), 10 * B)
+    expansion_speeds = np.full(len(years), 0.003)
+    params = get_parameters(LongTermParams)
+    galactic_densities = params.galactic_density.sample(len(years))
+    supercluster_densities = params.supercluster_density.sample(len(years))
 
-    terrestrial_life_years = population._get_terrestrial_life_years_until(years)
-    extraterrestrial_life_years = population._get_extraterrestrial_life_years_until(
-        years,
+    terrestrial_life_years = np.zeros(len(years))
+    population._add_terrestrial_life_years(years, populations_per_star, out=terrestrial_life_years)
+    life_years = population._life_years_until(
+        years, populations_per_star, expansion_speeds, galactic_densities, supercluster_densities
     )
+    extraterrestrial_life_years = life_years - terrestrial_life_years
 
     assert terrestrial_life_years[0] > extraterrestrial_life_years[0]
     assert terrestrial_life_years[1] > extraterrestrial_life_years[1]
@@ -3,16 +3,21 @@
 import numpy as np
 import pytest
 import squigglepy as sq
-from scipy.sparse import coo_array
 from squigglepy.numbers import K, M
 
 import ccm.config as config
 import ccm.interventions.intervention_definitions.all_interventions as interventions
+from ccm.contexts import using_parameters
 from ccm.interventions.intervention import ResultIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
 from ccm.research_projects.funding_pools.cause_benchmark_fp import CauseBenchmarkInterventionFundingPool
 from ccm.research_projects.funding_pools.specified_intervention_fp import SpecifiedInterventionFundingPool
 from ccm.research_projects.projects.research_project import FundingProfile, ResearchProject
+from ccm.simulation_params import SimulationParams
 from ccm.utility.models import DistributionSpec
+from ccm.utility.sparse_samples import SparseSampleArray
+from ccm.world.risk_types import RiskTypeAI
 
 SIMULATIONS = config.get_simulations()
 
@@ -83,17 +88,13 @@ def test_val_impr_per_year():
 
     for scenario in scenarios:
         money, change_money = scenario
-        mon_infl_per_year = coo_array(
-            (np.array(SIMULATIONS * [money]), (np.zeros(SIMULATIONS), np.arange(SIMULATIONS))),
-            shape=(1, SIMULATIONS),
-        )
-        additional_dalys_per_dollar = coo_array(
-            (np.array(SIMULATIONS * [change_money]), (np.zeros(SIMULATIONS), np.arange(SIMULATIONS))),
-            shape=(1, SIMULATIONS),
+        mon_infl_per_year = SparseSampleArray(np.array(SIMULATIONS * [money]), positions=np.arange(SIMULATIONS))
+        additional_dalys_per_dollar = SparseSampleArray(
+            np.array(SIMULATIONS * [change_money]), positions=np.arange(SIMULATIONS)
         )
         prediction = money * change_money
         results = ResearchProject._calc_val_impr_per_year(mon_infl_per_year, additional_dalys_per_dollar)
-        avg_result = np.sum(results.data) / np.multiply(*results.shape)
+        avg_result = results.mean()
         if avg_result >= 0:
             if (0.99 * prediction) > avg_result or avg_result > (1.01 * prediction):
                 print(f"Failed test: {scenario}")
@@ -350,3 +351,31 @@ def test_funding_profile_validation():
             },
             {non_impactful_pool: 0.99},
         )
+
+
+def test_assessment_with_stratified_sampling():
+    project = ResearchProject(
+        short_name="Stratified Sampling Test",
+        name="Stratified Sampling Test",
+        description="Some description...",
+        cause="X-Risk",
+        sub_cause="",
+        fte_years=sq.norm(0.25, 0.75, lclip=4 / 52),
+        conclusions_require_updating=sq.norm(0.3, 0.7, lclip=0, rclip=1),
+        target_updating=sq.norm(0.3, 0.7, lclip=0, rclip=1),
+        money_in_area_millions=sq.norm(10, 90),
+        percent_money_influenceable=sq.norm(0.3, 0.7, lclip=0, rclip=1),
+        years_credit=sq.norm(1, 3, lclip=0),
+        target_intervention=XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+        funding_profile=project_1.funding_profile,
+    )
+    simulation_params = SimulationParams(simulations=SIMULATIONS, stratified_sampling=True)
+    with using_parameters(Parameters(simulation_params=simulation_params)):
+        assessment = project.assess_project()
+
+    assert assessment.gross_impact_DALYs.weights is not None
+    assert assessment.net_impact_DALYs.weights is not None
+    assert assessment.net_impact_DALYs.total_weight == pytest.approx(assessment.gross_impact_DALYs.total_weight)
+    for bottom_line in assessment.bottom_lines.values():
+        assert bottom_line.roi.weights is not None
+        assert np.isfinite(bottom_line.average_roi)
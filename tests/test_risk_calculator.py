@@ -162,10 +162,6 @@ def test_get_cumulative_catastrophe_risk():
     )
 
 
-def test_approximate_geometric():
-    pass
-
-
 def test_gets_average_total_risk_over_eras() -> None:
     with using_parameters(
         Parameters(
@@ -330,3 +326,41 @@ def test_gets_cumulative_risk_over_years_by_type() -> None:
             np.array(SIMULATIONS * [7]),
         )
     assert math.isclose(np.mean(cum_risk), 0.1 * 5 + 0.0005 * 2)
+
+
+def test_risk_table_matches_year_by_year_sums() -> None:
+    eras = (
+        Era(length=5, annual_extinction_risk=0.2, proportional_risks_by_type=test_proportions),
+        Era(length=12, annual_extinction_risk=0, proportional_risks_by_type=test_proportions),
+        Era(length=4, annual_extinction_risk=0.1, proportional_risks_by_type=test_proportions),
+    )
+    risks_by_year = np.concatenate([[era.annual_extinction_risk] * era.length for era in eras] + [np.zeros(10)])
+    num_years = np.arange(1, len(risks_by_year) + 1)
+    with using_parameters(Parameters(longterm_params=LongTermParams(risk_eras=eras))):
+        risk_table = risk_calculator.get_risk_table()
+    # No risk after the end of the last era
+    np.testing.assert_allclose(risk_table.cumulative(num_years), np.cumsum(risks_by_year))
+    np.testing.assert_allclose(risk_table.average(num_years), np.cumsum(risks_by_year) / num_years)
+    np.testing.assert_allclose(
+        risk_table.cumulative(num_years, RiskTypeAI.MISALIGNMENT),
+        np.cumsum(risks_by_year) * test_proportions[RiskTypeAI.MISALIGNMENT],
+    )
+
+
+def test_risk_table_is_shared_by_equal_eras() -> None:
+    with using_parameters(Parameters()):
+        risk_table = risk_calculator.get_risk_table()
+    with using_parameters(
+        Parameters(longterm_params=LongTermParams(risk_eras=tuple(era.model_copy() for era in DEFAULT_ERAS)))
+    ):
+        assert risk_calculator.get_risk_table() is risk_table
+
+
+def test_average_risk_over_the_tail_of_the_default_eras() -> None:
+    # Number of years far into the last era, which the table answers without going through the years
+    num_years = np.array([1, 10**6, 10**8, 10**9])
+    with using_parameters(Parameters()):
+        average_risk = risk_calculator.get_average_total_risk_over_years(num_years)
+    assert average_risk[0] == DEFAULT_ERAS[0].annual_extinction_risk
+    assert np.all(average_risk > 0)
+    assert np.all(np.diff(average_risk[1:]) < 0)
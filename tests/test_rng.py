@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import squigglepy as sq
+
+import ccm.utility.squigglepy_wrapper as sqw
+from ccm.contexts import get_rng, spawn_rngs, using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SimulationParams
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+
+SMALL_PARAMETERS = Parameters(simulation_params=SimulationParams(simulations=2_000))
+
+
+def test_same_seed_same_samples():
+    with using_rng(42):
+        first = sqw.sample(sq.norm(0, 1), n=100)
+    with using_rng(42):
+        second = sqw.sample(sq.norm(0, 1), n=100)
+    with using_rng(43):
+        third = sqw.sample(sq.norm(0, 1), n=100)
+    np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first, third)
+
+
+def test_concurrent_contexts_dont_interleave():
+    def sample_with_seed(seed: int) -> np.ndarray:
+        # (Threads don't inherit the context)
+        with using_parameters(SMALL_PARAMETERS), using_rng(seed):
+            return np.concatenate([sqw.sample(sq.norm(0, 1), n=100) for _ in range(50)])
+
+    seeds = list(range(8))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        concurrent = list(executor.map(sample_with_seed, seeds))
+    for seed, samples in zip(seeds, concurrent):
+        np.testing.assert_array_equal(samples, sample_with_seed(seed))
+    # Squigglepy draws from the generator of the context it is called in, not from that of the last context
+    with using_rng(42):
+        sqw.sample(sq.norm(0, 1), n=10)
+    with using_rng(43) as rng:
+        state = rng.bit_generator.state
+        sq.sample(sq.norm(0, 1), n=10)
+        assert rng.bit_generator.state != state
+    with using_rng(42):
+        samples = sq.sample(sq.norm(0, 1), n=10)
+    with using_rng(42):
+        np.testing.assert_array_equal(sqw.sample(sq.norm(0, 1), n=10), samples)
+
+
+def test_rng_is_restored():
+    outer = get_rng()
+    with using_rng(42) as rng:
+        assert get_rng() is rng
+        with using_rng(43) as inner_rng:
+            assert get_rng() is inner_rng
+        assert get_rng() is rng
+    assert get_rng() is outer
+
+
+def test_generator_is_used_as_is():
+    rng = np.random.default_rng(42)
+    with using_rng(rng):
+        assert get_rng() is rng
+
+
+def test_spawned_rngs_are_independent_and_deterministic():
+    with using_rng(42):
+        first_children = [rng.random(10) for rng in spawn_rngs(3)]
+    with using_rng(42):
+        second_children = [rng.random(10) for rng in spawn_rngs(3)]
+    for first, second in zip(first_children, second_children):
+        np.testing.assert_array_equal(first, second)
+    assert not np.array_equal(first_children[0], first_children[1])
+
+
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+    ],
+)
+def test_estimate_is_deterministic_given_seed(intervention):
+    with using_parameters(SMALL_PARAMETERS):
+        with using_rng(42):
+            estimate = intervention.estimate_dalys_per_1000()
+            first_samples, first_zeros = estimate.data, estimate.num_zeros
+        with using_rng(42):
+            estimate = intervention.estimate_dalys_per_1000()
+            second_samples, second_zeros = estimate.data, estimate.num_zeros
+        with using_rng(43):
+            third_samples = intervention.estimate_dalys_per_1000().data
+    np.testing.assert_array_equal(first_samples, second_samples)
+    assert first_zeros == second_zeros
+    assert not np.array_equal(first_samples, third_samples)
+
+
+def test_assessment_is_deterministic_given_seed():
+    project = get_all_projects(equal_money_for_causes=False)[0]
+    with using_parameters(SMALL_PARAMETERS):
+        with using_rng(42):
+            first = project.assess_project()
+        with using_rng(42):
+            second = project.assess_project()
+    np.testing.assert_array_equal(first.gross_impact_DALYs.data, second.gross_impact_DALYs.data)
+    np.testing.assert_array_equal(first.net_impact_DALYs.data, second.net_impact_DALYs.data)
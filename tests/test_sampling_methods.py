@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SimulationParams, get_sampling_method
+from ccm.utility.low_discrepancy import sample_uniforms
+from ccm.utility.models import BetaDistributionSpec, ConfidenceDistributionSpec, GammaDistributionSpec
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+from ccm_api.models import ProjectAssessmentModel
+
+LOW_DISCREPANCY_METHODS = ["sobol", "latin hypercube"]
+SMALL_SIMULATIONS = 1024
+
+
+def params_with_sampling_method(sampling_method: str, simulations: int = SMALL_SIMULATIONS) -> Parameters:
+    return Parameters(simulation_params=SimulationParams(simulations=simulations, sampling_method=sampling_method))
+
+
+def test_default_sampling_method():
+    assert get_sampling_method() == "monte carlo"
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_uniforms_are_stratified(sampling_method):
+    uniforms = sample_uniforms(SMALL_SIMULATIONS, sampling_method)
+    assert np.all((uniforms >= 0) & (uniforms < 1))
+    # Each of the equally sized strata of [0, 1) holds exactly one sample
+    strata = np.floor(uniforms * SMALL_SIMULATIONS).astype(int)
+    np.testing.assert_array_equal(np.sort(strata), np.arange(SMALL_SIMULATIONS))
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_uniforms_are_not_ordered(sampling_method):
+    # Samples of separate draws get paired up by position, so they must come in random order
+    uniforms = sample_uniforms(SMALL_SIMULATIONS, sampling_method)
+    assert abs(stats.spearmanr(uniforms, np.arange(SMALL_SIMULATIONS)).statistic) < 0.2
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_uniforms_of_any_length(sampling_method):
+    assert len(sample_uniforms(1000, sampling_method)) == 1000
+    assert len(sample_uniforms(1, sampling_method)) == 1
+    assert len(sample_uniforms(0, sampling_method)) == 0
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_sampling_method_is_deterministic_given_seed(sampling_method):
+    with using_parameters(params_with_sampling_method(sampling_method)):
+        with using_rng(42):
+            first = ConfidenceDistributionSpec.lognorm(1, 10).sample(100)
+        with using_rng(42):
+            second = ConfidenceDistributionSpec.lognorm(1, 10).sample(100)
+    np.testing.assert_array_equal(first, second)
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+@pytest.mark.parametrize(
+    ("spec", "dist"),
+    [
+        (ConfidenceDistributionSpec.norm(-2, 5), stats.norm(1.5, 7 / (2 * stats.norm.ppf(0.95)))),
+        (BetaDistributionSpec.create(2, 5), stats.beta(2, 5)),
+        (GammaDistributionSpec(type="gamma", distribution="gamma", shape=2, scale=3), stats.gamma(2, scale=3)),
+    ],
+)
+def test_low_discrepancy_percentiles_are_precise(sampling_method, spec, dist):
+    percentiles = [1, 5, 25, 50, 75, 95, 99]
+    expected = dist.ppf(np.array(percentiles) / 100)
+    tolerance = 0.02 * (expected[-1] - expected[0])
+    with using_parameters(params_with_sampling_method(sampling_method)):
+        samples = spec.sample(SMALL_SIMULATIONS)
+    np.testing.assert_allclose(np.percentile(samples, percentiles), expected, atol=tolerance)
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_low_discrepancy_respects_clip(sampling_method):
+    with using_parameters(params_with_sampling_method(sampling_method)):
+        samples = ConfidenceDistributionSpec.norm(0, 10, lclip=2, rclip=8).sample(SMALL_SIMULATIONS)
+    assert samples.min() == 2
+    assert samples.max() == 8
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+    ],
+)
+def test_estimate_with_sampling_method(sampling_method, intervention):
+    with using_parameters(params_with_sampling_method(sampling_method)):
+        estimate = intervention.estimate_dalys_per_1000()
+        samples, zeros = estimate.data, estimate.num_zeros
+    assert len(samples) + zeros >= SMALL_SIMULATIONS
+    assert np.all(np.isfinite(samples))
+
+
+@pytest.mark.parametrize("sampling_method", LOW_DISCREPANCY_METHODS)
+def test_assessment_reports_sampling_method(sampling_method):
+    project = get_all_projects(equal_money_for_causes=False)[0]
+    with using_parameters(params_with_sampling_method(sampling_method)):
+        assessment = ProjectAssessmentModel.from_project_assessment(project.assess_project())
+    assert assessment.sampling_method == sampling_method
+    assert len(assessment.cost) == SMALL_SIMULATIONS
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+import ccm.config as config
+import ccm.interventions.intervention_definitions.all_interventions as interventions
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.research_projects.funding_pools.specified_intervention_fp import SpecifiedInterventionFundingPool
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SimulationParams, get_dtype, get_num_simulations
+from ccm.world.animals import Animal
+from ccm.world.risk_types import RiskTypeAI
+
+SMALL_SIMULATIONS = 2_000
+
+
+def params_with_simulations(simulations: int) -> Parameters:
+    return Parameters(simulation_params=SimulationParams(simulations=simulations))
+
+
+FLOAT32_PARAMETERS = Parameters(simulation_params=SimulationParams(simulations=SMALL_SIMULATIONS, dtype="float32"))
+
+
+def test_default_simulations():
+    assert SimulationParams().simulations == config.get_simulations()
+    assert get_num_simulations() == config.get_simulations()
+
+
+def test_invalid_simulations():
+    with pytest.raises(ValidationError):
+        SimulationParams(simulations=0)
+
+
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+        interventions.get_intervention("$50 per DALY"),
+    ],
+)
+def test_estimate_honours_simulations(intervention):
+    with using_parameters(params_with_simulations(SMALL_SIMULATIONS)):
+        samples = intervention.estimate_dalys_per_1000().data
+    assert len(samples) == SMALL_SIMULATIONS
+
+
+def test_cached_estimate_honours_simulations():
+    intervention = GhdIntervention(name="test")
+    with using_parameters(params_with_simulations(SMALL_SIMULATIONS)):
+        small_samples = intervention.estimate_dalys_per_1000().data
+    with using_parameters(params_with_simulations(2 * SMALL_SIMULATIONS)):
+        big_samples = intervention.estimate_dalys_per_1000().data
+    assert len(small_samples) == SMALL_SIMULATIONS
+    assert len(big_samples) == 2 * SMALL_SIMULATIONS
+
+
+def test_funding_pool_honours_simulations():
+    funding_pool = SpecifiedInterventionFundingPool(GhdIntervention(name="test"))
+    with using_parameters(params_with_simulations(SMALL_SIMULATIONS)):
+        small_cost = funding_pool.convert_dollars_to_dalys(np.ones(SMALL_SIMULATIONS))
+    with using_parameters(params_with_simulations(2 * SMALL_SIMULATIONS)):
+        big_cost = funding_pool.convert_dollars_to_dalys(np.ones(2 * SMALL_SIMULATIONS))
+    assert small_cost.nnz == SMALL_SIMULATIONS
+    assert big_cost.nnz == 2 * SMALL_SIMULATIONS
+
+
+def test_default_dtype():
+    assert get_dtype() == np.float64
+
+
+def test_invalid_dtype():
+    with pytest.raises(ValidationError):
+        SimulationParams(dtype="float16")
+
+
+@pytest.mark.parametrize(
+    "intervention",
+    [
+        GhdIntervention(name="test"),
+        AnimalIntervention(animal=Animal.CHICKEN),
+        XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT),
+        interventions.get_intervention("$50 per DALY"),
+    ],
+)
+def test_estimate_honours_dtype(intervention):
+    with using_parameters(FLOAT32_PARAMETERS):
+        samples = intervention.estimate_dalys_per_1000().data
+    assert samples.dtype == np.float32
+    assert np.all(np.isfinite(samples))
+
+
+def test_estimate_float32_matches_float64():
+    intervention = AnimalIntervention(animal=Animal.CHICKEN)
+    with using_parameters(params_with_simulations(SMALL_SIMULATIONS)), using_rng(42):
+        samples_64 = intervention.estimate_dalys_per_1000().data
+    with using_parameters(FLOAT32_PARAMETERS), using_rng(42):
+        samples_32 = intervention.estimate_dalys_per_1000().data
+    np.testing.assert_allclose(samples_32, samples_64, rtol=1e-4)
+
+
+def test_assessment_honours_dtype():
+    project = get_all_projects(equal_money_for_causes=False)[0]
+    with using_parameters(FLOAT32_PARAMETERS):
+        assessment = project.assess_project()
+    assert assessment.cost.dtype == np.float32
+    assert assessment.gross_impact_DALYs.data.dtype == np.float32
+    assert assessment.net_impact_DALYs.data.dtype == np.float32
+    assert np.all(np.isfinite(assessment.net_impact_DALYs.data))
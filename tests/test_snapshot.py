@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import ccm.adaptive as adaptive
+import ccm.snapshot as snapshot
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.estimate_cache import ESTIMATE_CACHE
+from ccm.interventions.intervention_definitions.all_interventions import get_unscaled_interventions
+from ccm.parameters import Parameters
+from ccm.research_projects.projects.project_definitions.all_projects import get_all_projects
+from ccm.simulation_params import SimulationParams
+from ccm.snapshot import SNAPSHOT_SEED, ResultsSnapshot, build_snapshot
+from ccm.utility.sparse_samples import SparseSampleArray
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("snapshot") / "default_results.npz"
+    build_snapshot(path, get_unscaled_interventions()[:3], get_all_projects(False)[:1])
+    return path
+
+
+def test_snapshot_round_trips(snapshot_path):
+    results = ResultsSnapshot.load(snapshot_path)
+    assert results is not None
+    intervention = get_unscaled_interventions()[1]
+    estimate = results.estimate(intervention, Parameters())
+    assert isinstance(results._columns["interventions/estimate/data"], np.memmap)
+
+    ESTIMATE_CACHE.cache_clear()
+    with using_parameters(Parameters()), using_rng(SNAPSHOT_SEED):
+        expected = intervention.estimate_dalys_per_1000()
+    np.testing.assert_array_equal(estimate.result.data, expected.data)
+    assert estimate.result.num_zeros == expected.num_zeros
+    assert estimate.batches == 1
+
+    project = get_all_projects(False)[0]
+    assessment = results.assessment(project, Parameters()).result
+    ESTIMATE_CACHE.cache_clear()
+    with using_parameters(Parameters()), using_rng(SNAPSHOT_SEED):
+        expected = adaptive.assess_project(project).result
+    np.testing.assert_array_equal(assessment.cost, expected.cost)
+    _assert_sparse_equal(assessment.net_impact_DALYs, expected.net_impact_DALYs)
+    # Bottom lines are kept for each funding pool of the project
+    assert assessment.bottom_lines.keys() == expected.bottom_lines.keys()
+    assert len(assessment.bottom_lines) > 0
+    for pool, bottom_line in assessment.bottom_lines.items():
+        assert bottom_line.average_roi == expected.bottom_lines[pool].average_roi
+        _assert_sparse_equal(bottom_line.roi, expected.bottom_lines[pool].roi)
+        _assert_sparse_equal(bottom_line.gross_dalys_per_1000, expected.bottom_lines[pool].gross_dalys_per_1000)
+
+
+def test_snapshots_built_in_a_pool_match_those_built_in_process(snapshot_path, tmp_path):
+    pooled_path = tmp_path / "pooled_results.npz"
+    build_snapshot(pooled_path, get_unscaled_interventions()[:3], [], max_workers=2)
+    results, pooled_results = ResultsSnapshot.load(snapshot_path), ResultsSnapshot.load(pooled_path)
+    for intervention in get_unscaled_interventions()[:3]:
+        estimate = results.estimate(intervention, Parameters())
+        pooled_estimate = pooled_results.estimate(intervention, Parameters())
+        _assert_sparse_equal(pooled_estimate.result, estimate.result)
+        assert pooled_estimate.batches == estimate.batches
+    assert list(tmp_path.iterdir()) == [pooled_path]
+
+
+def test_sparse_columns_keep_positions_and_weights(tmp_path):
+    arrays = [
+        SparseSampleArray([1.0, 2.0], 3, positions=np.array([4, 0])),
+        SparseSampleArray([3.0], 1, weights=[0.5]),
+        SparseSampleArray([], 2),
+    ]
+    path = tmp_path / "columns.npz"
+    np.savez(path, **snapshot._sparse_column("samples", arrays))
+    columns = snapshot._memory_map_npz(path)
+    for index, array in enumerate(arrays):
+        _assert_sparse_equal(snapshot._read_sparse(columns, "samples", index), array)
+
+
+def _assert_sparse_equal(actual: SparseSampleArray, expected: SparseSampleArray) -> None:
+    np.testing.assert_array_equal(actual.data, expected.data)
+    assert actual.num_zeros == expected.num_zeros
+    for actual_part, expected_part in ((actual.positions, expected.positions), (actual.weights, expected.weights)):
+        assert (actual_part is None) == (expected_part is None)
+        if expected_part is not None:
+            np.testing.assert_array_equal(actual_part, expected_part)
+
+
+def test_snapshot_only_serves_its_parameters_and_contents(snapshot_path):
+    results = ResultsSnapshot.load(snapshot_path)
+    other_parameters = Parameters(simulation_params=SimulationParams(simulations=100))
+    assert results.estimate(get_unscaled_interventions()[0], other_parameters) is None
+    assert results.estimate(get_unscaled_interventions()[5], Parameters()) is None
+    unknown_project = get_all_projects(False)[1]
+    assert results.assessment(unknown_project, Parameters()) is None
+
+
+def test_stale_snapshots_are_not_loaded(snapshot_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "code_version", lambda: "other version")
+    assert ResultsSnapshot.load(snapshot_path) is None
+    assert ResultsSnapshot.load(snapshot_path.with_name("missing.npz")) is None
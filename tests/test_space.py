@@ -5,15 +5,21 @@
 from ccm.utility.models import DistributionSpec
 from ccm.parameters import Parameters
 from ccm.world.longterm_params import LongTermParams
+import ccm.utility.squigglepy_wrapper as sqw
 import ccm.world.space as space
 
 PI = math.pi
 
 
+def _inhabited_volumes(end_years: np.ndarray, speeds: np.ndarray, radius: int) -> np.ndarray:
+    # The volumes of a single sphere, with a density of one star per unit of volume
+    return space.compute_populated_volumes(end_years, speeds, (radius,), (np.ones(len(end_years)),))
+
+
 def test_compute_inhabited_volumes() -> None:
     sample_years = np.arange(1.0, 1000.0)
     speeds = np.ones(999)
-    volumes = space.compute_inhabited_volumes(sample_years, speeds, 100)
+    volumes = _inhabited_volumes(sample_years, speeds, 100)
     assert np.all(volumes[:-1] <= volumes[1:])
     assert volumes[0] < (4 / 3 * PI)
     assert volumes[1] > (4 / 3 * PI)
@@ -33,7 +39,7 @@ def test_compute_inhabited_volumes() -> None:
 def test_compute_inhabited_volumes_big_boundary() -> None:
     sample_years = np.arange(1.0, 1000.0)
     speeds = np.ones(999)
-    volumes = space.compute_inhabited_volumes(sample_years, speeds, 500)
+    volumes = _inhabited_volumes(sample_years, speeds, 500)
     # Volumes of spheres up to 999 radius
     discrete_volumes = (np.arange(999.0)) ** 3 * 4 / 3 * PI
 
@@ -50,14 +56,34 @@ def test_compute_inhabited_volumes_big_boundary() -> None:
     assert not np.all(volumes[500:] < volumes[499:-1] + 1.01 * discrete_volumes[498])
 
 
+def test_compute_populated_volumes() -> None:
+    rng = np.random.default_rng(0)
+    sample_years = np.exp(rng.uniform(0, np.log(1e12), 1000))
+    speeds = rng.uniform(0, 1, 1000)
+    speeds[:10] = 0
+    densities = [rng.uniform(0, 1, 1000), rng.uniform(0, 1e-6, 1000)]
+    radii = [space.GALACTIC_RADIUS, space.SUPERCLUSTER_RADIUS]
+    # The radii computed in a single pass, as if computed one after the other
+    expected = sum(
+        space.compute_populated_volumes(sample_years, speeds, (radius,), (density,))
+        for radius, density in zip(radii, densities)
+    )
+    assert np.allclose(space.compute_populated_volumes(sample_years, speeds, radii, densities), expected, rtol=1e-12)
+
+    # Adds to the given array
+    out = np.ones(1000)
+    space.compute_populated_volumes(sample_years, speeds, radii, densities, out=out)
+    assert np.allclose(out, expected + 1, rtol=1e-12)
+
+
 def test_sample_expansion_speed() -> None:
     slow = sq.norm(0.0001, 0.001)
     with using_parameters(Parameters(longterm_params=LongTermParams(expansion_speed=DistributionSpec.from_sq(slow)))):
         samples = space.sample_expansion_speeds(100000)
-        assert math.isclose(np.median(samples), np.median(sq.sample(slow, n=10000)), rel_tol=0.3)
-        assert math.isclose(np.mean(samples), np.mean(sq.sample(slow, n=100000)), rel_tol=0.8)
+        assert math.isclose(np.median(samples), np.median(sqw.sample(slow, n=10000)), rel_tol=0.3)
+        assert math.isclose(np.mean(samples), np.mean(sqw.sample(slow, n=100000)), rel_tol=0.8)
     fast = sq.norm(0.009, 0.09)
     with using_parameters(Parameters(longterm_params=LongTermParams(expansion_speed=DistributionSpec.from_sq(fast)))):
         samples = space.sample_expansion_speeds(100000)
-        assert math.isclose(np.median(samples), np.median(sq.sample(fast, n=10000)), rel_tol=0.3)
-        assert math.isclose(np.mean(samples), np.mean(sq.sample(fast, n=100000)), rel_tol=0.8)
+        assert math.isclose(np.median(samples), np.median(sqw.sample(fast, n=10000)), rel_tol=0.3)
+        assert math.isclose(np.mean(samples), np.mean(sqw.sample(fast, n=100000)), rel_tol=0.8)
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from ccm.contexts import using_rng
+from ccm.utility.sparse_samples import SparseSampleArray, match_sizes
+
+DENSE = np.array([0.0, 3.0, 0.0, -1.0, 0.0, 0.0, 2.0, 5.0])
+
+
+def test_from_dense_round_trips():
+    samples = SparseSampleArray.from_dense(DENSE)
+    assert samples.nnz == 4
+    assert samples.num_zeros == 4
+    assert samples.size == len(DENSE)
+    np.testing.assert_array_equal(samples.todense(), DENSE)
+
+
+@pytest.mark.parametrize("q", [0, 10, 25, 50, 62.5, 90, 100])
+def test_summary_statistics_match_dense_samples(q):
+    samples = SparseSampleArray.from_dense(DENSE)
+    assert samples.mean() == pytest.approx(np.mean(DENSE))
+    assert samples.sum() == pytest.approx(np.sum(DENSE))
+    assert samples.percentile(q) == pytest.approx(np.percentile(DENSE, q))
+    np.testing.assert_allclose(samples.percentile([q, 50]), np.percentile(DENSE, [q, 50]))
+
+
+def test_arithmetic_keeps_layout_and_zeros():
+    samples = SparseSampleArray.from_dense(DENSE)
+    result = 2 * (samples - samples / 2) * np.arange(samples.nnz)
+    assert result.num_zeros == samples.num_zeros
+    assert result.positions is samples.positions
+    np.testing.assert_allclose(result.data, samples.data * np.arange(samples.nnz))
+    # Operands are never modified
+    np.testing.assert_array_equal(samples.todense(), DENSE)
+
+
+def test_arithmetic_requires_paired_samples():
+    samples = SparseSampleArray(np.ones(3), num_zeros=2)
+    with pytest.raises(ValueError, match="Can't pair"):
+        samples + SparseSampleArray(np.ones(3), num_zeros=3)
+    with pytest.raises(ValueError, match="Expected 3 values"):
+        samples.with_data(np.ones(4))
+
+
+def test_concatenate_offsets_positions():
+    first = SparseSampleArray.from_dense(DENSE)
+    second = SparseSampleArray.from_dense(-DENSE[:5])
+    joined = SparseSampleArray.concatenate([first, second])
+    np.testing.assert_array_equal(joined.todense(), np.concatenate([DENSE, -DENSE[:5]]))
+
+
+def test_match_sizes_keeps_proportion_of_stored_values():
+    small = SparseSampleArray(np.ones(100), num_zeros=100)
+    large = SparseSampleArray(np.full(100, 2.0), num_zeros=300)
+    resized_small, resized_large = match_sizes(small, large)
+    assert resized_small is small
+    assert resized_large.size == small.size
+    assert resized_large.nnz == small.nnz
+    # A quarter of the large samples are stored values, so half of them are kept, and the rest are explicit zeros
+    assert np.count_nonzero(resized_large.data) == 50
+
+
+def test_random_positions():
+    samples = SparseSampleArray(np.arange(1.0, 11.0), num_zeros=90).with_random_positions()
+    dense = samples.todense()
+    assert len(dense) == 100
+    np.testing.assert_array_equal(np.sort(dense[dense != 0]), np.arange(1.0, 11.0))
+
+
+def test_freeze():
+    samples = SparseSampleArray.from_dense(DENSE).freeze()
+    with pytest.raises(ValueError, match="read-only"):
+        samples.data[0] = 1
+    assert samples.nbytes == samples.data.nbytes + samples.positions.nbytes
+
+
+def test_weighted_statistics_match_repeated_samples():
+    # Integer weights stand for as many copies of each value
+    samples = SparseSampleArray(np.array([3.0, -1.0, 2.0]), num_zeros=4, weights=np.array([2.0, 1.0, 3.0]))
+    repeated = np.concatenate([np.repeat(samples.data, [2, 1, 3]), np.zeros(4)])
+    assert samples.total_weight == len(repeated)
+    assert samples.sum() == pytest.approx(np.sum(repeated))
+    assert samples.mean() == pytest.approx(np.mean(repeated))
+    assert samples.percentile(50) == 0
+    assert samples.percentile(0) == -1
+    assert samples.percentile(100) == 3
+
+
+def test_weighted_percentiles_of_many_samples():
+    rng = np.random.default_rng(42)
+    values = rng.lognormal(0, 1, size=100_000)
+    # Half of the values are kept, with twice the weight
+    samples = SparseSampleArray(values[:50_000], num_zeros=100_000, weights=np.full(50_000, 2.0))
+    expected = np.percentile(np.concatenate([values, np.zeros(100_000)]), [25, 60, 75, 90, 99])
+    np.testing.assert_allclose(samples.percentile([25, 60, 75, 90, 99]), expected, rtol=0.05)
+
+
+def test_weights_are_kept_by_layout_operations():
+    samples = SparseSampleArray(np.array([1.0, 2.0]), num_zeros=3, weights=np.array([0.5, 4.0]))
+    assert (samples * 2).weights is samples.weights
+    assert samples.with_random_positions().weights is samples.weights
+    joined = SparseSampleArray.concatenate([samples, SparseSampleArray(np.ones(3), num_zeros=1)])
+    np.testing.assert_array_equal(joined.weights, [0.5, 4.0, 1.0, 1.0, 1.0])
+    assert joined.total_weight == samples.total_weight + 4
+    with pytest.raises(ValueError, match="weights would be lost"):
+        samples.todense()
+    with pytest.raises(ValueError, match="3 weights were given for 2 values"):
+        SparseSampleArray(np.ones(2), weights=np.ones(3))
+
+
+def test_match_sizes_of_weighted_samples_keeps_stored_values_and_means():
+    rng = np.random.default_rng(42)
+    # A rare outcome, with a weight of 10 simulations for each of its stored values
+    rare = SparseSampleArray(rng.lognormal(0, 1, size=10_000), num_zeros=900_000, weights=np.full(10_000, 10.0))
+    common = SparseSampleArray(rng.normal(5, 1, size=10_000), num_zeros=10_000)
+    with using_rng(0):
+        matched_rare, matched_common = match_sizes(rare, common)
+    assert matched_rare.nnz == matched_common.nnz == 10_000
+    assert matched_rare.total_weight == pytest.approx(common.size, abs=1)
+    np.testing.assert_array_equal(matched_rare.weights, matched_common.weights)
+    # All of the rare values are kept, unlike when resizing, which would keep about 220 of them
+    assert np.count_nonzero(matched_rare.data) >= 3_000
+    # The means of the seeded layout are within a few standard errors of those of the arrays
+    assert abs(matched_rare.mean() - rare.mean()) < 4 * _standard_error_of_mean(matched_rare)
+    assert abs(matched_common.mean() - common.mean()) < 4 * _standard_error_of_mean(matched_common)
+
+
+def _standard_error_of_mean(samples: SparseSampleArray) -> float:
+    # The mean is a weighted sum over the stored values, each drawn once
+    contributions = samples.weights_or_ones() * samples.data
+    return np.sqrt(samples.nnz) * np.std(contributions) / samples.total_weight
@@ -0,0 +1,123 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from ccm.contexts import using_parameters, using_rng
+from ccm.interventions.animal.animal_interventions import AnimalIntervention
+from ccm.interventions.ghd.ghd_interventions import GhdIntervention
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.streaming import summarize_dalys_per_1000
+from ccm.utility.summaries import SampleSummary
+from ccm.world.animals import Animal
+
+QUANTILES = np.array([0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999])
+NUM_ZEROS = 50_000
+
+
+@pytest.fixture(scope="module")
+def samples() -> np.ndarray:
+    # Heavy-tailed, with some negative samples
+    rng = np.random.default_rng(42)
+    return rng.lognormal(0, 2, size=200_000) * np.where(rng.random(200_000) < 0.2, -1, 1)
+
+
+def padded(samples: np.ndarray, zeros: int) -> np.ndarray:
+    return np.concatenate([samples, np.zeros(zeros)])
+
+
+def test_moments(samples):
+    summary = SampleSummary.from_samples(samples, NUM_ZEROS)
+    all_samples = padded(samples, NUM_ZEROS)
+    assert summary.count == len(all_samples)
+    assert summary.zeros == NUM_ZEROS
+    assert summary.mean == pytest.approx(np.mean(all_samples))
+    assert summary.variance == pytest.approx(np.var(all_samples, ddof=1))
+    assert summary.min == np.min(all_samples)
+    assert summary.max == np.max(all_samples)
+
+
+def test_quantiles(samples):
+    summary = SampleSummary.from_samples(samples, NUM_ZEROS)
+    expected = np.quantile(padded(samples, NUM_ZEROS), QUANTILES)
+    np.testing.assert_allclose(summary.quantile(QUANTILES), expected, rtol=0.05)
+
+
+def test_quantiles_of_zeros():
+    summary = SampleSummary.from_samples(np.array([-1.0, 1.0]), zeros=98)
+    np.testing.assert_array_equal(summary.quantile([0.1, 0.5, 0.9]), [0, 0, 0])
+    assert summary.quantile(0) == -1
+    assert summary.quantile(1) == 1
+
+
+def test_merged_summaries_match_single_summary(samples):
+    single = SampleSummary.from_samples(samples, NUM_ZEROS)
+    merged = SampleSummary()
+    for chunk in np.array_split(samples, 7):
+        merged.merge(SampleSummary.from_samples(chunk, NUM_ZEROS // 7))
+    merged.add(np.array([]), NUM_ZEROS - 7 * (NUM_ZEROS // 7))
+
+    assert merged.count == single.count
+    assert merged.zeros == single.zeros
+    assert merged.mean == pytest.approx(single.mean)
+    assert merged.variance == pytest.approx(single.variance)
+    assert merged.histogram() == single.histogram()
+    np.testing.assert_allclose(merged.quantile(QUANTILES), single.quantile(QUANTILES), rtol=0.05)
+
+
+def test_summaries_pickle(samples):
+    summary = SampleSummary.from_samples(samples, NUM_ZEROS)
+    unpickled = pickle.loads(pickle.dumps(summary))
+    unpickled.merge(summary)
+    assert unpickled.count == 2 * summary.count
+    assert unpickled.mean == pytest.approx(summary.mean)
+
+
+def test_digest_stays_bounded(samples):
+    summary = SampleSummary()
+    for _ in range(10):
+        summary.add(samples)
+    assert len(summary._centroid_means) < summary.compression
+
+
+def test_histogram(samples):
+    summary = SampleSummary.from_samples(samples, NUM_ZEROS, bins_per_decade=5)
+    histogram = summary.histogram()
+    assert sum(count for _, _, count in histogram) == len(samples)
+    for lower, upper, count in histogram:
+        assert np.count_nonzero((samples >= lower) & (samples < upper)) == pytest.approx(count, abs=1)
+
+
+def test_incompatible_summaries_cannot_be_merged():
+    with pytest.raises(ValueError, match="same compression"):
+        SampleSummary(compression=100).merge(SampleSummary.from_samples(np.ones(10), compression=200))
+
+
+@pytest.mark.parametrize("intervention", [GhdIntervention(name="test"), AnimalIntervention(animal=Animal.CHICKEN)])
+def test_streaming_summary(intervention):
+    with using_parameters(Parameters(simulation_params=SimulationParams(simulations=20_000))):
+        with using_rng(42):
+            estimate = intervention.estimate_dalys_per_1000()
+            expected_samples, expected_zeros = estimate.data, estimate.num_zeros
+        with using_rng(42):
+            summary = summarize_dalys_per_1000(intervention, 25_000, chunk_size=10_000)
+        with using_rng(42):
+            same_summary = summarize_dalys_per_1000(intervention, 25_000, chunk_size=10_000)
+    assert summary.count == 25_000
+    assert summary.mean == same_summary.mean
+    expected_mean = np.sum(expected_samples) / (len(expected_samples) + expected_zeros)
+    assert summary.mean == pytest.approx(expected_mean, rel=0.1)
+
+
+def test_weighted_summary_matches_repeated_samples(samples):
+    chunk = samples[:1_000]
+    weights = np.arange(1_000) % 4 + 1.0
+    summary = SampleSummary.from_samples(chunk, NUM_ZEROS, weights=weights)
+    repeated = SampleSummary.from_samples(np.repeat(chunk, weights.astype(int)), NUM_ZEROS)
+    assert summary.count == repeated.count
+    assert summary.zeros == repeated.zeros
+    assert summary.mean == pytest.approx(repeated.mean)
+    assert summary.variance == pytest.approx(repeated.variance)
+    np.testing.assert_allclose(summary.quantile(QUANTILES), repeated.quantile(QUANTILES), rtol=0.05)
+    assert [count for _, _, count in summary.histogram()] == [count for _, _, count in repeated.histogram()]
@@ -12,3 +12,10 @@ def test_enforce_min_absolute_value():
     result = utils.enforce_min_absolute_value(input, 0.1)
     expected = np.array([1, 0.1, 0.1, 0.1, -0.1, -0.1, -1.0])
     assert np.array_equal(result, expected)
+
+
+def test_replace_zero_float_with_tiny():
+    tiny = np.finfo(float).tiny
+    assert utils.replace_zero_float_with_tiny(0.0) == tiny
+    assert utils.replace_zero_float_with_tiny(0.5) == 0.5
+    np.testing.assert_array_equal(utils.replace_zero_float_with_tiny(np.array([0.0, 0.5])), [tiny, 0.5])
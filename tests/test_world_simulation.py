@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import ccm.world.population as population
+from ccm.contexts import sharing_world_draws, using_parameters, using_rng
+from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
+from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
+from ccm.world.eras import Era
+from ccm.world.longterm_params import DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK, LongTermParams
+from ccm.world.risk_types import RiskTypeAI, RiskTypeGLT
+from ccm.world.simulation import WorldSimulation, get_world_simulation, sample_catastrophe_intensities
+from ccm.world.space import sample_expansion_speeds
+
+
+def test_world_simulation_is_memoized_per_stream_and_number_of_worlds():
+    with using_rng(1):
+        world = get_world_simulation(1000)
+        assert get_world_simulation(1000) is world
+        assert get_world_simulation(100) is not world
+    with using_rng(1):
+        # The same worlds for the same seed
+        assert get_world_simulation(1000) is world
+    with using_rng(2):
+        other_world = get_world_simulation(1000)
+    assert not np.array_equal(other_world.years_to_extinction, world.years_to_extinction)
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        lambda: get_world_simulation(1024).years_to_extinction,
+        lambda: sample_expansion_speeds(1024),
+        lambda: population.sample_populations_per_star(1024),
+    ],
+)
+def test_world_draws_are_memoized_per_dtype_and_sampling_method(sample):
+    def sample_with(**simulation_params):
+        with using_parameters(Parameters(simulation_params=SimulationParams(**simulation_params))), using_rng(1):
+            return sample()
+
+    samples = sample_with()
+    assert sample_with() is samples
+    assert sample_with(dtype="float32").dtype == np.float32
+    sobol_samples = sample_with(sampling_method="sobol")
+    assert sobol_samples.dtype == np.float64
+    assert not np.array_equal(sobol_samples, samples)
+
+
+def test_world_simulation_is_memoized_per_long_term_parameters():
+    with using_rng(1):
+        world = get_world_simulation(1000)
+        with using_parameters(Parameters(longterm_params=LongTermParams(max_creditable_year=5000))):
+            assert get_world_simulation(1000) is not world
+
+
+def test_world_samples_do_not_depend_on_the_order_they_are_drawn_in():
+    world = WorldSimulation(LongTermParams(), 1000, (0, ()))
+    bio_intensities = world.catastrophe_intensities(RiskTypeGLT.BIO)
+    same_world = WorldSimulation(LongTermParams(), 1000, (0, ()))
+    same_world.catastrophe_intensities(RiskTypeAI.MISALIGNMENT)
+    np.testing.assert_array_equal(same_world.catastrophe_intensities(RiskTypeGLT.BIO), bio_intensities)
+
+
+def test_catastrophe_intensities_of_some_worlds_match_those_of_all_worlds():
+    indices = np.array([3, 500, 999])
+    world = WorldSimulation(LongTermParams(), 1000, (0, ()))
+    some_intensities = world.catastrophe_intensities(RiskTypeGLT.BIO, indices)
+    assert len(some_intensities) == 3
+    np.testing.assert_array_equal(world.catastrophe_intensities(RiskTypeGLT.BIO, indices), some_intensities)
+    np.testing.assert_array_equal(world.catastrophe_intensities(RiskTypeGLT.BIO)[indices], some_intensities)
+    assert world.catastrophe_intensities(RiskTypeGLT.BIO, indices) is not some_intensities
+
+
+def test_world_samples_are_read_only():
+    with using_rng(1):
+        world = get_world_simulation(1000)
+    with pytest.raises(ValueError, match="read-only"):
+        world.years_to_extinction[0] = 0
+    # Intensities computed for the caller don't change those of the world
+    intensities = world.catastrophe_intensities(RiskTypeGLT.NUKES)
+    intensities[0] = -1
+    assert world.catastrophe_intensities(RiskTypeGLT.NUKES)[0] != -1
+
+
+def test_catastrophe_intensities_of_shared_worlds_are_drawn_on_construction(model_parameters):
+    with using_rng(1):
+        world = get_world_simulation(1000)
+    nbytes = world.nbytes
+    # The uniforms of all risk types are counted in the size of the world in the memo
+    assert nbytes >= (6 + len(world.params.catastrophe_intensities)) * 1000 * 8
+    indices = np.arange(0, 1000, 7)
+
+    def some_intensities(_):
+        # (Threads don't inherit the context)
+        with using_parameters(model_parameters):
+            return world.catastrophe_intensities(RiskTypeGLT.BIO, indices)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        intensities = list(executor.map(some_intensities, range(32)))
+    for intensities_of_thread in intensities:
+        np.testing.assert_array_equal(intensities_of_thread, intensities[0])
+    assert world.nbytes == nbytes
+
+
+def test_catastrophe_intensities_of_memoized_worlds_are_those_of_the_worlds():
+    indices = np.array([3, 500, 999])
+    with using_parameters(Parameters()), using_rng(1):
+        intensities = sample_catastrophe_intensities(RiskTypeGLT.BIO, 1000, indices)
+        world = get_world_simulation(1000)
+    np.testing.assert_array_equal(intensities, world.catastrophe_intensities(RiskTypeGLT.BIO, indices))
+
+
+def test_catastrophe_intensities_without_memoized_worlds_are_drawn_for_the_worlds_asked_for(monkeypatch):
+    def get_world_simulation(*_):
+        raise AssertionError("Whole worlds are drawn for a few intensities")
+
+    def sample(risk_type, num_samples, indices=None):
+        # (Threads don't inherit the context, so they sample with the process-wide generator, which isn't memoized)
+        with using_parameters(Parameters()):
+            return sample_catastrophe_intensities(risk_type, num_samples, indices)
+
+    monkeypatch.setattr("ccm.world.simulation.get_world_simulation", get_world_simulation)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        intensities = executor.submit(sample, RiskTypeGLT.BIO, 10_000_000, np.array([3, 500, 999])).result()
+        all_intensities = executor.submit(sample, RiskTypeAI.MISALIGNMENT, 1000).result()
+    assert len(intensities) == 3
+    assert np.all((intensities >= 0) & (intensities <= 1))
+    assert len(all_intensities) == 1000
+
+
+def test_later_extinctions_are_later():
+    world = WorldSimulation(LongTermParams(), 10_000, (0, ()))
+    assert np.all(world.years_to_later_extinction > world.years_to_extinction)
+
+
+def test_worlds_extinct_at_the_end_of_the_last_era_are_not_extinct_later():
+    eras = (
+        Era(length=5, annual_extinction_risk=0.5, proportional_risks_by_type=DEFAULT_FRACTIONS_OF_NEAR_TERM_TOTAL_RISK),
+    )
+    with using_parameters(Parameters(longterm_params=LongTermParams(risk_eras=eras))):
+        world = WorldSimulation(LongTermParams(risk_eras=eras), 1000, (0, ()))
+    at_the_end = world.years_to_extinction == 4
+    assert np.any(at_the_end)
+    np.testing.assert_array_equal(world.years_to_later_extinction[at_the_end], 4)
+    assert np.all(world.years_to_later_extinction[~at_the_end] > world.years_to_extinction[~at_the_end])
+
+
+def test_life_years_need_a_number_of_years_per_world():
+    world = WorldSimulation(LongTermParams(), 1000, (0, ()))
+    with pytest.raises(ValueError, match="for each of the 1000 simulated worlds"):
+        population.get_total_life_years_until(np.ones(100), world)
+
+
+def test_xrisk_interventions_share_the_worlds_of_a_batch():
+    interventions = [XRiskIntervention(risk_type=RiskTypeAI.MISALIGNMENT), XRiskIntervention(risk_type=RiskTypeGLT.BIO)]
+    with using_rng(7), sharing_world_draws():
+        interventions[0].estimate_healthy_years_saved()
+        hits = get_world_simulation.cache_info().hits
+        misses = get_world_simulation.cache_info().misses
+        interventions[1].estimate_healthy_years_saved()
+    assert get_world_simulation.cache_info().misses == misses
+    assert get_world_simulation.cache_info().hits > hits
@@ -4,10 +4,11 @@
 
 import ccm.config as config
 import ccm.world.risk_types as risk_types
-from ccm.contexts import using_parameters
+from ccm.contexts import using_parameters, using_rng
 from ccm.interventions.xrisk.impact.impact_method_params import ALL_IMPACT_METHODS, ImpactMethodParams
 from ccm.interventions.xrisk.xrisk_interventions import XRiskIntervention
 from ccm.parameters import Parameters
+from ccm.simulation_params import SimulationParams
 from ccm.utility.models import ConstantDistributionSpec
 from ccm.world.risk_types import RiskTypeAI, RiskTypeGLT
 
@@ -23,7 +24,8 @@
 def test_glt_daly_estimator(impact_method, risk_type) -> None:
     with using_parameters(Parameters(impact_method=ImpactMethodParams(impact_method=impact_method))):
         intervention = XRiskIntervention(risk_type=risk_type)
-        estimate_dalys_per_1000, zeros = intervention.glt_dalys_per_1000_estimator()
+        estimate = intervention.glt_dalys_per_1000_estimator()
+        estimate_dalys_per_1000, zeros = estimate.data, estimate.num_zeros
 
     assert isinstance(estimate_dalys_per_1000, np.ndarray), "Result does not include a `numpy.NDArray` object"
     assert isinstance(zeros, int), "Result does not include an integer with the number of zeros"
@@ -59,7 +61,8 @@ def test_risk_reduced_per_project(impact_method, risk_type) -> None:
 def test_estimate_impact(impact_method, risk_type):
     with using_parameters(Parameters(impact_method=ImpactMethodParams(impact_method=impact_method))):
         intervention = XRiskIntervention(risk_type=risk_type)
-        healthy_life_yrs_saved, zeros = intervention.estimate_healthy_years_saved()
+        estimate = intervention.estimate_healthy_years_saved()
+        healthy_life_yrs_saved, zeros = estimate.data, estimate.num_zeros
 
     assert isinstance(
         healthy_life_yrs_saved,
@@ -198,3 +201,22 @@ def test_calc_megaproject_dalys_per_1000(
         err_msg="Function returned an unexpected value!",
         strict=True,
     )
+
+
+@pytest.mark.parametrize("risk_type", [RiskTypeAI.MISALIGNMENT, RiskTypeGLT.NUKES])
+def test_stratified_sampling_keeps_the_mean(risk_type):
+    intervention = XRiskIntervention(risk_type=risk_type)
+    means, standard_errors = {}, {}
+    for stratified_sampling in (False, True):
+        simulation_params = SimulationParams(simulations=200_000, stratified_sampling=stratified_sampling)
+        with using_parameters(Parameters(simulation_params=simulation_params)), using_rng(0):
+            estimate = intervention.estimate_healthy_years_saved()
+        means[stratified_sampling] = estimate.mean()
+        # The mean is a weighted sum over the stored values, each drawn once
+        contributions = estimate.weights_or_ones() * estimate.data
+        standard_errors[stratified_sampling] = np.sqrt(estimate.nnz) * np.std(contributions) / estimate.total_weight
+        assert estimate.nnz == 200_000
+        assert (estimate.weights is not None) == stratified_sampling
+
+    # The seeded means agree to well within a few standard errors of their difference
+    assert abs(means[True] - means[False]) < 4 * np.hypot(standard_errors[True], standard_errors[False])
@@ -4,6 +4,7 @@
 import squigglepy as sq
 
 import ccm.config as config
+import ccm.utility.squigglepy_wrapper as sqw
 import ccm.interventions.xrisk.impact.utils.years_credit_calculator as years_credit
 
 SIMULATIONS = config.get_simulations()
@@ -65,7 +66,7 @@ def prob_survival_until_then_death_at(array):
     # The results should be approximately the same.
     # They aren't exactly the same because we only apply the reduction in probability to the first extinction event.
     # The second event is sampled from the unadjusted distribution in years_credit, but not the simple model above.
-    differences = sq.sample(dist_adjusted, n=150000) - sq.sample(dist_default, n=150000)
+    differences = sqw.sample(dist_adjusted, n=150000) - sqw.sample(dist_default, n=150000)
     expected_value = np.mean(differences)
     actual_value = np.mean(credit)
     assert math.isclose(actual_value, expected_value, rel_tol=0.2)
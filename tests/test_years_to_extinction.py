@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from ccm.contexts import updated_parameters
+from ccm.simulation_params import SimulationParams
+from ccm.utility.years_to_extinction import YearsToExtinctionDistribution
+
+# Midpoints of a fine grid of probabilities, so that quantiles give the probability of each year
+GRID = (np.arange(1_000_000) + 0.5) / 1_000_000
+
+
+def _probabilities_of_years(distribution: YearsToExtinctionDistribution) -> np.ndarray:
+    years = distribution.quantile(GRID)
+    return np.bincount(years.astype(np.int64)) / len(GRID)
+
+
+def test_quantile_follows_a_geometric_distribution_in_each_era():
+    distribution = YearsToExtinctionDistribution([3, 4], [0.2, 0.1])
+    first_era = 0.8 ** np.arange(3) * 0.2
+    # The last era ends in extinction
+    last_era = 0.8**3 * 0.9 ** np.arange(4) * 0.1 / (1 - 0.9**4)
+    np.testing.assert_allclose(_probabilities_of_years(distribution), np.concatenate((first_era, last_era)), atol=1e-5)
+
+
+def test_eras_without_risk():
+    distribution = YearsToExtinctionDistribution([2, 3, 4], [0.5, 0.0, 0.0])
+    # Nobody goes extinct in the second era, and the last era is uniform
+    expected = [0.5, 0.25, 0, 0, 0, 0.0625, 0.0625, 0.0625, 0.0625]
+    np.testing.assert_allclose(_probabilities_of_years(distribution), expected, atol=1e-5)
+
+
+def test_certain_extinction():
+    distribution = YearsToExtinctionDistribution([5, 10], [1.0, 0.1])
+    assert np.all(distribution.quantile(GRID) == 0)
+
+
+def test_long_eras_with_small_risks():
+    distribution = YearsToExtinctionDistribution([100, 100_000_000], [1e-3, 1e-9])
+    years = distribution.quantile(GRID)
+    assert np.mean(years < 100) == pytest.approx(1 - 0.999**100, abs=1e-5)
+    assert years.max() < 100_000_100
+    # Mean of the geometric distribution of the last era, truncated to its length
+    q, length = 1 - 1e-9, 100_000_000
+    truncated_mean = q / (1 - q) - length * q**length / (1 - q**length)
+    assert np.mean(years[years >= 100]) == pytest.approx(100 + truncated_mean, rel=1e-2)
+
+
+@pytest.mark.parametrize("sampling_method", ["monte carlo", "sobol", "latin hypercube"])
+def test_sample(sampling_method):
+    distribution = YearsToExtinctionDistribution([3, 4], [0.2, 0.1])
+    with updated_parameters({"sampling_method": sampling_method, "dtype": "float32"}, SimulationParams):
+        samples = distribution.sample(10_000)
+    assert samples.dtype == np.float32
+    assert set(np.unique(samples)) == set(range(7))
+    assert np.mean(samples < 3) == pytest.approx(1 - 0.8**3, abs=0.02)
+
+
+@pytest.mark.parametrize("lower", [0, 2, 3.5, 5])
+def test_sample_greater_than_follows_the_conditional_distribution(lower):
+    distribution = YearsToExtinctionDistribution([3, 4], [0.2, 0.1])
+    samples = distribution.sample_greater_than(np.full(200_000, lower))
+    probabilities = _probabilities_of_years(distribution)
+    later_probabilities = np.where(np.arange(len(probabilities)) > lower, probabilities, 0)
+    observed = np.bincount(samples.astype(np.int64), minlength=len(probabilities)) / len(samples)
+    np.testing.assert_allclose(observed, later_probabilities / later_probabilities.sum(), atol=0.01)
+
+
+def test_sample_greater_than_in_the_tail():
+    # Rejection sampling would need about 2^30 draws for each of these samples
+    distribution = YearsToExtinctionDistribution([40, 10], [0.5, 0.5])
+    samples = distribution.sample_greater_than(np.full(10_000, 30))
+    assert samples.min() == 31
+    assert np.mean(samples == 31) == pytest.approx(0.5, abs=0.02)
+    with pytest.raises(ValueError, match="beyond the end"):
+        distribution.sample_greater_than([49])
+
+
+def test_survival():
+    distribution = YearsToExtinctionDistribution([3, 4], [0.2, 1.0])
+    np.testing.assert_allclose(distribution.survival([-1, 0, 2, 3, 4, 7, 10]), [1, 1, 0.64, 0.512, 0, 0, 0])
+
+
+@pytest.mark.parametrize("risk_multiplier", [10, 10 ** (-4)])
+def test_higher_risks_bring_extinction_sooner(risk_multiplier):
+    lengths, risks = [30, 100, 1000, 100_000_000], np.array([6.6e-3, 6.9e-4, 8e-5, 8e-5])
+    distribution = YearsToExtinctionDistribution(lengths, risks)
+    modified = YearsToExtinctionDistribution(lengths, np.minimum(risks * risk_multiplier, 1))
+    years = np.array([1, 10, 29, 30, 130, 1_130, 20_000])
+    # Each year is less likely to be survived under higher risks, so extinction comes sooner at every quantile,
+    # and on average
+    if risk_multiplier > 1:
+        assert np.all(modified.survival(years) < distribution.survival(years))
+        assert np.all(modified.quantile(GRID) <= distribution.quantile(GRID))
+        assert np.mean(modified.quantile(GRID)) < np.mean(distribution.quantile(GRID))
+    else:
+        assert np.all(modified.survival(years) > distribution.survival(years))
+        assert np.all(modified.quantile(GRID) >= distribution.quantile(GRID))
+        assert np.mean(modified.quantile(GRID)) > np.mean(distribution.quantile(GRID))